@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Нагрузочный тест обработчиков telegram_bot без сети
+
+Обработчики вызываются напрямую с поддельными Update/Context, ответы и
+рассылка уходят в заглушку бота, которая только записывает сообщения.
+Данные - синтетическая база заданного размера (synthetic_data.py),
+подписчики и состояние - во временной папке, рабочие файлы не трогаются.
+
+Замеряется:
+- задержка каждой команды (p50/p95/p99/max) при N одновременных чатах
+- блокировка event loop: фоновая задача просыпается каждую миллисекунду,
+  опоздание пробуждения = время, когда loop был занят синхронным кодом
+- память процесса (RSS) и, с --trace-memory, пик выделений по tracemalloc
+- check_viral_updates: проверка после изменения файла и рассылка подписчикам
+
+Запуск: python benchmark_bot.py --rows 100000 --requests 2000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Интервал и порог монитора event loop (секунды)
+MONITOR_INTERVAL = 0.001
+BLOCK_THRESHOLD = 0.005
+
+# Каждая N-я строка при "обновлении данных" становится мега вирусной
+BOOST_EVERY = 1000
+BOOST_COEF = 25.0
+
+DEFAULT_COMMANDS = 'start,top10,mega,stats,find,movers'
+
+
+def percentile(values: List[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100 * len(values)))] if values else 0.0
+
+
+def rss_mb() -> Optional[float]:
+    """Пиковый RSS процесса в МБ (None - недоступно на платформе)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux - килобайты, macOS - байты
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+class StubBot:
+    """Заглушка Telegram бота: записывает отправленные сообщения"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.sent: List[tuple] = []
+
+    async def send_message(self, chat_id: int, text: str, **kwargs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.sent.append((chat_id, len(text), time.perf_counter()))
+
+
+class FakeMessage:
+    """Сообщение пользователя: reply_text отправляет ответ через заглушку"""
+
+    def __init__(self, bot: StubBot, chat_id: int):
+        self.bot = bot
+        self.chat_id = chat_id
+
+    async def reply_text(self, text: str, **kwargs):
+        await self.bot.send_message(chat_id=self.chat_id, text=text)
+
+
+def fake_call(bot: StubBot, chat_id: int, args: List[str]):
+    """Поддельные Update и Context для вызова обработчика команды"""
+    user = SimpleNamespace(id=chat_id)
+    update = SimpleNamespace(effective_user=user, effective_chat=user,
+                             message=FakeMessage(bot, chat_id))
+    context = SimpleNamespace(args=args, bot=bot)
+    return update, context
+
+
+class LoopMonitor:
+    """Замер блокировок event loop по опозданию периодической задачи"""
+
+    def __init__(self, interval: float = MONITOR_INTERVAL, threshold: float = BLOCK_THRESHOLD):
+        self.interval = interval
+        self.threshold = threshold
+        self.lags: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lags.append(time.perf_counter() - started - self.interval)
+
+    def start(self):
+        self.lags = []
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> Dict[str, float]:
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        blocked = [lag for lag in self.lags if lag > self.threshold]
+        return {
+            'max_ms': max(self.lags, default=0.0) * 1000,
+            'p99_ms': percentile(self.lags, 99) * 1000,
+            'blocked_ms': sum(blocked) * 1000,
+            'blocks': len(blocked),
+        }
+
+
+def boost_dataset(filename: str, every: int = BOOST_EVERY) -> int:
+    """Перезаписывает файл, делая каждую every-ю строку мега вирусной"""
+    from blogger_model import iter_bloggers
+    from stream_pipeline import write_stage
+
+    def boosted():
+        for i, blogger in enumerate(iter_bloggers(filename)):
+            if i % every == 0:
+                blogger.viral_coef = BOOST_COEF
+            yield blogger
+
+    tmp_file = f"{filename}.tmp"
+    count = write_stage(boosted(), tmp_file)
+    os.replace(tmp_file, filename)
+    return count
+
+
+def print_phase(title: str, seconds: float, loop: Dict[str, float]):
+    print(f"{title:<34} {seconds * 1000:>9.1f} мс | loop: max {loop['max_ms']:.1f} мс, "
+          f"заблокирован {loop['blocked_ms']:.0f} мс")
+
+
+async def run(args) -> dict:
+    import telegram_bot
+    from broadcast import Broadcaster
+    from blogger_model import iter_bloggers
+    from subscriber_store import SubscriberStore
+    from synthetic_data import write_synthetic_csv
+
+    report = {'rows': args.rows, 'requests': args.requests, 'concurrency': args.concurrency}
+    bot = StubBot(args.send_latency / 1000)
+    monitor = LoopMonitor()
+
+    print(f"🧪 Синтетическая база: {args.rows:,} строк...")
+    data_file = os.path.join(args.workdir, 'viral.csv')
+    write_synthetic_csv(data_file, args.rows)
+    names = [b.name.split(' ')[0] for _, b in zip(range(200), iter_bloggers(data_file))]
+
+    # Обработчики берут снимок из глобального кэша модуля бота
+    telegram_bot.DATA_FILES = (data_file,)
+    telegram_bot.viral_snapshot.filename = data_file
+    telegram_bot.broadcaster = Broadcaster(bot) if args.telegram_limits else \
+        Broadcaster(bot, rate=1e9, per_chat_interval=0)
+
+    print("\n" + "=" * 70)
+    monitor.start()
+    started = time.perf_counter()
+    snapshot = await telegram_bot.viral_snapshot.refresh(force=True)
+    report['load_ms'] = (time.perf_counter() - started) * 1000
+    report['load_loop'] = await monitor.stop()
+    print_phase("Загрузка снимка (executor)", report['load_ms'] / 1000, report['load_loop'])
+    telegram_bot.leaderboard.update(snapshot.leaderboard)
+    report['rss_after_load_mb'] = rss_mb()
+
+    # Подписчики для рассылки (кроме тех, кто отправит /start в тесте);
+    # хранилище открывается как в post_init - запись в SQLite в отдельном потоке
+    telegram_bot.subscribers = SubscriberStore(background=True)
+    for chat_id in range(1, args.subscribers + 1):
+        telegram_bot.subscribers.subscribe(chat_id)
+
+    handlers = {
+        'start': telegram_bot.start,
+        'top10': telegram_bot.top10,
+        'mega': telegram_bot.mega_viral,
+        'stats': telegram_bot.stats,
+        'find': telegram_bot.find,
+        'movers': telegram_bot.movers,
+        'filter': telegram_bot.filter_settings,
+    }
+    commands = args.commands.split(',')
+    unknown = [c for c in commands if c not in handlers]
+    if unknown:
+        raise SystemExit(f"❌ Неизвестные команды: {', '.join(unknown)}")
+
+    latencies: Dict[str, List[float]] = {command: [] for command in commands}
+    numbers = iter(range(args.requests))
+
+    async def user(worker: int):
+        for i in numbers:
+            command = commands[i % len(commands)]
+            command_args = [names[i % len(names)]] if command == 'find' else []
+            # /start от разных пользователей - каждый раз новая запись в SQLite
+            chat_id = 1_000_000 + i if command == 'start' else 500_000 + worker
+            update, context = fake_call(bot, chat_id, command_args)
+            t = time.perf_counter()
+            await handlers[command](update, context)
+            latencies[command].append(time.perf_counter() - t)
+
+    if args.trace_memory:
+        tracemalloc.start()
+    monitor.start()
+    started = time.perf_counter()
+    await asyncio.gather(*(user(w) for w in range(args.concurrency)))
+    duration = time.perf_counter() - started
+    report['commands_loop'] = await monitor.stop()
+    if args.trace_memory:
+        report['commands_traced_peak_mb'] = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        tracemalloc.stop()
+
+    report['commands_duration_s'] = duration
+    report['commands_per_s'] = args.requests / duration
+    report['latency_ms'] = {
+        command: {p: percentile(values, p) * 1000 for p in (50, 95, 99, 100)}
+        for command, values in latencies.items()
+    }
+    print_phase(f"{args.requests:,} команд x {args.concurrency} чатов", duration, report['commands_loop'])
+
+    # check_viral_updates: базовая проверка, изменение файла, проверка с рассылкой
+    context = SimpleNamespace(bot=bot, args=[])
+    await telegram_bot.check_viral_updates(context)
+    boost_dataset(data_file)
+    sent_before = len(bot.sent)
+
+    monitor.start()
+    started = time.perf_counter()
+    await telegram_bot.check_viral_updates(context)
+    report['check_ms'] = (time.perf_counter() - started) * 1000
+    report['check_loop'] = await monitor.stop()
+    report['check_sent'] = len(bot.sent) - sent_before
+    print_phase(f"check_viral_updates ({report['check_sent']:,} сообщ.)",
+                report['check_ms'] / 1000, report['check_loop'])
+    report['rss_peak_mb'] = rss_mb()
+    telegram_bot.subscribers.close()
+    return report
+
+
+def main():
+    """Основная функция"""
+    parser = argparse.ArgumentParser(description="Нагрузочный тест обработчиков бота")
+    parser.add_argument('--rows', type=int, default=100_000, help="Строк в синтетической базе")
+    parser.add_argument('--requests', type=int, default=2000, help="Количество команд")
+    parser.add_argument('--concurrency', type=int, default=50, help="Одновременных чатов")
+    parser.add_argument('--commands', default=DEFAULT_COMMANDS, help="Команды через запятую")
+    parser.add_argument('--subscribers', type=int, default=1000, help="Подписчиков для рассылки")
+    parser.add_argument('--send-latency', type=float, default=0.0,
+                        help="Имитация задержки Telegram API на сообщение (мс)")
+    parser.add_argument('--telegram-limits', action='store_true',
+                        help="Рассылать с лимитами Telegram (30 сообщ./с) вместо максимальной скорости")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="Пик выделений памяти во время команд (tracemalloc, медленнее)")
+    parser.add_argument('--json', help="Сохранить отчет в JSON файл")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("🤖 НАГРУЗОЧНЫЙ ТЕСТ TELEGRAM БОТА (офлайн)")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory(prefix='benchmark_bot_') as workdir:
+        # Состояние бота - во временной папке (до импорта telegram_bot)
+        os.environ['SUBSCRIBERS_DB'] = os.path.join(workdir, 'subscribers.db')
+        os.environ['VIRAL_STATE_FILE'] = os.path.join(workdir, 'viral_state.json')
+        os.environ['LEADERBOARD_STATE_FILE'] = os.path.join(workdir, 'leaderboard_state.npz')
+        args.workdir = workdir
+        report = asyncio.run(run(args))
+
+    print("\n" + "=" * 70)
+    print(f"📊 {report['commands_per_s']:,.0f} команд/с")
+    print("=" * 70)
+    for command, values in report['latency_ms'].items():
+        print(f"/{command:<9} p50 {values[50]:8.2f} мс | p95 {values[95]:8.2f} мс | "
+              f"p99 {values[99]:8.2f} мс | max {values[100]:8.2f} мс")
+    if report['rss_peak_mb'] is not None:
+        print(f"\n💾 RSS после загрузки: {report['rss_after_load_mb']:.0f} МБ, "
+              f"пик: {report['rss_peak_mb']:.0f} МБ")
+    if 'commands_traced_peak_mb' in report:
+        print(f"💾 Пик выделений во время команд: {report['commands_traced_peak_mb']:.1f} МБ")
+    print("=" * 70)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 Отчет: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
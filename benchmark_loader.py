@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк загрузки CSV: словари csv.DictReader против записей Blogger
+
+Создает временный CSV из N строк (по умолчанию 1M) на основе
+fitness_trainers_viral.csv и сравнивает время разбора и пиковую память.
+
+Запуск: python benchmark_loader.py [количество_строк]
+"""
+
+import csv
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from itertools import cycle, islice
+
+from blogger_model import iter_bloggers, load_bloggers
+
+
+def make_dataset(filename: str, rows: int, source: str = 'fitness_trainers_viral.csv'):
+    """Создает CSV из rows строк, повторяя строки исходного файла"""
+    with open(source, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        template = [row for row in reader if row and row[0]]
+
+    # Заголовок исходного файла: строки копируются как есть (схема v1 или v2)
+    with open(filename, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for i, row in enumerate(islice(cycle(template), rows)):
+            writer.writerow([f"{row[0]} {i}"] + row[1:])
+
+
+def load_dicts(filename: str) -> list:
+    """Старый способ: словарь на строку + ручное приведение типов"""
+    data = []
+    with open(filename, 'r', encoding='utf-8-sig') as f:
+        for row in csv.DictReader(f):
+            row['Коэффициент_вирусности'] = float(row['Коэффициент_вирусности'])
+            row['Просмотры_последнего'] = int(row['Просмотры_последнего'])
+            row['Средние_просмотры'] = int(row['Средние_просмотры'])
+            row['Видео_в_месяц'] = int(row['Видео_в_месяц'])
+            data.append(row)
+    return data
+
+
+def count_stream(filename: str) -> int:
+    """Потоковый проход без накопления записей"""
+    return sum(1 for _ in iter_bloggers(filename))
+
+
+def measure(label: str, func, filename: str):
+    """Замеряет время и пиковую память одного способа загрузки"""
+    # Время замеряем отдельно: tracemalloc заметно замедляет выделение памяти
+    start = time.perf_counter()
+    result = func(filename)
+    elapsed = time.perf_counter() - start
+    count = result if isinstance(result, int) else len(result)
+    del result
+
+    tracemalloc.start()
+    func(filename)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{label:<28} {elapsed:>8.2f} с {peak / 1024 / 1024:>10.1f} МБ   ({count:,} строк)")
+    return elapsed, peak
+
+
+def main():
+    """Основная функция"""
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    print("=" * 70)
+    print(f"📊 Бенчмарк загрузки CSV: {rows:,} строк")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, 'bench.csv')
+        make_dataset(filename, rows)
+        print(f"Размер файла: {os.path.getsize(filename) / 1024 / 1024:.1f} МБ\n")
+
+        print(f"{'Способ':<28} {'Время':>10} {'Пик памяти':>13}")
+        dict_time, dict_peak = measure("csv.DictReader (dict)", load_dicts, filename)
+        slot_time, slot_peak = measure("load_bloggers (Blogger)", load_bloggers, filename)
+        measure("iter_bloggers (поток)", count_stream, filename)
+
+    print("\n" + "=" * 70)
+    print(f"⚡ Ускорение разбора: {dict_time / slot_time:.2f}x")
+    print(f"💾 Экономия памяти: {dict_peak / slot_peak:.2f}x")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
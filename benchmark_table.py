@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк колоночной таблицы ViralTable
+
+Размножает записи fitness_trainers_viral.csv до N строк (по умолчанию 1M),
+строит таблицу и замеряет сводки, которые используют скрипты и бот.
+
+Запуск: python benchmark_table.py [количество_строк]
+"""
+
+import sys
+import time
+from itertools import cycle, islice
+
+from blogger_model import load_bloggers
+from viral_table import ViralTable
+
+
+def timed(label: str, func, repeat: int = 20):
+    """Печатает медианное время вызова в миллисекундах"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    times.sort()
+    print(f"{label:<36} {times[len(times) // 2] * 1000:>9.3f} мс")
+
+
+def main():
+    """Основная функция"""
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    template = load_bloggers('fitness_trainers_viral.csv')
+
+    print("=" * 70)
+    print(f"📊 Бенчмарк ViralTable: {rows:,} строк")
+    print("=" * 70)
+
+    start = time.perf_counter()
+    table = ViralTable.from_bloggers(islice(cycle(template), rows))
+    print(f"{'Построение таблицы (один проход)':<36} {(time.perf_counter() - start) * 1000:>9.1f} мс\n")
+
+    viral_rows = table.rows_min_coef(5.0)
+    timed("Строки coef >= 5", lambda: table.rows_min_coef(5.0))
+    timed("Подсчет по платформам", table.platform_counts)
+    timed("Подсчет по платформам (coef >= 5)", lambda: table.platform_counts(table.rows_min_coef(5.0)))
+    timed("Корзины вирусности", table.bucket_counts)
+    timed("Перцентили 50/90/99", table.percentiles)
+    timed("Топ-10 по коэффициенту", lambda: table.top_indices(10))
+    timed("Топ-10 по просмотрам (coef >= 5)", lambda: table.top_indices(10, 'views', viral_rows))
+    timed("Сумма видео в месяц", lambda: table.total('videos_per_month'))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Общая модель данных о блогерах
+
+Схема v2 (13 колонок) хранит только сырые значения: целые числа, float
+коэффициент, время в ISO 8601 и код тренда. Отформатированные значения
+(1.2M, "🔥 Вирусно", "2024-01-05 13:20") вычисляются при выводе - в боте и
+экспорте сайта - через свойства Blogger. Файлы схемы v1 (16 колонок, числа
+записаны дважды) читаются как раньше, migrate_schema.py переписывает их в v2.
+
+- Blogger: запись со __slots__, числовые поля приводятся к типам один раз
+- parse_audience: мемоизированный разбор аудитории (1.2M, 150K+, 3.5М, 10К)
+- format_number / get_trend: единое форматирование чисел и тренда
+- load_bloggers / iter_bloggers / save_bloggers: быстрая загрузка и запись CSV
+"""
+
+import csv
+import gc
+import os
+from bisect import bisect_right
+from datetime import datetime
+from functools import lru_cache
+from operator import itemgetter
+from typing import Iterable, Iterator, List, Optional, Union
+
+from change_events import publish
+
+# Колонки базового файла (fitness_trainers_complete.csv)
+BASE_FIELDNAMES = ["Имя", "Никнейм/Название", "Платформа", "Ссылка", "Аудитория", "Описание"]
+
+# Схема v1: числа хранятся дважды - как есть и отформатированными
+FIELDNAMES_V1 = BASE_FIELDNAMES + [
+    "Формат_видео", "Просмотры_последнего", "Просмотры_последнего_форматир",
+    "Средние_просмотры", "Средние_просмотры_форматир", "Коэффициент_вирусности",
+    "Видео_в_месяц", "Последнее_обновление", "Тренд", "Тренд_значение"
+]
+
+# Схема v2: только сырые значения
+FIELDNAMES_V2 = [
+    "Имя", "Никнейм/Название", "Платформа", "Ссылка", "Подписчики", "Описание",
+    "Формат_видео", "Просмотры_последнего", "Средние_просмотры", "Коэффициент_вирусности",
+    "Видео_в_месяц", "Обновлено", "Тренд_значение"
+]
+
+# Схема, в которой пишут все скрипты (fitness_trainers_viral.csv)
+FIELDNAMES = FIELDNAMES_V2
+SCHEMA_VERSION = 2
+
+# Колонка CSV -> атрибут Blogger (производные колонки v1 - свойства)
+COLUMN_ATTRS = {
+    "Имя": "name",
+    "Никнейм/Название": "username",
+    "Платформа": "platform",
+    "Ссылка": "url",
+    "Аудитория": "audience",
+    "Подписчики": "audience_count",
+    "Описание": "description",
+    "Формат_видео": "video_format",
+    "Просмотры_последнего": "views",
+    "Просмотры_последнего_форматир": "views_formatted",
+    "Средние_просмотры": "avg_views",
+    "Средние_просмотры_форматир": "avg_views_formatted",
+    "Коэффициент_вирусности": "viral_coef",
+    "Видео_в_месяц": "videos_per_month",
+    "Последнее_обновление": "updated_formatted",
+    "Обновлено": "last_updated",
+    "Тренд": "trend",
+    "Тренд_значение": "trend_value",
+}
+
+# Свойства, которые при чтении заполняют поле записи
+_PROPERTY_SOURCES = {"audience_count": "audience", "updated_formatted": "last_updated"}
+
+# Коды тренда по возрастанию и нижние границы коэффициента вирусности для всех,
+# кроме первого: < 1 declining, 1-2 stable, 2-5 growing, 5-10 viral, 10+ mega
+TREND_CODES = ("declining", "stable", "growing", "viral", "mega")
+TREND_THRESHOLDS = (1.0, 2.0, 5.0, 10.0)
+
+# Код тренда -> подпись для вывода
+TREND_LABELS = {
+    "mega": "🚀 Мега",
+    "viral": "🔥 Вирусно",
+    "growing": "📈 Растет",
+    "stable": "➡️ Стабильно",
+    "declining": "📉 Падает",
+}
+
+UPDATED_FORMAT = '%Y-%m-%d %H:%M'
+
+# Кириллица -> латиница: никнеймы синтетических блогеров и поиск на сайте
+# ("mikhail" находит "Михаил") - одна таблица, иначе поиск не найдет сгенерированное
+TRANSLIT = {
+    'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'д': 'd', 'е': 'e', 'ё': 'e', 'ж': 'zh',
+    'з': 'z', 'и': 'i', 'й': 'y', 'к': 'k', 'л': 'l', 'м': 'm', 'н': 'n', 'о': 'o',
+    'п': 'p', 'р': 'r', 'с': 's', 'т': 't', 'у': 'u', 'ф': 'f', 'х': 'kh', 'ц': 'ts',
+    'ч': 'ch', 'ш': 'sh', 'щ': 'shch', 'ъ': '', 'ы': 'y', 'ь': '', 'э': 'e', 'ю': 'yu',
+    'я': 'ya'
+}
+
+# Индекс строк рядом с CSV (csv_index.py)
+ROW_INDEX_SUFFIX = '.idx.npz'
+
+# База с метриками вирусности и результат сборщиков (collect_*.py, collector_daemon,
+# work_queue export) - реальные метрики, которые показывает бот
+VIRAL_FILE = 'fitness_trainers_viral.csv'
+COLLECTED_FILE = 'fitness_trainers_viral_real.csv'
+
+# Старые названия колонок (fitness_trainers_data.csv)
+COLUMN_ALIASES = {
+    "Никнейм/Название канала": "Никнейм/Название",
+}
+
+_INT_ATTRS = {"views", "avg_views", "videos_per_month"}
+_FLOAT_ATTRS = {"viral_coef"}
+
+
+@lru_cache(maxsize=65536)
+def parse_audience(audience_str: str) -> Optional[int]:
+    """
+    Преобразует строку аудитории в число
+
+    Понимает латинские и кириллические суффиксы K/К и M/М, а также "+" и ",".
+    Возвращает None, если строку разобрать не удалось - значение по умолчанию
+    выбирает вызывающий код.
+    """
+    value = audience_str.strip().replace('+', '').replace(',', '').replace(' ', '')
+    if not value:
+        return None
+
+    multiplier = 1
+    suffix = value[-1]
+    if suffix in 'MМmм':
+        multiplier = 1_000_000
+        value = value[:-1]
+    elif suffix in 'KКkк':
+        multiplier = 1_000
+        value = value[:-1]
+
+    try:
+        return int(float(value) * multiplier)
+    except ValueError:
+        return None
+
+
+def format_number(num: int) -> str:
+    """Форматирует число в читаемый вид"""
+    if num >= 1_000_000:
+        return f"{num/1_000_000:.1f}M"
+    elif num >= 1_000:
+        return f"{num/1_000:.0f}K"
+    return str(num)
+
+
+def trend_code(viral_coefficient: float) -> str:
+    """Код тренда по вирусному коэффициенту (значение колонки Тренд_значение)"""
+    return TREND_CODES[bisect_right(TREND_THRESHOLDS, viral_coefficient)]
+
+
+def get_trend(viral_coefficient: float) -> tuple:
+    """Определяет тренд на основе вирусного коэффициента: (подпись, код)"""
+    code = trend_code(viral_coefficient)
+    return TREND_LABELS[code], code
+
+
+def now_iso() -> str:
+    """Текущее время для колонки Обновлено"""
+    return datetime.now().isoformat(timespec='seconds')
+
+
+@lru_cache(maxsize=4096)
+def to_iso(value: str) -> str:
+    """Время из CSV (ISO или "2024-01-05 13:20" схемы v1) в ISO 8601"""
+    if not value:
+        return ''
+    try:
+        return datetime.fromisoformat(value).isoformat(timespec='seconds')
+    except ValueError:
+        return value
+
+
+@lru_cache(maxsize=4096)
+def format_updated(value: str) -> str:
+    """ISO время в вид для вывода (2024-01-05 13:20)"""
+    try:
+        return datetime.fromisoformat(value).strftime(UPDATED_FORMAT)
+    except ValueError:
+        return value
+
+
+def schema_version(header: List[str]) -> int:
+    """Версия схемы по заголовку CSV"""
+    return 2 if "Подписчики" in header or "Обновлено" in header else 1
+
+
+def _to_int(value: str) -> int:
+    if not value:
+        return 0
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            return int(float(value))
+        except ValueError:
+            return 0
+
+
+def _to_float(value: str) -> float:
+    if not value:
+        return 0.0
+    try:
+        return float(value)
+    except ValueError:
+        return 0.0
+
+
+class Blogger:
+    """
+    Запись о блогере с типизированными метриками
+
+    Хранятся только сырые значения. Отформатированные (views_formatted,
+    audience_formatted, trend, ...) - свойства, вычисляемые при выводе.
+    """
+
+    __slots__ = (
+        'name', 'username', 'platform', 'url', 'audience', 'description',
+        'video_format', 'views', 'avg_views', 'viral_coef', 'videos_per_month',
+        'last_updated', 'trend_value'
+    )
+
+    def __init__(self, name: str = '', username: str = '', platform: str = '', url: str = '',
+                 audience: str = '', description: str = '', video_format: str = '',
+                 views: int = 0, avg_views: int = 0, viral_coef: float = 0.0,
+                 videos_per_month: int = 0, last_updated: str = '', trend_value: str = ''):
+        self.name = name
+        self.username = username
+        self.platform = platform
+        self.url = url
+        self.audience = audience
+        self.description = description
+        self.video_format = video_format
+        self.views = views
+        self.avg_views = avg_views
+        self.viral_coef = viral_coef
+        self.videos_per_month = videos_per_month
+        self.last_updated = last_updated
+        self.trend_value = trend_value
+
+    @property
+    def subscribers(self) -> Optional[int]:
+        """Аудитория в виде числа (None, если не удалось разобрать)"""
+        return parse_audience(self.audience)
+
+    @property
+    def audience_count(self) -> Union[int, str]:
+        """Аудитория для схемы v2: число подписчиков (строка как есть, если не разобрать)"""
+        count = parse_audience(self.audience) if self.audience else None
+        return self.audience if count is None else count
+
+    @audience_count.setter
+    def audience_count(self, value: Union[int, str]):
+        self.audience = str(value)
+
+    @property
+    def audience_formatted(self) -> str:
+        """Аудитория для вывода: 1200000 -> 1.2M, строки схемы v1 (150K+) - как есть"""
+        if self.audience.isdigit():
+            return format_number(int(self.audience))
+        return self.audience
+
+    @property
+    def views_formatted(self) -> str:
+        return format_number(self.views)
+
+    @property
+    def avg_views_formatted(self) -> str:
+        return format_number(self.avg_views)
+
+    @property
+    def trend(self) -> str:
+        """Подпись тренда для вывода"""
+        return TREND_LABELS.get(self.trend_value, '')
+
+    @property
+    def updated_formatted(self) -> str:
+        """Время обновления для вывода и схемы v1"""
+        return format_updated(self.last_updated) if self.last_updated else ''
+
+    @updated_formatted.setter
+    def updated_formatted(self, value: str):
+        self.last_updated = to_iso(value)
+
+    @classmethod
+    def from_row(cls, row: dict) -> 'Blogger':
+        """Создает запись из словаря с русскими названиями колонок"""
+        blogger = cls()
+        for column, value in row.items():
+            column = COLUMN_ALIASES.get(column, column)
+            attr = COLUMN_ATTRS.get(column)
+            if attr is None or value is None:
+                continue
+            # Производные колонки v1 (форматированные числа, подпись тренда) не читаются
+            if attr not in cls.__slots__ and attr not in _PROPERTY_SOURCES:
+                continue
+            if attr == 'last_updated':
+                value = to_iso(value)
+            elif attr in _INT_ATTRS:
+                value = _to_int(value) if isinstance(value, str) else int(value)
+            elif attr in _FLOAT_ATTRS:
+                value = _to_float(value) if isinstance(value, str) else float(value)
+            setattr(blogger, attr, value)
+        return blogger
+
+    def to_row(self, fieldnames: List[str] = FIELDNAMES) -> dict:
+        """Возвращает словарь с русскими названиями колонок"""
+        return {column: getattr(self, COLUMN_ATTRS[column]) for column in fieldnames}
+
+    def copy(self) -> 'Blogger':
+        """Поверхностная копия записи"""
+        clone = Blogger.__new__(Blogger)
+        for attr in self.__slots__:
+            setattr(clone, attr, getattr(self, attr))
+        return clone
+
+    def __reduce__(self):
+        # Компактная сериализация для пула процессов: кортеж значений полей
+        return Blogger, tuple(getattr(self, attr) for attr in self.__slots__)
+
+    def __repr__(self):
+        return f"Blogger({self.name!r}, {self.platform!r}, viral_coef={self.viral_coef})"
+
+
+def row_converter(header: List[str]):
+    """Строит функцию, превращающую строку csv.reader в Blogger"""
+    width = len(header)
+    positions = {}
+    for index, column in enumerate(header):
+        attr = COLUMN_ATTRS.get(COLUMN_ALIASES.get(column, column))
+        if attr is not None:
+            positions.setdefault(_PROPERTY_SOURCES.get(attr, attr), index)
+
+    # Отсутствующие колонки читаются из пустой ячейки, добавленной в конец строки
+    getter = itemgetter(*[positions.get(attr, width) for attr in Blogger.__slots__])
+
+    # Повторяющиеся значения (платформа, аудитория, тренд) храним один раз
+    shared = {}
+    share = shared.setdefault
+
+    def convert(values: List[str]) -> Blogger:
+        if len(values) < width:
+            values = values + [''] * (width - len(values))
+        values.append('')
+        (name, username, platform, url, audience, description, video_format,
+         views, avg_views, viral_coef, videos_per_month, last_updated,
+         trend_value) = getter(values)
+        return Blogger(
+            name, username, share(platform, platform), url, share(audience, audience),
+            description, share(video_format, video_format), _to_int(views),
+            _to_int(avg_views), _to_float(viral_coef), _to_int(videos_per_month),
+            to_iso(last_updated), share(trend_value, trend_value)
+        )
+
+    return convert
+
+
+def iter_bloggers(filename: str) -> Iterator[Blogger]:
+    """Потоково читает блогеров из CSV схемы v1 или v2 (строки без имени пропускаются)"""
+    with open(filename, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        convert = row_converter(header)
+        for values in reader:
+            if not values or not values[0]:
+                continue
+            yield convert(values)
+
+
+def load_bloggers(filename: str, stream: bool = False) -> Union[List[Blogger], Iterator[Blogger]]:
+    """
+    Загружает блогеров из CSV
+
+    Args:
+        filename: Путь к CSV файлу
+        stream: Вернуть итератор вместо списка (постоянная память)
+
+    Returns:
+        Список записей Blogger или итератор по ним
+    """
+    if stream:
+        return iter_bloggers(filename)
+
+    # Записи не образуют циклов: сборщик мусора только тормозит массовую загрузку
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return list(iter_bloggers(filename))
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def save_bloggers(bloggers: Iterable[Blogger], filename: str,
+                  fieldnames: List[str] = FIELDNAMES) -> int:
+    """Сохраняет блогеров в CSV, возвращает количество записанных строк"""
+    attrs = [COLUMN_ATTRS[column] for column in fieldnames]
+    count = 0
+    tmp_file = f"{filename}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(fieldnames)
+        for blogger in bloggers:
+            writer.writerow([getattr(blogger, attr) for attr in attrs])
+            count += 1
+
+    finish_write(tmp_file, filename)
+    return count
+
+
+def finish_write(tmp_file: str, filename: str):
+    """
+    Завершает запись CSV: атомарная замена файла, индекс строк, событие для бота
+
+    Файл заменяется целиком (os.replace), а не перезаписывается на месте -
+    читатели, отобразившие старую версию в память (csv_index), не увидят
+    обрезанный файл.
+    """
+    os.replace(tmp_file, filename)
+
+    # Индекс обновляется, только если его уже строили (csv_index требует numpy)
+    if os.path.exists(f"{filename}{ROW_INDEX_SUFFIX}"):
+        from csv_index import refresh_index
+        refresh_index(filename)
+
+    # Запущенный бот сразу узнает об изменении файла
+    publish(filename)
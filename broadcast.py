@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Рассылка уведомлений подписчикам с учетом лимитов Telegram
+
+- Очередь + пул воркеров с ограниченной конкурентностью
+- Один текст для всех чатов или персональный текст для каждого чата
+- Глобальный token bucket (~30 сообщений/с на бота)
+- Лимит на чат (не чаще 1 сообщения в секунду в один чат)
+- RetryAfter: пауза всей рассылки на указанное время и повтор
+- Заблокировавшие бота и удаленные чаты возвращаются в отчете для удаления
+- Отчет: доставлено, ошибки, задержка доставки и пропускная способность
+
+Требования:
+pip install python-telegram-bot
+"""
+
+import asyncio
+import time
+from datetime import timedelta
+from typing import Dict, Iterable, List
+
+from telegram.error import BadRequest, ChatMigrated, Forbidden, NetworkError, RetryAfter
+
+# Лимиты Telegram Bot API
+GLOBAL_RATE = 30.0
+PER_CHAT_INTERVAL = 1.0
+
+# Параметры рассылки
+WORKERS = 16
+MAX_RETRIES = 3
+RETRY_BACKOFF = 1.0
+
+# Ошибки BadRequest, после которых чат больше не существует
+_GONE_CHAT_ERRORS = ('chat not found', 'user is deactivated', 'bot was kicked')
+
+
+def retry_seconds(error: RetryAfter) -> float:
+    """Время ожидания из RetryAfter (int или timedelta - зависит от версии библиотеки)"""
+    value = error.retry_after
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    return float(value)
+
+
+class TokenBucket:
+    """
+    Асинхронный token bucket: не больше rate операций в секунду
+
+    capacity - допустимый всплеск. По умолчанию 1: сообщения идут равномерно,
+    и в любом окне в 1 секунду их не больше rate + 1.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float):
+        """Останавливает выдачу токенов (ответ RetryAfter от Telegram)"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+
+    async def acquire(self):
+        """Ждет свободный токен; ожидающие обслуживаются по очереди"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class ChatLimiter:
+    """Минимальный интервал между сообщениями в один чат"""
+
+    def __init__(self, interval: float = PER_CHAT_INTERVAL):
+        self.interval = interval
+        self.next_allowed: Dict[int, float] = {}
+
+    async def wait(self, chat_id: int):
+        """Ждет, пока в чат можно писать, и резервирует следующий слот"""
+        now = time.monotonic()
+        allowed = self.next_allowed.get(chat_id, now)
+        self.next_allowed[chat_id] = max(now, allowed) + self.interval
+        if allowed > now:
+            await asyncio.sleep(allowed - now)
+
+    def prune(self):
+        """Удаляет чаты, у которых лимит уже истек"""
+        now = time.monotonic()
+        self.next_allowed = {chat: t for chat, t in self.next_allowed.items() if t > now}
+
+
+class BroadcastReport:
+    """Итоги одной рассылки"""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.blocked: List[int] = []
+        self.migrated: Dict[int, int] = {}
+        self.latencies: List[float] = []
+        self.started = time.monotonic()
+        self.duration = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Доставлено сообщений в секунду"""
+        return self.sent / self.duration if self.duration else 0.0
+
+    def latency(self, percentile: float) -> float:
+        """Перцентиль задержки доставки от начала рассылки (секунды)"""
+        if not self.latencies:
+            return 0.0
+        values = sorted(self.latencies)
+        return values[min(len(values) - 1, int(percentile / 100 * len(values)))]
+
+    def summary(self) -> str:
+        """Краткий отчет для лога"""
+        return (
+            f"📨 Рассылка: {self.sent}/{self.total} доставлено, ошибок {self.failed}, "
+            f"заблокировали {len(self.blocked)}, повторов {self.retries} | "
+            f"{self.duration:.1f} с, {self.throughput:.1f} сообщ/с, "
+            f"задержка p50 {self.latency(50):.2f} с, p95 {self.latency(95):.2f} с"
+        )
+
+
+class Broadcaster:
+    """Рассылка одного текста множеству чатов через пул воркеров"""
+
+    def __init__(self, bot, rate: float = GLOBAL_RATE, per_chat_interval: float = PER_CHAT_INTERVAL,
+                 workers: int = WORKERS, max_retries: int = MAX_RETRIES):
+        """
+        Args:
+            bot: Объект с async методом send_message(chat_id=..., text=...)
+            rate: Глобальный лимит сообщений в секунду
+            per_chat_interval: Минимальный интервал между сообщениями в один чат
+            workers: Количество одновременно отправляемых сообщений
+            max_retries: Повторов при сетевых ошибках
+        """
+        self.bot = bot
+        self.bucket = TokenBucket(rate)
+        self.chat_limiter = ChatLimiter(per_chat_interval)
+        self.workers = workers
+        self.max_retries = max_retries
+
+    async def _send(self, chat_id: int, text: str, attempt: int,
+                    queue: asyncio.Queue, report: BroadcastReport):
+        await self.bucket.acquire()
+        await self.chat_limiter.wait(chat_id)
+        try:
+            await self.bot.send_message(chat_id=chat_id, text=text)
+        except RetryAfter as e:
+            # Флуд-контроль действует на весь бот - останавливаем всех воркеров
+            self.bucket.pause(retry_seconds(e))
+            report.retries += 1
+            queue.put_nowait((chat_id, text, attempt))
+        except ChatMigrated as e:
+            report.migrated[chat_id] = e.new_chat_id
+            queue.put_nowait((e.new_chat_id, text, attempt))
+        except Forbidden:
+            report.blocked.append(chat_id)
+        except BadRequest as e:
+            if any(reason in str(e).lower() for reason in _GONE_CHAT_ERRORS):
+                report.blocked.append(chat_id)
+            else:
+                print(f"Ошибка отправки сообщения пользователю {chat_id}: {e}")
+                report.failed += 1
+        except NetworkError as e:
+            if attempt < self.max_retries:
+                report.retries += 1
+                await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+                queue.put_nowait((chat_id, text, attempt + 1))
+            else:
+                print(f"Ошибка отправки сообщения пользователю {chat_id}: {e}")
+                report.failed += 1
+        except Exception as e:
+            print(f"Ошибка отправки сообщения пользователю {chat_id}: {e}")
+            report.failed += 1
+        else:
+            report.sent += 1
+            report.latencies.append(time.monotonic() - report.started)
+
+    async def _worker(self, queue: asyncio.Queue, report: BroadcastReport):
+        while True:
+            chat_id, text, attempt = await queue.get()
+            try:
+                await self._send(chat_id, text, attempt, queue, report)
+            finally:
+                queue.task_done()
+
+    async def broadcast(self, chat_ids: Iterable[int], text: str) -> BroadcastReport:
+        """Отправляет один text во все чаты"""
+        return await self.send_all({chat_id: text for chat_id in chat_ids})
+
+    async def send_all(self, messages: Dict[int, str]) -> BroadcastReport:
+        """
+        Отправляет каждому чату свой текст
+
+        Returns:
+            Отчет о рассылке (blocked - чаты для удаления из подписчиков)
+        """
+        queue = asyncio.Queue()
+        for chat_id, text in messages.items():
+            queue.put_nowait((chat_id, text, 0))
+
+        report = BroadcastReport(queue.qsize())
+        self.chat_limiter.prune()
+        workers = [
+            asyncio.create_task(self._worker(queue, report))
+            for _ in range(min(self.workers, report.total))
+        ]
+        try:
+            await queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        report.duration = time.monotonic() - report.started
+        return report
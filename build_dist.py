@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Сборка сайта в dist/ для GitHub Pages
+
+- данные экспортируются site_export.py, первая страница вписывается в index.html
+- CSV для страницы получает имя с хэшем содержимого (fitness_trainers_viral.3f9a...csv),
+  ссылки в index.html переписываются - повторный визит берет файл из кэша.
+  JSON шарды уже лежат в папках версий (хэш CSV), их имена не меняются
+- рядом с каждым текстовым файлом - сжатые .gz и .br (brotli, если установлен)
+  для хостинга, который отдает готовые сжатые файлы (nginx gzip_static, CDN)
+- отчет о размерах по группам файлов сравнивается с прошлой сборкой
+  (build_report.json) и публикуется вместе с сайтом - CI собирает с чистого
+  checkout и восстанавливает site_data/ и отчет из прошлой публикации (gh-pages)
+- leaderboard.json (движение в рейтинге) обновляется по состоянию сайта
+  в site_data/ - отдельно от бота
+- версии шардов, снимки и дельты, на которые больше не ссылаются manifest
+  и versions.json, удаляются перед сборкой
+
+Неизмененные файлы не сжимаются заново - сжатые варианты берутся из прошлой сборки.
+
+Запуск: python build_dist.py [--output dist]
+
+Требования:
+pip install numpy
+pip install brotli  (необязательно, для .br)
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime
+from typing import Dict, List, Optional
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from leaderboard import LEADERBOARD_JSON, export_leaderboard
+from site_export import SITE_DATA_DIR, export_site, prerender_html, prune_site_data
+
+DIST_DIR = os.getenv('DIST_DIR', 'dist')
+BUILD_REPORT = os.getenv('BUILD_REPORT_FILE', 'build_report.json')
+
+DATA_FILE = 'fitness_trainers_viral.csv'
+TEMPLATE = 'index.html'
+
+# Публикуются как есть (старые страницы и прямые ссылки на базы)
+PUBLIC_FILES = (
+    '.nojekyll', 'index_old.html', 'fitness_trainers_list.html', 'fitness_trainers_extended.html',
+    DATA_FILE, 'fitness_trainers_complete.csv', 'fitness_trainers_top50.csv',
+    'fitness_trainers_1000plus.csv',
+)
+
+# Что сжимать и с какого размера (меньшие файлы сжатие почти не уменьшает)
+COMPRESS_EXTENSIONS = ('.html', '.csv', '.json', '.js', '.css', '.svg', '.txt')
+MIN_COMPRESS_SIZE = 512
+
+HASH_LENGTH = 10
+
+
+def content_hash(data: bytes) -> str:
+    """Короткий хэш содержимого для имени файла"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()[:HASH_LENGTH]
+
+
+def hashed_name(filename: str, data: bytes) -> str:
+    """name.csv -> name.<хэш>.csv"""
+    root, ext = os.path.splitext(filename)
+    return f"{root}.{content_hash(data)}{ext}"
+
+
+def file_group(path: str) -> str:
+    """Группа файла для отчета о размерах"""
+    parts = path.split('/')
+    if parts[0] != os.path.basename(SITE_DATA_DIR):
+        return os.path.splitext(path)[1].lstrip('.') or 'other'
+    if len(parts) == 2:
+        return 'manifest' if path.endswith('.json') else 'other'
+    if parts[1] in ('snapshots', 'deltas'):
+        return parts[1]
+    return 'search' if parts[2] == 'search' else 'shards'
+
+
+def compress(path: str, old_dir: Optional[str]) -> List[int]:
+    """
+    Пишет path.gz и path.br рядом с файлом
+
+    Args:
+        path: Файл сборки
+        old_dir: Папка того же файла в прошлой сборке (None - сборки не было)
+
+    Returns:
+        [исходный размер, gzip, brotli] (0 - вариант не создан)
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    sizes = [len(data), 0, 0]
+    if len(data) < MIN_COMPRESS_SIZE or not path.endswith(COMPRESS_EXTENSIONS):
+        return sizes
+
+    # Тот же файл в прошлой сборке - сжатые варианты переносятся без пересжатия
+    old = None if old_dir is None else os.path.join(old_dir, os.path.basename(path))
+    variants = (('.gz', lambda d: gzip.compress(d, compresslevel=9, mtime=0)),
+                ('.br', lambda d: brotli.compress(d, quality=11) if brotli else None))
+    for i, (suffix, pack) in enumerate(variants, start=1):
+        if old is not None and os.path.exists(old + suffix) and _same_file(old, data):
+            shutil.copyfile(old + suffix, path + suffix)
+            sizes[i] = os.path.getsize(path + suffix)
+            continue
+        packed = pack(data)
+        # Сжатие, которое не уменьшает файл, не публикуется
+        if packed is not None and len(packed) < len(data):
+            with open(path + suffix, 'wb') as f:
+                f.write(packed)
+            sizes[i] = len(packed)
+    return sizes
+
+
+def _same_file(path: str, data: bytes) -> bool:
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        with open(path, 'rb') as f:
+            return f.read() == data
+    except FileNotFoundError:
+        return False
+
+
+def build_dist(csv_file: str = DATA_FILE, output_dir: str = DIST_DIR,
+               data_dir: str = SITE_DATA_DIR) -> dict:
+    """
+    Собирает сайт в output_dir
+
+    Returns:
+        Отчет: размеры каждого файла и итоги по группам
+    """
+    manifest = export_site(csv_file, data_dir)
+    # Восстановленные из прошлой публикации данные могли не пересобираться
+    pruned = prune_site_data(data_dir)
+
+    # Сборка во временную папку, прошлая dist/ - источник готовых сжатых файлов
+    build_dir = f"{output_dir}.tmp"
+    shutil.rmtree(build_dir, ignore_errors=True)
+    os.makedirs(build_dir)
+    previous_dir = output_dir if os.path.isdir(output_dir) else None
+
+    # До копирования site_data/ - туда пишется состояние рейтинга сайта
+    export_leaderboard(csv_file, os.path.join(build_dir, LEADERBOARD_JSON), data_dir)
+
+    # Данные сайта: manifest, versions, текущая и прошлая версии шардов, снимки, дельты
+    # (site_data/, восстановленная из опубликованной dist/, содержит .gz/.br - они не копируются)
+    shutil.copytree(data_dir, os.path.join(build_dir, os.path.basename(SITE_DATA_DIR)),
+                    ignore=shutil.ignore_patterns('*.tmp', '*.gz', '*.br'))
+
+    for filename in PUBLIC_FILES:
+        if os.path.exists(filename):
+            shutil.copyfile(filename, os.path.join(build_dir, filename))
+
+    with open(TEMPLATE, 'r', encoding='utf-8') as f:
+        page = f.read()
+    # Файлы, на которые ссылается index.html, публикуются с хэшем в имени
+    renamed = {}
+    for filename, source in ((DATA_FILE, csv_file),):
+        with open(source, 'rb') as f:
+            data = f.read()
+        renamed[filename] = hashed_name(filename, data)
+        with open(os.path.join(build_dir, renamed[filename]), 'wb') as f:
+            f.write(data)
+        # В index.html имена файлов стоят в кавычках (href, константы JS)
+        for quote in ('"', "'"):
+            page = page.replace(f"{quote}{filename}{quote}", f"{quote}{renamed[filename]}{quote}")
+
+    index_file = os.path.join(build_dir, 'index.html')
+    with open(index_file, 'w', encoding='utf-8') as f:
+        f.write(page)
+    prerender_html(index_file, manifest, data_dir)
+
+    files: Dict[str, List[int]] = {}
+    for root, _, names in os.walk(build_dir):
+        for name in sorted(names):
+            if name.endswith(('.gz', '.br')):
+                continue
+            path = os.path.join(root, name)
+            relative = os.path.relpath(path, build_dir).replace(os.sep, '/')
+            old_dir = None if previous_dir is None else os.path.join(previous_dir, os.path.dirname(relative))
+            files[relative] = compress(path, old_dir)
+
+    shutil.rmtree(output_dir, ignore_errors=True)
+    os.replace(build_dir, output_dir)
+
+    groups: Dict[str, Dict[str, int]] = {}
+    for relative, (raw, gz, br) in files.items():
+        group = groups.setdefault(file_group(relative), {'files': 0, 'raw': 0, 'gzip': 0, 'brotli': 0})
+        group['files'] += 1
+        group['raw'] += raw
+        # Несжатый вариант отдается как есть
+        group['gzip'] += gz or raw
+        group['brotli'] += br or gz or raw
+
+    return {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'version': manifest['base'],
+        'renamed': renamed,
+        'pruned': pruned,
+        'brotli': brotli is not None,
+        'groups': groups,
+        'files': files,
+    }
+
+
+def format_size(size: int) -> str:
+    """Размер в читаемом виде"""
+    for unit in ('Б', 'КБ', 'МБ'):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == 'Б' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} ГБ"
+
+
+def print_report(report: dict, previous: Optional[dict]):
+    """Таблица размеров по группам с изменением относительно прошлой сборки"""
+    old_groups = previous.get('groups', {}) if previous else {}
+    columns = ('raw', 'gzip', 'brotli') if report['brotli'] else ('raw', 'gzip')
+
+    print(f"{'Группа':<12}{'Файлов':>8}" + ''.join(f"{c:>12}" for c in columns) + f"{'Δ gzip':>12}")
+    totals = {'files': 0, 'raw': 0, 'gzip': 0, 'brotli': 0}
+    old_total = 0
+    for name in sorted(report['groups']):
+        group = report['groups'][name]
+        for key in totals:
+            totals[key] += group[key]
+        old = old_groups.get(name)
+        old_total += old['gzip'] if old else 0
+        delta = format_size(group['gzip'] - old['gzip']) if old else 'новая'
+        print(f"{name:<12}{group['files']:>8}" + ''.join(f"{format_size(group[c]):>12}" for c in columns)
+              + f"{delta:>12}")
+    delta = format_size(totals['gzip'] - old_total) if previous else '-'
+    print(f"{'Всего':<12}{totals['files']:>8}" + ''.join(f"{format_size(totals[c]):>12}" for c in columns)
+          + f"{delta:>12}")
+
+
+def main():
+    """Основная функция"""
+    parser = argparse.ArgumentParser(description="Сборка сайта в dist/")
+    parser.add_argument('file', nargs='?', default=DATA_FILE, help="CSV файл")
+    parser.add_argument('--output', default=DIST_DIR, help="Папка сборки")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.file):
+        print(f"❌ Файл {args.file} не найден")
+        return
+
+    try:
+        with open(BUILD_REPORT, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+    except (FileNotFoundError, ValueError):
+        previous = None
+
+    report = build_dist(args.file, args.output)
+
+    print("=" * 70)
+    print(f"📦 Сборка {args.output}/ (данные версии {report['version']})")
+    print("=" * 70)
+    for original, renamed in report['renamed'].items():
+        print(f"🔗 {original} -> {renamed}")
+    if not report['brotli']:
+        print("⚠️ brotli не установлен, .br не созданы (pip install brotli)")
+    if report['pruned']:
+        print(f"🧹 Удалены старые версии данных: {len(report['pruned'])}")
+    print_report(report, previous)
+
+    # Копия в dist/ - следующая сборка в CI восстановит отчет из публикации
+    for path in (BUILD_REPORT, os.path.join(args.output, os.path.basename(BUILD_REPORT))):
+        tmp_file = f"{path}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_file, path)
+
+
+if __name__ == "__main__":
+    main()
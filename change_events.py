@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Уведомления об изменении файлов данных (коллекторы -> бот)
+
+Скрипты, которые записывают CSV (save_bloggers, write_stage), публикуют
+событие в локальный Unix datagram сокет. Бот слушает сокет и проверяет
+новые вирусные ролики сразу после записи файла, а не раз в 30 минут.
+
+Публикация никогда не блокирует и не падает: если бот не запущен или
+платформа не поддерживает Unix сокеты, событие просто теряется, а бот
+найдет изменения периодической проверкой (она остается запасным путем).
+
+Запуск:
+python change_events.py listen               # печатать события
+python change_events.py publish <файл.csv>   # опубликовать вручную
+"""
+
+import asyncio
+import json
+import os
+import socket
+import sys
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+CHANGE_SOCKET = os.getenv(
+    'CHANGE_EVENTS_SOCKET',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.change_events.sock')
+)
+
+# Несколько записей подряд (например, два файла) объединяются в одну проверку
+DEBOUNCE = 0.2
+
+SUPPORTED = hasattr(socket, 'AF_UNIX')
+
+
+def publish(filename: str, kind: str = 'updated', path: str = CHANGE_SOCKET) -> bool:
+    """
+    Публикует событие изменения файла
+
+    Returns:
+        True, если событие доставлено слушателю
+    """
+    if not SUPPORTED:
+        return False
+
+    message = json.dumps({
+        'file': os.path.abspath(filename),
+        'kind': kind,
+        'at': time.time(),
+    }).encode('utf-8')
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+            sock.setblocking(False)
+            sock.sendto(message, path)
+    except OSError:
+        # Нет слушателя или очередь сокета переполнена - сработает запасной опрос
+        return False
+    return True
+
+
+class _Protocol(asyncio.DatagramProtocol):
+    def __init__(self, listener: 'ChangeListener'):
+        self.listener = listener
+
+    def datagram_received(self, data: bytes, addr):
+        self.listener.received(data)
+
+
+class ChangeListener:
+    """Слушатель событий изменения файлов в event loop"""
+
+    def __init__(self, callback: Callable[[List[Dict]], Awaitable], files: Optional[Iterable[str]] = None,
+                 path: str = CHANGE_SOCKET, debounce: float = DEBOUNCE):
+        """
+        Args:
+            callback: async функция, получает список событий после паузы debounce
+            files: Интересующие файлы (None - все)
+            path: Путь Unix сокета
+            debounce: Пауза для объединения событий (секунды)
+        """
+        self.callback = callback
+        self.files = {os.path.abspath(f) for f in files} if files else None
+        self.path = path
+        self.debounce = debounce
+        self._transport = None
+        self._pending: List[Dict] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def start(self) -> bool:
+        """Начинает слушать сокет; False - события недоступны, работает только опрос"""
+        if not SUPPORTED:
+            return False
+
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            sock.bind(self.path)
+        except OSError as e:
+            sock.close()
+            print(f"⚠️  Не удалось открыть сокет событий {self.path}: {e}")
+            return False
+
+        loop = asyncio.get_running_loop()
+        self._transport, _ = await loop.create_datagram_endpoint(lambda: _Protocol(self), sock=sock)
+        return True
+
+    def received(self, data: bytes):
+        try:
+            event = json.loads(data.decode('utf-8'))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            return
+        if self.files is not None and event.get('file') not in self.files:
+            return
+
+        self._pending.append(event)
+        if self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.debounce, self._fire)
+
+    def _fire(self):
+        events, self._pending, self._timer = self._pending, [], None
+        asyncio.ensure_future(self.callback(events))
+
+    def close(self):
+        if self._timer is not None:
+            self._timer.cancel()
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+
+def main():
+    """Основная функция"""
+    if len(sys.argv) < 2 or sys.argv[1] not in ('listen', 'publish'):
+        print("Использование: python change_events.py listen | publish <файл.csv>")
+        return
+
+    if sys.argv[1] == 'publish':
+        for filename in sys.argv[2:]:
+            status = "✅ доставлено" if publish(filename) else "⚠️  слушатель не запущен"
+            print(f"{filename}: {status}")
+        return
+
+    async def show(events: List[Dict]):
+        for event in events:
+            delay = (time.time() - event['at']) * 1000
+            print(f"📣 {event['kind']}: {event['file']} ({delay:.1f} мс)")
+
+    async def listen():
+        listener = ChangeListener(show)
+        if not await listener.start():
+            return
+        print(f"👂 Слушаю {listener.path} (Ctrl+C для остановки)")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            listener.close()
+
+    try:
+        asyncio.run(listen())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
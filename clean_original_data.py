@@ -5,27 +5,16 @@
 Ничего не генерирует, использует только реальные данные
 """
 
-import csv
-import re
 import random
+from collections import Counter
 from datetime import datetime, timedelta
+from typing import Tuple
 
-def has_cyrillic_in_url(url):
-    """Проверяет наличие кириллицы в URL"""
-    return bool(re.search(r'[а-яА-ЯёЁ]', url))
-
-def parse_audience(audience_str):
-    """Преобразует аудиторию в число"""
-    audience_str = audience_str.strip().replace('+', '').replace(',', '')
-    if 'M' in audience_str or 'М' in audience_str:
-        return int(float(audience_str.replace('M', '').replace('М', '')) * 1000000)
-    elif 'K' in audience_str or 'К' in audience_str:
-        return int(float(audience_str.replace('K', '').replace('К', '')) * 1000)
-    else:
-        try:
-            return int(audience_str)
-        except:
-            return 10000
+from blogger_model import Blogger, trend_code
+from stream_pipeline import (
+    WORKERS, read_stage, filter_cyrillic_urls, audience_stage,
+    metrics_stage, apply_metrics, tap, write_stage
+)
 
 def generate_metrics(platform, subscribers):
     """Генерирует метрики вирусности"""
@@ -51,80 +40,36 @@ def generate_metrics(platform, subscribers):
     views = int(subscribers * coef)
     avg_views = int(views * random.uniform(0.7, 1.3))
 
-    # Тренд
-    if coef >= 10:
-        trend, trend_value = "🚀 Мега", "mega"
-    elif coef >= 5:
-        trend, trend_value = "🔥 Вирусно", "viral"
-    elif coef >= 2:
-        trend_value = random.choice(["growing", "stable"])
-        trend = "📈 Растет" if trend_value == "growing" else "➡️ Стабильно"
-    else:
-        trend_value = random.choice(["stable", "declining"])
-        trend = "➡️ Стабильно" if trend_value == "stable" else "📉 Падает"
-
-    def format_number(num):
-        if num >= 1000000:
-            return f"{num/1000000:.1f}M"
-        elif num >= 1000:
-            return f"{num/1000:.0f}K"
-        return str(num)
-
     return {
         'Формат_видео': short_format,
         'Просмотры_последнего': views,
-        'Просмотры_последнего_форматир': format_number(views),
         'Средние_просмотры': avg_views,
-        'Средние_просмотры_форматир': format_number(avg_views),
         'Коэффициент_вирусности': round(coef, 2),
         'Видео_в_месяц': random.randint(5, 30),
-        'Последнее_обновление': (datetime.now() - timedelta(days=random.randint(1, 30))).strftime('%Y-%m-%d %H:%M'),
-        'Тренд': trend,
-        'Тренд_значение': trend_value
+        'Обновлено': (datetime.now() - timedelta(days=random.randint(1, 30))).isoformat(timespec='seconds'),
+        'Тренд_значение': trend_code(coef)
     }
 
-def clean_and_enhance():
-    """Очищает и улучшает исходные данные"""
-    clean_data = []
-
-    with open('fitness_trainers_complete.csv', 'r', encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f)
-
-        for row in reader:
-            url = row.get('Ссылка', '')
-
-            # Пропускаем URL с кириллицей
-            if has_cyrillic_in_url(url):
-                continue
-
-            # Добавляем метрики
-            subscribers = parse_audience(row.get('Аудитория', '10K'))
-            metrics = generate_metrics(row.get('Платформа', ''), subscribers)
-
-            # Объединяем данные
-            enhanced_row = {**row, **metrics}
-            clean_data.append(enhanced_row)
+def enrich_blogger(item: Tuple[Blogger, int]) -> Blogger:
+    """Этап метрик: добавляет метрики вирусности к записи"""
+    blogger, subscribers = item
+    return apply_metrics(blogger, generate_metrics(blogger.platform, subscribers))
 
-    # Сохраняем
-    fieldnames = [
-        'Имя', 'Никнейм/Название', 'Платформа', 'Ссылка', 'Аудитория', 'Описание',
-        'Формат_видео', 'Просмотры_последнего', 'Просмотры_последнего_форматир',
-        'Средние_просмотры', 'Средние_просмотры_форматир', 'Коэффициент_вирусности',
-        'Видео_в_месяц', 'Последнее_обновление', 'Тренд', 'Тренд_значение'
-    ]
+def clean_and_enhance(input_csv: str = 'fitness_trainers_complete.csv',
+                      output_csv: str = 'fitness_trainers_viral.csv',
+                      workers: int = WORKERS):
+    """Очищает и улучшает исходные данные (потоково, постоянная память)"""
+    platforms = Counter()
 
-    with open('fitness_trainers_viral.csv', 'w', encoding='utf-8-sig', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(clean_data)
+    # Чтение -> фильтр URL с кириллицей -> аудитория -> метрики -> запись
+    bloggers = filter_cyrillic_urls(read_stage(input_csv))
+    items = audience_stage(bloggers, missing='10K', default=10000)
+    enriched = metrics_stage(items, enrich_blogger, workers=workers)
+    count = write_stage(tap(enriched, lambda b: platforms.update((b.platform,))), output_csv)
 
-    print(f"✅ Обработано: {len(clean_data)} блогеров")
+    print(f"✅ Обработано: {count} блогеров")
     print(f"📊 Статистика по платформам:")
-    platforms = {}
-    for row in clean_data:
-        p = row['Платформа']
-        platforms[p] = platforms.get(p, 0) + 1
-    for p, count in sorted(platforms.items(), key=lambda x: x[1], reverse=True):
+    for p, count in platforms.most_common():
         print(f"   {p}: {count}")
 
 if __name__ == '__main__':
@@ -5,11 +5,10 @@
 Использует instagrapi для получения публичных данных
 """
 
-import csv
 import json
 import time
 import os
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 
 try:
@@ -18,6 +17,8 @@ except ImportError:
     print("❌ Установите библиотеку: pip install instagrapi")
     exit(1)
 
+from blogger_model import COLLECTED_FILE, VIRAL_FILE, Blogger, load_bloggers, save_bloggers, format_number, now_iso, trend_code
+
 
 class InstagramReelsCollector:
     """Сборщик данных из Instagram Reels"""
@@ -27,6 +28,8 @@ class InstagramReelsCollector:
         self.username = username
         self.password = password
         self.logged_in = False
+        # user_id не меняется: повторное обновление аккаунта - без лишнего запроса
+        self.user_ids: Dict[str, int] = {}
 
     def login(self):
         """Авторизация в Instagram"""
@@ -75,7 +78,8 @@ class InstagramReelsCollector:
         """Получает информацию о пользователе"""
 
         try:
-            user_id = self.client.user_id_from_username(username)
+            user_id = self.user_ids.get(username) or self.client.user_id_from_username(username)
+            self.user_ids[username] = user_id
             user_info = self.client.user_info(user_id)
 
             return {
@@ -188,27 +192,64 @@ class InstagramReelsCollector:
             'reels_count': len(reels)
         }
 
-    def format_number(self, num: int) -> str:
-        """Форматирует число в читаемый вид"""
-        if num >= 1_000_000:
-            return f"{num/1_000_000:.1f}M"
-        elif num >= 1_000:
-            return f"{num/1_000:.0f}K"
-        return str(num)
-
-    def get_trend(self, viral_coefficient: float) -> tuple:
-        """Определяет тренд на основе вирусного коэффициента"""
-
-        if viral_coefficient >= 10:
-            return "🚀 Мега", "mega"
-        elif viral_coefficient >= 5:
-            return "🔥 Вирусно", "viral"
-        elif viral_coefficient >= 2:
-            return "📈 Растет", "growing"
-        elif viral_coefficient >= 1:
-            return "➡️ Стабильно", "stable"
-        else:
-            return "📉 Падает", "declining"
+    def update_blogger(self, account: Blogger) -> bool:
+        """Обновляет метрики аккаунта (False - данные не получены)"""
+
+        # Извлекаем username
+        username = self.extract_username_from_url(account.url)
+
+        if not username:
+            print(f"   ❌ Не удалось извлечь username из URL")
+            return False
+
+        print(f"   👤 Username: @{username}")
+
+        # Получаем информацию о пользователе
+        user_info = self.get_user_info(username)
+
+        if not user_info:
+            print(f"   ❌ Не удалось получить информацию")
+            return False
+
+        if user_info['is_private']:
+            print(f"   ⚠️  Приватный аккаунт - пропускаем")
+            return False
+
+        print(f"   👥 Подписчики: {format_number(user_info['followers'])}")
+
+        # Получаем Reels за последние 30 дней
+        reels = self.get_user_reels(user_info['user_id'], count=10, days=30)
+        print(f"   🎬 Найдено Reels за последний месяц: {len(reels)}")
+
+        if not reels:
+            print(f"   ⚠️  Нет Reels")
+            # Обновляем хотя бы подписчиков
+            account.audience_count = user_info['followers']
+            account.last_updated = now_iso()
+            return True
+
+        # Рассчитываем метрики
+        metrics = self.calculate_viral_metrics(reels, user_info['followers'])
+
+        if metrics['reels_count'] > 0:
+            # Показываем период роликов
+            oldest_reel = max([r['days_old'] for r in reels])
+            newest_reel = min([r['days_old'] for r in reels])
+            print(f"   📅 Период: {oldest_reel}-{newest_reel} дней назад")
+            print(f"   📊 Средние просмотры: {format_number(metrics['avg_views'])}")
+            print(f"   💖 Средние лайки: {format_number(metrics['avg_likes'])}")
+            print(f"   🔥 Коэффициент: {metrics['viral_coefficient']}x")
+
+        # Обновляем данные
+        account.audience_count = user_info['followers']
+        account.video_format = 'Reels'
+        account.views = metrics['max_views']
+        account.avg_views = metrics['avg_views']
+        account.viral_coef = metrics['viral_coefficient']
+        account.videos_per_month = metrics['reels_count']
+        account.last_updated = now_iso()
+        account.trend_value = trend_code(metrics['viral_coefficient'])
+        return True
 
 
 def collect_instagram_data(username: str, password: str, input_csv: str, output_csv: str):
@@ -229,15 +270,11 @@ def collect_instagram_data(username: str, password: str, input_csv: str, output_
     instagram_accounts = []
     other_accounts = []
 
-    with open(input_csv, 'r', encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f)
-        headers = reader.fieldnames
-
-        for row in reader:
-            if row.get('Платформа') == 'Instagram':
-                instagram_accounts.append(row)
-            else:
-                other_accounts.append(row)
+    for blogger in load_bloggers(input_csv):
+        if blogger.platform == 'Instagram':
+            instagram_accounts.append(blogger)
+        else:
+            other_accounts.append(blogger)
 
     print(f"\n📊 Найдено Instagram аккаунтов: {len(instagram_accounts)}")
     print(f"📊 Других платформ: {len(other_accounts)}")
@@ -248,83 +285,18 @@ def collect_instagram_data(username: str, password: str, input_csv: str, output_
     failed_count = 0
 
     for i, account in enumerate(instagram_accounts, 1):
-        name = account.get('Имя', 'Unknown')
-        url = account.get('Ссылка', '')
+        name = account.name or 'Unknown'
+        url = account.url
 
         print(f"[{i}/{len(instagram_accounts)}] {name}")
         print(f"   URL: {url}")
 
-        # Извлекаем username
-        username = collector.extract_username_from_url(url)
-
-        if not username:
-            print(f"   ❌ Не удалось извлечь username из URL")
-            failed_count += 1
-            updated_accounts.append(account)
-            time.sleep(1)
-            continue
-
-        print(f"   👤 Username: @{username}")
-
-        # Получаем информацию о пользователе
-        user_info = collector.get_user_info(username)
-
-        if not user_info:
-            print(f"   ❌ Не удалось получить информацию")
-            failed_count += 1
-            updated_accounts.append(account)
-            time.sleep(2)
-            continue
-
-        if user_info['is_private']:
-            print(f"   ⚠️  Приватный аккаунт - пропускаем")
+        updated_accounts.append(account)
+        if not collector.update_blogger(account):
             failed_count += 1
-            updated_accounts.append(account)
-            time.sleep(2)
-            continue
-
-        print(f"   👥 Подписчики: {collector.format_number(user_info['followers'])}")
-
-        # Получаем Reels за последние 30 дней
-        reels = collector.get_user_reels(user_info['user_id'], count=10, days=30)
-        print(f"   🎬 Найдено Reels за последний месяц: {len(reels)}")
-
-        if not reels:
-            print(f"   ⚠️  Нет Reels")
-            # Обновляем хотя бы подписчиков
-            account['Аудитория'] = collector.format_number(user_info['followers'])
-            updated_accounts.append(account)
             time.sleep(2)
             continue
 
-        # Рассчитываем метрики
-        metrics = collector.calculate_viral_metrics(reels, user_info['followers'])
-
-        if metrics['reels_count'] > 0:
-            # Показываем период роликов
-            oldest_reel = max([r['days_old'] for r in reels])
-            newest_reel = min([r['days_old'] for r in reels])
-            print(f"   📅 Период: {oldest_reel}-{newest_reel} дней назад")
-            print(f"   📊 Средние просмотры: {collector.format_number(metrics['avg_views'])}")
-            print(f"   💖 Средние лайки: {collector.format_number(metrics['avg_likes'])}")
-            print(f"   🔥 Коэффициент: {metrics['viral_coefficient']}x")
-
-        # Обновляем данные
-        trend, trend_value = collector.get_trend(metrics['viral_coefficient'])
-
-        account['Аудитория'] = collector.format_number(user_info['followers'])
-        account['Формат_видео'] = 'Reels'
-        account['Просмотры_последнего'] = metrics['max_views']
-        account['Просмотры_последнего_форматир'] = collector.format_number(metrics['max_views'])
-        account['Средние_просмотры'] = metrics['avg_views']
-        account['Средние_просмотры_форматир'] = collector.format_number(metrics['avg_views'])
-        account['Коэффициент_вирусности'] = metrics['viral_coefficient']
-        account['Видео_в_месяц'] = metrics['reels_count']
-        account['Последнее_обновление'] = datetime.now().strftime('%Y-%m-%d %H:%M')
-        account['Тренд'] = trend
-        account['Тренд_значение'] = trend_value
-
-        updated_accounts.append(account)
         success_count += 1
 
         print(f"   ✅ Обновлено!\n")
@@ -335,17 +307,7 @@ def collect_instagram_data(username: str, password: str, input_csv: str, output_
     # Сохраняем результаты
     all_data = updated_accounts + other_accounts
 
-    fieldnames = [
-        'Имя', 'Никнейм/Название', 'Платформа', 'Ссылка', 'Аудитория', 'Описание',
-        'Формат_видео', 'Просмотры_последнего', 'Просмотры_последнего_форматир',
-        'Средние_просмотры', 'Средние_просмотры_форматир', 'Коэффициент_вирусности',
-        'Видео_в_месяц', 'Последнее_обновление', 'Тренд', 'Тренд_значение'
-    ]
-
-    with open(output_csv, 'w', encoding='utf-8-sig', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
-        writer.writeheader()
-        writer.writerows(all_data)
+    save_bloggers(all_data, output_csv)
 
     print("=" * 80)
     print("✅ СБОР ДАННЫХ ЗАВЕРШЕН!")
@@ -357,13 +319,8 @@ def collect_instagram_data(username: str, password: str, input_csv: str, output_
     print("=" * 80)
 
 
-if __name__ == '__main__':
-    print("=" * 80)
-    print("📸 СБОР ДАННЫХ ИЗ INSTAGRAM REELS")
-    print("=" * 80)
-    print()
-
-    # Получаем учетные данные Instagram
+def load_credentials() -> Tuple[Optional[str], Optional[str]]:
+    """Логин и пароль из INSTAGRAM_USERNAME/INSTAGRAM_PASSWORD или файла .instagram_credentials"""
     ig_username = os.getenv('INSTAGRAM_USERNAME')
     ig_password = os.getenv('INSTAGRAM_PASSWORD')
 
@@ -376,6 +333,18 @@ if __name__ == '__main__':
                     ig_username = lines[0].strip()
                     ig_password = lines[1].strip()
 
+    return ig_username or None, ig_password or None
+
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print("📸 СБОР ДАННЫХ ИЗ INSTAGRAM REELS")
+    print("=" * 80)
+    print()
+
+    # Получаем учетные данные Instagram
+    ig_username, ig_password = load_credentials()
+
     if not ig_username or not ig_password:
         print("❌ Instagram учетные данные не найдены!")
         print("\nСоздайте файл .instagram_credentials с двумя строками:")
@@ -394,6 +363,6 @@ if __name__ == '__main__':
     collect_instagram_data(
         username=ig_username,
         password=ig_password,
-        input_csv='fitness_trainers_viral.csv',
-        output_csv='fitness_trainers_viral_real.csv'
+        input_csv=VIRAL_FILE,
+        output_csv=COLLECTED_FILE
     )
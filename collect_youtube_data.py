@@ -4,12 +4,10 @@
 Сбор реальных данных о фитнес-блогерах через YouTube Data API v3
 """
 
-import csv
 import json
 import time
 import os
 from typing import Dict, List, Optional
-from datetime import datetime
 
 try:
     import requests
@@ -17,6 +15,8 @@ except ImportError:
     print("❌ Установите библиотеку requests: pip install requests")
     exit(1)
 
+from blogger_model import COLLECTED_FILE, VIRAL_FILE, Blogger, load_bloggers, save_bloggers, format_number, now_iso, trend_code
+
 
 class YouTubeDataCollector:
     """Сборщик данных с YouTube Data API v3"""
@@ -26,6 +26,10 @@ class YouTubeDataCollector:
         self.base_url = "https://www.googleapis.com/youtube/v3"
         self.quota_used = 0
         self.quota_limit = 10000  # Дневной лимит
+        # Одно соединение на все запросы (keep-alive) и найденные ID каналов:
+        # поиск по @username стоит 100 единиц квоты
+        self.session = requests.Session()
+        self.channel_ids: Dict[str, str] = {}
 
     def extract_channel_id(self, url: str) -> Optional[str]:
         """Извлекает ID канала из различных форматов YouTube URL"""
@@ -34,17 +38,23 @@ class YouTubeDataCollector:
         if '/channel/' in url:
             return url.split('/channel/')[-1].split('/')[0].split('?')[0]
 
+        if url in self.channel_ids:
+            return self.channel_ids[url]
+
+        channel_id = None
         # Формат: youtube.com/@username - нужен дополнительный запрос
         if '/@' in url:
             username = url.split('/@')[-1].split('/')[0].split('?')[0]
-            return self.get_channel_id_by_username(username)
+            channel_id = self.get_channel_id_by_username(username)
 
         # Формат: youtube.com/c/customname - устарел, нужен поиск
-        if '/c/' in url:
+        elif '/c/' in url:
             custom_name = url.split('/c/')[-1].split('/')[0].split('?')[0]
-            return self.get_channel_id_by_custom_name(custom_name)
+            channel_id = self.get_channel_id_by_custom_name(custom_name)
 
-        return None
+        if channel_id:
+            self.channel_ids[url] = channel_id
+        return channel_id
 
     def get_channel_id_by_username(self, username: str) -> Optional[str]:
         """Получает ID канала по @username"""
@@ -59,7 +69,7 @@ class YouTubeDataCollector:
         }
 
         try:
-            response = requests.get(endpoint, params=params, timeout=10)
+            response = self.session.get(endpoint, params=params, timeout=10)
             self.quota_used += 100  # search запрос стоит 100 единиц
 
             if response.status_code == 200:
@@ -89,7 +99,7 @@ class YouTubeDataCollector:
         }
 
         try:
-            response = requests.get(endpoint, params=params, timeout=10)
+            response = self.session.get(endpoint, params=params, timeout=10)
             self.quota_used += 3  # channels запрос стоит 3 единицы (part=statistics,snippet)
 
             if response.status_code == 200:
@@ -129,7 +139,7 @@ class YouTubeDataCollector:
         }
 
         try:
-            response = requests.get(endpoint, params=params, timeout=10)
+            response = self.session.get(endpoint, params=params, timeout=10)
             self.quota_used += 100  # search запрос
 
             if response.status_code != 200:
@@ -149,7 +159,7 @@ class YouTubeDataCollector:
                 'key': self.api_key
             }
 
-            videos_response = requests.get(videos_endpoint, params=videos_params, timeout=10)
+            videos_response = self.session.get(videos_endpoint, params=videos_params, timeout=10)
             self.quota_used += 3  # videos запрос
 
             if videos_response.status_code != 200:
@@ -232,27 +242,48 @@ class YouTubeDataCollector:
             'shorts_count': len(shorts)
         }
 
-    def format_number(self, num: int) -> str:
-        """Форматирует число в читаемый вид"""
-        if num >= 1_000_000:
-            return f"{num/1_000_000:.1f}M"
-        elif num >= 1_000:
-            return f"{num/1_000:.0f}K"
-        return str(num)
-
-    def get_trend(self, viral_coefficient: float) -> tuple:
-        """Определяет тренд на основе вирусного коэффициента"""
-
-        if viral_coefficient >= 10:
-            return "🚀 Мега", "mega"
-        elif viral_coefficient >= 5:
-            return "🔥 Вирусно", "viral"
-        elif viral_coefficient >= 2:
-            return "📈 Растет", "growing"
-        elif viral_coefficient >= 1:
-            return "➡️ Стабильно", "stable"
-        else:
-            return "📉 Падает", "declining"
+    def update_blogger(self, channel: Blogger) -> bool:
+        """Обновляет метрики канала из API (False - данные не получены)"""
+
+        # Извлекаем ID канала
+        channel_id = self.extract_channel_id(channel.url)
+
+        if not channel_id:
+            print(f"   ❌ Не удалось получить ID канала")
+            return False
+
+        print(f"   ✅ ID: {channel_id}")
+
+        # Получаем статистику канала
+        stats = self.get_channel_stats(channel_id)
+
+        if not stats:
+            print(f"   ❌ Не удалось получить статистику")
+            return False
+
+        print(f"   👥 Подписчики: {format_number(stats['subscribers'])}")
+
+        # Получаем Shorts
+        shorts = self.get_channel_shorts(channel_id, max_results=10)
+        print(f"   🎬 Найдено Shorts: {len(shorts)}")
+
+        # Рассчитываем метрики
+        metrics = self.calculate_viral_coefficient(shorts, stats['subscribers'])
+
+        if metrics['shorts_count'] > 0:
+            print(f"   📊 Средние просмотры: {format_number(metrics['avg_views'])}")
+            print(f"   🔥 Коэффициент: {metrics['viral_coefficient']}x")
+
+        # Обновляем данные
+        channel.audience_count = stats['subscribers']
+        channel.video_format = 'Shorts'
+        channel.views = metrics['max_views']
+        channel.avg_views = metrics['avg_views']
+        channel.viral_coef = metrics['viral_coefficient']
+        channel.videos_per_month = metrics['shorts_count']
+        channel.last_updated = now_iso()
+        channel.trend_value = trend_code(metrics['viral_coefficient'])
+        return True
 
 
 def collect_youtube_data(api_key: str, input_csv: str, output_csv: str):
@@ -264,15 +295,11 @@ def collect_youtube_data(api_key: str, input_csv: str, output_csv: str):
     youtube_channels = []
     other_channels = []
 
-    with open(input_csv, 'r', encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f)
-        headers = reader.fieldnames
-
-        for row in reader:
-            if row.get('Платформа') == 'YouTube':
-                youtube_channels.append(row)
-            else:
-                other_channels.append(row)
+    for blogger in load_bloggers(input_csv):
+        if blogger.platform == 'YouTube':
+            youtube_channels.append(blogger)
+        else:
+            other_channels.append(blogger)
 
     print(f"📊 Найдено YouTube каналов: {len(youtube_channels)}")
     print(f"📊 Других платформ: {len(other_channels)}")
@@ -283,63 +310,18 @@ def collect_youtube_data(api_key: str, input_csv: str, output_csv: str):
     failed_count = 0
 
     for i, channel in enumerate(youtube_channels, 1):
-        name = channel.get('Имя', 'Unknown')
-        url = channel.get('Ссылка', '')
+        name = channel.name or 'Unknown'
+        url = channel.url
 
         print(f"[{i}/{len(youtube_channels)}] {name}")
         print(f"   URL: {url}")
 
-        # Извлекаем ID канала
-        channel_id = collector.extract_channel_id(url)
-
-        if not channel_id:
-            print(f"   ❌ Не удалось получить ID канала")
-            failed_count += 1
-            updated_channels.append(channel)
-            time.sleep(0.5)
-            continue
-
-        print(f"   ✅ ID: {channel_id}")
-
-        # Получаем статистику канала
-        stats = collector.get_channel_stats(channel_id)
-
-        if not stats:
-            print(f"   ❌ Не удалось получить статистику")
+        updated_channels.append(channel)
+        if not collector.update_blogger(channel):
             failed_count += 1
-            updated_channels.append(channel)
             time.sleep(0.5)
             continue
 
-        print(f"   👥 Подписчики: {collector.format_number(stats['subscribers'])}")
-
-        # Получаем Shorts
-        shorts = collector.get_channel_shorts(channel_id, max_results=10)
-        print(f"   🎬 Найдено Shorts: {len(shorts)}")
-
-        # Рассчитываем метрики
-        metrics = collector.calculate_viral_coefficient(shorts, stats['subscribers'])
-
-        if metrics['shorts_count'] > 0:
-            print(f"   📊 Средние просмотры: {collector.format_number(metrics['avg_views'])}")
-            print(f"   🔥 Коэффициент: {metrics['viral_coefficient']}x")
-
-        # Обновляем данные
-        trend, trend_value = collector.get_trend(metrics['viral_coefficient'])
-
-        channel['Аудитория'] = collector.format_number(stats['subscribers'])
-        channel['Формат_видео'] = 'Shorts'
-        channel['Просмотры_последнего'] = metrics['max_views']
-        channel['Просмотры_последнего_форматир'] = collector.format_number(metrics['max_views'])
-        channel['Средние_просмотры'] = metrics['avg_views']
-        channel['Средние_просмотры_форматир'] = collector.format_number(metrics['avg_views'])
-        channel['Коэффициент_вирусности'] = metrics['viral_coefficient']
-        channel['Видео_в_месяц'] = metrics['shorts_count']
-        channel['Последнее_обновление'] = datetime.now().strftime('%Y-%m-%d %H:%M')
-        channel['Тренд'] = trend
-        channel['Тренд_значение'] = trend_value
-
-        updated_channels.append(channel)
         success_count += 1
 
         print(f"   ✅ Обновлено! Использовано квоты: {collector.quota_used}/{collector.quota_limit}\n")
@@ -355,17 +337,7 @@ def collect_youtube_data(api_key: str, input_csv: str, output_csv: str):
     # Сохраняем результаты
     all_data = updated_channels + other_channels
 
-    fieldnames = [
-        'Имя', 'Никнейм/Название', 'Платформа', 'Ссылка', 'Аудитория', 'Описание',
-        'Формат_видео', 'Просмотры_последнего', 'Просмотры_последнего_форматир',
-        'Средние_просмотры', 'Средние_просмотры_форматир', 'Коэффициент_вирусности',
-        'Видео_в_месяц', 'Последнее_обновление', 'Тренд', 'Тренд_значение'
-    ]
-
-    with open(output_csv, 'w', encoding='utf-8-sig', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
-        writer.writeheader()
-        writer.writerows(all_data)
+    save_bloggers(all_data, output_csv)
 
     print("=" * 80)
     print("✅ СБОР ДАННЫХ ЗАВЕРШЕН!")
@@ -378,8 +350,8 @@ def collect_youtube_data(api_key: str, input_csv: str, output_csv: str):
     print("=" * 80)
 
 
-if __name__ == '__main__':
-    # Читаем API ключ из переменной окружения или файла
+def load_api_key() -> Optional[str]:
+    """API ключ из переменной окружения YOUTUBE_API_KEY или файла .youtube_api_key"""
     api_key = os.getenv('YOUTUBE_API_KEY')
 
     if not api_key:
@@ -388,6 +360,13 @@ if __name__ == '__main__':
             with open('.youtube_api_key', 'r') as f:
                 api_key = f.read().strip()
 
+    return api_key or None
+
+
+if __name__ == '__main__':
+    # Читаем API ключ из переменной окружения или файла
+    api_key = load_api_key()
+
     if not api_key:
         print("❌ YouTube API ключ не найден!")
         print("\nКак получить API ключ:")
@@ -402,6 +381,6 @@ if __name__ == '__main__':
     # Запускаем сбор данных
     collect_youtube_data(
         api_key=api_key,
-        input_csv='fitness_trainers_viral.csv',
-        output_csv='fitness_trainers_viral_real.csv'
+        input_csv=VIRAL_FILE,
+        output_csv=COLLECTED_FILE
     )
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Демон сбора метрик: постоянные сессии и обновление по волатильности
+
+Скрипты collect_*.py при каждом запуске заново авторизуются и обходят все
+аккаунты подряд. Демон держит сборщики открытыми (HTTP соединение YouTube,
+сессия Instagram, найденные ID каналов и пользователей) и обновляет каждого
+блогера по его собственному расписанию:
+
+- у аккаунта есть время следующего обновления, очередь с приоритетом
+  (heapq, своя на платформу) выдает самый просроченный
+- интервал зависит от волатильности - насколько менялись средние просмотры
+  между обновлениями (скользящее среднее): быстро меняющиеся и вирусные
+  аккаунты обновляются раз в несколько часов, стабильные - раз в неделю
+- при ошибке интервал удваивается
+
+При том же дневном лимите API вирусные аккаунты обновляются чаще.
+Результат пишется в fitness_trainers_viral_real.csv (атомарно, с событием
+для бота) раз в DAEMON_FLUSH_INTERVAL секунд и при остановке, расписание -
+в collector_schedule.json, поэтому после перезапуска демон продолжает с
+того же места.
+
+Запуск:
+python collector_daemon.py                       # все платформы с доступом
+python collector_daemon.py --platform YouTube
+python collector_daemon.py --once                # обновить просроченные и выйти
+python collector_daemon.py --status              # очередь обновлений
+"""
+
+import argparse
+import heapq
+import json
+import os
+import signal
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from blogger_model import COLLECTED_FILE, VIRAL_FILE, Blogger, load_bloggers, save_bloggers, trend_code
+from orchestrator import instagram_access, youtube_access
+from snapshot_diff import blogger_key
+
+INPUT_FILE = VIRAL_FILE
+OUTPUT_FILE = COLLECTED_FILE
+SCHEDULE_FILE = os.getenv('COLLECTOR_SCHEDULE_FILE', 'collector_schedule.json')
+
+# Интервал обновления аккаунта без изменений и его границы (секунды)
+BASE_INTERVAL = float(os.getenv('REFRESH_BASE_INTERVAL', str(24 * 3600)))
+MIN_INTERVAL = float(os.getenv('REFRESH_MIN_INTERVAL', str(2 * 3600)))
+MAX_INTERVAL = float(os.getenv('REFRESH_MAX_INTERVAL', str(7 * 24 * 3600)))
+
+# Изменение средних просмотров на 10% между обновлениями - интервал вдвое короче
+VOLATILITY_WEIGHT = 10.0
+# Вес последнего изменения в скользящем среднем волатильности
+VOLATILITY_ALPHA = 0.5
+# Вирусные аккаунты обновляются вдвое чаще при той же волатильности
+FAST_TRENDS = ('mega', 'viral')
+FAST_SPEEDUP = 2.0
+
+FLUSH_INTERVAL = float(os.getenv('DAEMON_FLUSH_INTERVAL', '300'))
+
+# Пауза между аккаунтами платформы (как в скриптах сборщиков)
+PACE = {'YouTube': 1.0, 'Instagram': 3.0}
+# Сколько ошибок подряд до повторного входа в Instagram
+RELOGIN_AFTER = 5
+QUOTA_PERIOD = 24 * 3600
+
+# Поля, которые заполняют сборщики (остальное берется из входного файла)
+METRIC_ATTRS = ('audience', 'video_format', 'views', 'avg_views', 'viral_coef',
+                'videos_per_month', 'last_updated', 'trend_value')
+
+# Кэш сборщика, который стоит сохранять между запусками
+CACHE_ATTRS = {'YouTube': 'channel_ids', 'Instagram': 'user_ids'}
+
+
+def next_interval(volatility: float, viral_coef: float) -> float:
+    """Интервал до следующего обновления по волатильности и тренду"""
+    interval = BASE_INTERVAL / (1 + VOLATILITY_WEIGHT * volatility)
+    if trend_code(viral_coef) in FAST_TRENDS:
+        interval /= FAST_SPEEDUP
+    return min(max(interval, MIN_INTERVAL), MAX_INTERVAL)
+
+
+def relative_change(old: float, new: float) -> float:
+    """Относительное изменение (0 - без изменений)"""
+    return abs(new - old) / max(old, 1)
+
+
+class RefreshState:
+    """Расписание обновления одного аккаунта"""
+
+    __slots__ = ('platform', 'due_at', 'interval', 'volatility', 'avg_views', 'failures', 'updated_at')
+
+    def __init__(self, platform: str, due_at: float, interval: float = BASE_INTERVAL,
+                 volatility: float = 0.0, avg_views: Optional[float] = None,
+                 failures: int = 0, updated_at: float = 0.0):
+        self.platform = platform
+        self.due_at = due_at
+        self.interval = interval
+        self.volatility = volatility
+        self.avg_views = avg_views
+        self.failures = failures
+        self.updated_at = updated_at
+
+    def to_list(self) -> list:
+        return [self.platform, self.due_at, self.interval, self.volatility,
+                self.avg_views, self.failures, self.updated_at]
+
+
+class RefreshSchedule:
+    """Расписание всех аккаунтов: состояние + очередь с приоритетом на платформу"""
+
+    def __init__(self, state_file: str = SCHEDULE_FILE):
+        self.state_file = state_file
+        self.entries: Dict[str, RefreshState] = {}
+        self.queues: Dict[str, List[Tuple[float, float, str]]] = {}
+        self.cache: Dict[str, dict] = {}
+        self.load()
+
+    def load(self):
+        """Читает расписание прошлого запуска"""
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"⚠️  Не удалось прочитать {self.state_file}: {e} - начинаю заново")
+            return
+        self.entries = {key: RefreshState(*values) for key, values in state.get('entities', {}).items()}
+        self.cache = state.get('cache', {})
+        for key, entry in self.entries.items():
+            self._push(key, entry, 0.0)
+
+    def save(self):
+        """Сохраняет расписание атомарно (через временный файл)"""
+        tmp_file = f"{self.state_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'entities': {key: entry.to_list() for key, entry in self.entries.items()},
+                       'cache': self.cache}, f, ensure_ascii=False)
+        os.replace(tmp_file, self.state_file)
+
+    def _push(self, key: str, entry: RefreshState, viral_coef: float):
+        # При одинаковом времени первым идет аккаунт с большим коэффициентом
+        heapq.heappush(self.queues.setdefault(entry.platform, []), (entry.due_at, -viral_coef, key))
+
+    def sync(self, bloggers: Dict[str, Blogger], platforms: List[str]):
+        """Ставит в очередь новые аккаунты (сразу), удаленные из базы забываются"""
+        now = time.time()
+        for key, blogger in bloggers.items():
+            if blogger.platform in platforms and key not in self.entries:
+                self.entries[key] = RefreshState(blogger.platform, now)
+                self._push(key, self.entries[key], blogger.viral_coef)
+        for key in [key for key in self.entries if key not in bloggers]:
+            del self.entries[key]
+
+    def peek(self, platform: str) -> Optional[Tuple[float, str]]:
+        """(время, ключ) ближайшего обновления платформы"""
+        queue = self.queues.get(platform, [])
+        # Устаревшие записи очереди (аккаунт удален или перепланирован) отбрасываются здесь
+        while queue:
+            due_at, _, key = queue[0]
+            entry = self.entries.get(key)
+            if entry is not None and entry.platform == platform and entry.due_at == due_at:
+                return due_at, key
+            heapq.heappop(queue)
+        return None
+
+    def pop(self, platform: str) -> str:
+        return heapq.heappop(self.queues[platform])[2]
+
+    def done(self, key: str, blogger: Blogger, ok: bool):
+        """Планирует следующее обновление по результату текущего"""
+        entry = self.entries[key]
+        now = time.time()
+        if ok:
+            if entry.avg_views is not None:
+                change = relative_change(entry.avg_views, blogger.avg_views)
+                entry.volatility = VOLATILITY_ALPHA * change + (1 - VOLATILITY_ALPHA) * entry.volatility
+            entry.avg_views = blogger.avg_views
+            entry.interval = next_interval(entry.volatility, blogger.viral_coef)
+            entry.failures = 0
+            entry.updated_at = now
+            delay = entry.interval
+        else:
+            entry.failures += 1
+            delay = min(entry.interval * 2 ** entry.failures, MAX_INTERVAL)
+        entry.due_at = now + delay
+        self._push(key, entry, blogger.viral_coef)
+
+
+def open_collectors(platforms: List[str]) -> Dict[str, object]:
+    """Сборщики платформ, к которым есть доступ (Instagram - уже с входом)"""
+    collectors = {}
+    if 'YouTube' in platforms:
+        reason = youtube_access()
+        if reason:
+            print(f"⚠️  YouTube: {reason}")
+        else:
+            from collect_youtube_data import YouTubeDataCollector, load_api_key
+            collectors['YouTube'] = YouTubeDataCollector(load_api_key())
+
+    if 'Instagram' in platforms:
+        reason = instagram_access()
+        if reason:
+            print(f"⚠️  Instagram: {reason}")
+        else:
+            from collect_instagram_data import InstagramReelsCollector, load_credentials
+            collector = InstagramReelsCollector(*load_credentials())
+            if collector.login():
+                collectors['Instagram'] = collector
+    return collectors
+
+
+class CollectorDaemon:
+    """Цикл обновления: ближайший по расписанию аккаунт -> сборщик -> CSV"""
+
+    def __init__(self, collectors: Dict[str, object], schedule: RefreshSchedule,
+                 input_file: str = INPUT_FILE, output_file: str = OUTPUT_FILE):
+        self.collectors = collectors
+        self.schedule = schedule
+        self.input_file = input_file
+        self.output_file = output_file
+        self.rows: List[Blogger] = []
+        self.bloggers: Dict[str, Blogger] = {}
+        self.input_mtime = 0
+        self.ready_at = {platform: 0.0 for platform in collectors}
+        self.errors_in_row = {platform: 0 for platform in collectors}
+        self.quota_reset_at = time.time() + QUOTA_PERIOD
+        self.dirty = False
+        self.flushed_at = time.time()
+        self.refreshed = 0
+
+        for platform, attr in CACHE_ATTRS.items():
+            if platform in collectors:
+                getattr(collectors[platform], attr).update(schedule.cache.get(platform, {}))
+
+        # Уже собранные метрики - из прошлого результата, остальное - из входного файла
+        previous = {}
+        if os.path.exists(output_file):
+            previous = {blogger_key(b): b for b in load_bloggers(output_file)}
+        self.reload(previous)
+
+    def reload(self, previous: Dict[str, Blogger]):
+        """Перечитывает входной файл, сохраняя собранные метрики"""
+        self.input_mtime = os.stat(self.input_file).st_mtime_ns
+        self.rows = load_bloggers(self.input_file)
+        bloggers = {}
+        for blogger in self.rows:
+            key = blogger_key(blogger)
+            entry = self.schedule.entries.get(key)
+            if key in previous and entry is not None and entry.updated_at:
+                for attr in METRIC_ATTRS:
+                    setattr(blogger, attr, getattr(previous[key], attr))
+            bloggers[key] = blogger
+        self.bloggers = bloggers
+        self.schedule.sync(bloggers, list(self.collectors))
+
+    def flush(self):
+        """Пишет результат и расписание; подхватывает изменения входного файла"""
+        if self.dirty:
+            save_bloggers(self.rows, self.output_file)
+            self.dirty = False
+        for platform, attr in CACHE_ATTRS.items():
+            if platform in self.collectors:
+                self.schedule.cache[platform] = getattr(self.collectors[platform], attr)
+        self.schedule.save()
+        self.flushed_at = time.time()
+
+        if os.stat(self.input_file).st_mtime_ns != self.input_mtime:
+            print(f"🔄 {self.input_file} изменился - перечитываю")
+            self.reload(self.bloggers)
+
+    def next_job(self, due_before: float = float('inf')) -> Optional[Tuple[float, str]]:
+        """(когда можно начать, платформа) ближайшего обновления с учетом пауз платформ"""
+        jobs = []
+        for platform in self.collectors:
+            head = self.schedule.peek(platform)
+            if head is not None and head[0] <= due_before:
+                jobs.append((max(head[0], self.ready_at[platform]), platform))
+        return min(jobs) if jobs else None
+
+    def refresh(self, platform: str):
+        """Обновляет ближайший аккаунт платформы"""
+        key = self.schedule.pop(platform)
+        blogger = self.bloggers[key]
+        collector = self.collectors[platform]
+        if platform == 'YouTube' and time.time() >= self.quota_reset_at:
+            collector.quota_used = 0
+            self.quota_reset_at = time.time() + QUOTA_PERIOD
+        print(f"[{platform}] {blogger.name or 'Unknown'}  ({datetime.now().strftime('%H:%M:%S')})")
+        print(f"   URL: {blogger.url}")
+
+        ok = collector.update_blogger(blogger)
+        self.schedule.done(key, blogger, ok)
+        entry = self.schedule.entries[key]
+        print(f"   {'✅' if ok else '❌'} Следующее обновление через {(entry.due_at - time.time()) / 3600:.1f} ч "
+              f"(волатильность {entry.volatility:.2f})\n")
+        self.dirty = self.dirty or ok
+        self.refreshed += ok
+        self.ready_at[platform] = time.time() + PACE.get(platform, 1.0)
+        self.errors_in_row[platform] = 0 if ok else self.errors_in_row[platform] + 1
+
+        if platform == 'YouTube' and collector.quota_used >= collector.quota_limit * 0.9:
+            print(f"⚠️  Квота YouTube API почти исчерпана ({collector.quota_used}) - "
+                  f"пауза до {datetime.fromtimestamp(self.quota_reset_at).strftime('%H:%M')}")
+            self.ready_at[platform] = self.quota_reset_at
+        elif platform == 'Instagram' and self.errors_in_row[platform] >= RELOGIN_AFTER:
+            # Много ошибок подряд - обычно истекшая сессия
+            self.errors_in_row[platform] = 0
+            collector.login()
+
+    def run(self, once: bool = False):
+        """
+        Обновляет аккаунты по расписанию
+
+        Args:
+            once: Обновить только уже просроченные аккаунты и выйти
+        """
+        # С once - только аккаунты, просроченные на момент запуска
+        due_before = time.time() if once else float('inf')
+        try:
+            while True:
+                job = self.next_job(due_before)
+                if job is None:
+                    break
+                start_at, platform = job
+                now = time.time()
+                if start_at > now:
+                    # Ожидание не дольше, чем до следующей записи результата
+                    time.sleep(max(min(start_at, self.flushed_at + FLUSH_INTERVAL) - now, 0))
+                else:
+                    self.refresh(platform)
+                if time.time() - self.flushed_at >= FLUSH_INTERVAL:
+                    self.flush()
+        finally:
+            self.flush()
+
+
+def print_status(schedule: RefreshSchedule, bloggers: Dict[str, Blogger], limit: int = 20):
+    """Очередь обновлений: ближайшие аккаунты и интервалы"""
+    now = time.time()
+    entries = sorted(schedule.entries.items(), key=lambda item: item[1].due_at)
+    for platform in sorted({entry.platform for _, entry in entries}):
+        platform_entries = [entry for _, entry in entries if entry.platform == platform]
+        overdue = sum(entry.due_at <= now for entry in platform_entries)
+        intervals = sorted(entry.interval for entry in platform_entries)
+        print(f"📊 {platform}: {len(platform_entries)} аккаунтов, просрочено {overdue}, "
+              f"медианный интервал {intervals[len(intervals) // 2] / 3600:.1f} ч")
+
+    print(f"\n{'Через':>8}  {'Интервал':>8}  {'Волат.':>6}  Аккаунт")
+    for key, entry in entries[:limit]:
+        blogger = bloggers.get(key)
+        name = blogger.name if blogger else key
+        print(f"{(entry.due_at - now) / 3600:>7.1f}ч  {entry.interval / 3600:>7.1f}ч  "
+              f"{entry.volatility:>6.2f}  {name} ({entry.platform})")
+
+
+def main():
+    """Основная функция"""
+    parser = argparse.ArgumentParser(description="Демон сбора метрик с адаптивным расписанием")
+    parser.add_argument('--platform', nargs='+', choices=list(PACE), default=list(PACE),
+                        help="Платформы для сбора")
+    parser.add_argument('--input', default=INPUT_FILE, help="Входной CSV")
+    parser.add_argument('--output', default=OUTPUT_FILE, help="CSV с собранными метриками")
+    parser.add_argument('--once', action='store_true', help="Обновить просроченные аккаунты и выйти")
+    parser.add_argument('--status', action='store_true', help="Показать очередь обновлений")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input):
+        print(f"❌ Файл {args.input} не найден")
+        exit(1)
+
+    schedule = RefreshSchedule()
+    if args.status:
+        print_status(schedule, {blogger_key(b): b for b in load_bloggers(args.input)})
+        return
+
+    collectors = open_collectors(args.platform)
+    if not collectors:
+        print("❌ Нет доступа ни к одной платформе")
+        exit(1)
+
+    # SIGTERM (systemd, docker stop) - как Ctrl+C: результат записывается перед выходом
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    daemon = CollectorDaemon(collectors, schedule, args.input, args.output)
+    print(f"🚀 Демон сбора: {', '.join(collectors)}, аккаунтов в расписании: {len(schedule.entries)}")
+    try:
+        daemon.run(args.once)
+    except KeyboardInterrupt:
+        pass
+    print(f"✅ Обновлено аккаунтов: {daemon.refreshed}, результат: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
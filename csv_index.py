@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Индекс строк CSV: чтение одной записи о блогере без разбора всего файла
+
+Рядом с CSV хранится <файл>.idx.npz:
+- hashes - отсортированные 64-битные хэши ключей аккаунтов
+- offsets / lengths - байтовое смещение и длина строки CSV для каждого ключа
+- digest, size, mtime_ns - версия CSV, для которой построен индекс
+
+У каждой строки два ключа: blogger_key (instagram:user) и handle без
+платформы (*:user), поэтому найти строку можно по URL, по @handle и по
+platform:handle. Поиск - двоичный поиск по хэшам в памяти и одно чтение
+из CSV, отображенного в память (mmap): разбирается только нужная строка.
+
+Индекс сам следит за актуальностью: при открытии сверяются размер и mtime
+файла, при расхождении - хэш содержимого; если данные другие, индекс
+перестраивается за один проход. save_bloggers и write_stage обновляют уже
+существующий индекс сразу после записи файла, поэтому читатели обычно
+получают готовый индекс без перестроения.
+
+Требования:
+pip install numpy
+
+Запуск:
+python csv_index.py build [файл.csv]
+python csv_index.py get <URL | @handle | platform:handle> [файл.csv]
+python csv_index.py bench [файл.csv] [--lookups 10000]
+"""
+
+import argparse
+import codecs
+import csv
+import hashlib
+import json
+import mmap
+import os
+import random
+import time
+import zipfile
+from operator import itemgetter
+from typing import Iterator, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    print("❌ Установите библиотеку: pip install numpy")
+    exit(1)
+
+from blogger_model import (COLUMN_ALIASES, COLUMN_ATTRS, ROW_INDEX_SUFFIX, Blogger,
+                           iter_bloggers, row_converter)
+from entity_resolution import normalize_url
+from leaderboard import key_hash
+from snapshot_diff import blogger_key
+
+INDEX_VERSION = 1
+
+# Платформа в ключе "любая платформа" (поиск по @handle)
+ANY_PLATFORM = '*'
+
+DEFAULT_FILE = 'fitness_trainers_viral.csv'
+
+_HASH_CHUNK = 1 << 20
+
+
+def file_digest(filename: str) -> str:
+    """Хэш содержимого файла (blake2b)"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def index_file(filename: str) -> str:
+    """Путь индекса для CSV"""
+    return f"{filename}{ROW_INDEX_SUFFIX}"
+
+
+def row_keys(blogger: Blogger) -> List[str]:
+    """Ключи строки: platform:handle и *:handle"""
+    key = blogger_key(blogger)
+    handle = key.split(':', 1)[1]
+    return [key, f"{ANY_PLATFORM}:{handle}"] if handle else [key]
+
+
+def query_key(query: str) -> str:
+    """
+    Ключ для поиска по запросу пользователя
+
+    https://instagram.com/user -> instagram:user, @user -> *:user,
+    instagram:user - как есть
+    """
+    value = query.strip()
+    if '/' in value:
+        platform, handle = normalize_url(value)
+        return f"{platform}:{handle}"
+    if ':' in value:
+        return value.lower()
+    return f"{ANY_PLATFORM}:{value.lstrip('@').lower()}"
+
+
+def iter_records(f) -> Iterator[Tuple[int, bytes]]:
+    """
+    (смещение, байты) каждой записи CSV из файла, открытого в режиме 'rb'
+
+    Перевод строки внутри поля в кавычках не разрывает запись: запись
+    заканчивается на строке, после которой число кавычек четное.
+    """
+    offset = f.tell()
+    start = offset
+    parts = []
+    quotes = 0
+    for line in f:
+        if not parts:
+            start = offset
+        parts.append(line)
+        offset += len(line)
+        quotes += line.count(b'"')
+        if quotes % 2 == 0:
+            yield start, parts[0] if len(parts) == 1 else b''.join(parts)
+            parts = []
+            quotes = 0
+    if parts:
+        yield start, b''.join(parts)
+
+
+def _remember(records: Iterator[Tuple[int, bytes]], store: list) -> Iterator[bytes]:
+    """Отдает байты записей, сохраняя (смещение, байты) текущей записи в store"""
+    for record in records:
+        store.append(record)
+        yield record[1]
+
+
+def key_getter(header: List[str]):
+    """Функция: значения строки -> (никнейм, платформа, URL) для ключа аккаунта"""
+    positions = {}
+    for index, column in enumerate(header):
+        positions.setdefault(COLUMN_ATTRS.get(COLUMN_ALIASES.get(column, column)), index)
+    # Отсутствующие колонки читаются из пустой ячейки в конце строки
+    return itemgetter(*(positions.get(attr, len(header)) for attr in ('username', 'platform', 'url')))
+
+
+def parse_record(data: bytes) -> List[str]:
+    """Значения одной записи CSV"""
+    return next(csv.reader([data.decode('utf-8')]), [])
+
+
+class RowIndex:
+    """Индекс строк одного CSV с чтением записей через mmap"""
+
+    __slots__ = ('filename', 'header', 'hashes', 'offsets', 'lengths',
+                 'digest', 'size', 'mtime_ns', '_convert', '_map')
+
+    def __init__(self, filename: str, header: List[str], hashes: 'np.ndarray',
+                 offsets: 'np.ndarray', lengths: 'np.ndarray', digest: str,
+                 size: int, mtime_ns: int):
+        self.filename = filename
+        self.header = header
+        self.hashes = hashes
+        self.offsets = offsets
+        self.lengths = lengths
+        self.digest = digest
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self._convert = row_converter(header)
+        self._map: Optional[mmap.mmap] = None
+
+    def __len__(self):
+        return len(self.hashes)
+
+    @classmethod
+    def build(cls, filename: str, digest: Optional[str] = None) -> 'RowIndex':
+        """Строит индекс за один проход по файлу"""
+        stat = os.stat(filename)
+        digest = digest or file_digest(filename)
+
+        with open(filename, 'rb') as f:
+            first = f.readline()
+            if first.startswith(codecs.BOM_UTF8):
+                first = first[len(codecs.BOM_UTF8):]
+            header = parse_record(first)
+            fields = key_getter(header)
+            width = len(header)
+            hashes, offsets, lengths = [], [], []
+            records = []
+            # Один csv.reader на весь файл: каждая строка генератора - целая запись
+            reader = csv.reader(data.decode('utf-8') for data in _remember(iter_records(f), records))
+            for values in reader:
+                offset, data = records.pop()
+                # Как iter_bloggers: строки без имени пропускаются
+                if not values or not values[0]:
+                    continue
+                if len(values) <= width:
+                    values += [''] * (width + 1 - len(values))
+                username, platform, url = fields(values)
+                for key in row_keys(Blogger(username=username, platform=platform, url=url)):
+                    hashes.append(key_hash(key))
+                    offsets.append(offset)
+                    lengths.append(len(data))
+
+        hashes = np.array(hashes, dtype=np.uint64)
+        order = np.argsort(hashes, kind='stable')
+        return cls(filename, header, hashes[order],
+                   np.array(offsets, dtype=np.int64)[order],
+                   np.array(lengths, dtype=np.int32)[order],
+                   digest, stat.st_size, stat.st_mtime_ns)
+
+    @classmethod
+    def load(cls, filename: str) -> Optional['RowIndex']:
+        """Читает индекс CSV с диска (None - индекса нет или он другой версии)"""
+        try:
+            with np.load(index_file(filename)) as arrays:
+                meta = json.loads(str(arrays['meta']))
+                if meta.get('version') != INDEX_VERSION:
+                    return None
+                return cls(filename, meta['header'], arrays['hashes'], arrays['offsets'],
+                           arrays['lengths'], meta['digest'], meta['size'], meta['mtime_ns'])
+        except FileNotFoundError:
+            return None
+        # Обрезанный или пустой файл: BadZipFile / EOFError
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile) as e:
+            print(f"⚠️  Не удалось прочитать {index_file(filename)}: {e} - перестраиваю")
+            return None
+
+    @classmethod
+    def open(cls, filename: str, digest: Optional[str] = None, save: bool = True) -> 'RowIndex':
+        """
+        Индекс для текущего содержимого CSV
+
+        Сохраненный индекс используется, если файл не изменился, иначе
+        индекс перестраивается и сохраняется.
+
+        Args:
+            filename: CSV файл
+            digest: Уже посчитанный хэш файла (чтобы не читать файл повторно)
+            save: False - только читать с диска, перестроенный индекс остается в памяти
+                  (sidecar пишет тот, кто записал CSV)
+        """
+        index = cls.load(filename)
+        if index is None or not index.refresh(digest, save):
+            index = cls.build(filename, digest)
+            try:
+                if save:
+                    index.save()
+            except OSError as e:
+                print(f"⚠️  Не удалось сохранить {index_file(filename)}: {e}")
+        # Файл отображается сразу: если его потом заменят (os.replace), индекс
+        # продолжит читать ту версию, для которой построен
+        index._data()
+        return index
+
+    def refresh(self, digest: Optional[str] = None, save: bool = True) -> bool:
+        """
+        Проверяет, что индекс соответствует файлу
+
+        Файл тронут, но не изменен (тот же хэш) - подпись обновляется
+        (и сохраняется, если save).
+
+        Returns:
+            False - содержимое файла изменилось, индекс устарел
+        """
+        try:
+            stat = os.stat(self.filename)
+        except FileNotFoundError:
+            return False
+        if stat.st_size == self.size and stat.st_mtime_ns == self.mtime_ns:
+            return True
+        if stat.st_size != self.size or (digest or file_digest(self.filename)) != self.digest:
+            return False
+        self.mtime_ns = stat.st_mtime_ns
+        try:
+            if save:
+                self.save()
+        except OSError:
+            pass
+        return True
+
+    def save(self):
+        """Сохраняет индекс атомарно (через временный файл)"""
+        meta = {'version': INDEX_VERSION, 'header': self.header, 'digest': self.digest,
+                'size': self.size, 'mtime_ns': self.mtime_ns}
+        tmp_file = f"{self.filename}.tmp.npz"
+        np.savez(tmp_file, hashes=self.hashes, offsets=self.offsets, lengths=self.lengths,
+                 meta=np.array(json.dumps(meta, ensure_ascii=False)))
+        os.replace(tmp_file, index_file(self.filename))
+
+    def _data(self) -> mmap.mmap:
+        if self._map is None:
+            with open(self.filename, 'rb') as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if len(self._map) != self.size:
+                self.close()
+                raise ValueError(f"{self.filename} изменился после построения индекса")
+        return self._map
+
+    def get(self, query: str) -> List[Blogger]:
+        """
+        Записи по URL, @handle или platform:handle
+
+        Ключ сверяется с разобранной строкой - совпадение 64-битных хэшей
+        разных ключей не дает ложных результатов.
+        """
+        key = query_key(query)
+        if key.endswith(':'):
+            return []
+        target = np.uint64(key_hash(key))
+        start = int(np.searchsorted(self.hashes, target, 'left'))
+        end = int(np.searchsorted(self.hashes, target, 'right'))
+
+        bloggers = []
+        for i in range(start, end):
+            offset = int(self.offsets[i])
+            values = parse_record(self._data()[offset:offset + int(self.lengths[i])])
+            blogger = self._convert(values)
+            if key in row_keys(blogger):
+                bloggers.append(blogger)
+        return bloggers
+
+    def close(self):
+        """Освобождает отображение файла"""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+
+def refresh_index(filename: str):
+    """Перестраивает индекс CSV, если он уже есть (вызывается после записи файла)"""
+    if os.path.exists(index_file(filename)):
+        RowIndex.build(filename).save()
+
+
+def benchmark(filename: str, lookups: int, seed: int = 42):
+    """Сравнивает поиск по индексу с полным проходом по файлу"""
+    started = time.perf_counter()
+    index = RowIndex.open(filename)
+    open_time = time.perf_counter() - started
+
+    rng = random.Random(seed)
+    queries = [blogger_key(b) for b in iter_bloggers(filename)]
+    queries = [rng.choice(queries) for _ in range(lookups)]
+
+    started = time.perf_counter()
+    found = sum(1 for query in queries if index.get(query))
+    lookup_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    target = queries[0]
+    next((b for b in iter_bloggers(filename) if blogger_key(b) == target), None)
+    scan_time = time.perf_counter() - started
+
+    print(f"📂 Открытие индекса ({len(index):,} ключей): {open_time * 1000:.1f} мс")
+    print(f"🔎 {lookups:,} поисков по индексу: {lookup_time * 1000:.1f} мс "
+          f"({lookup_time / lookups * 1e6:.1f} мкс на запрос, найдено {found:,})")
+    print(f"🐢 Один поиск полным проходом: {scan_time * 1000:.1f} мс")
+
+
+def main():
+    """Основная функция"""
+    parser = argparse.ArgumentParser(description="Индекс строк CSV по аккаунту")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help="Построить индекс")
+    build_parser.add_argument('file', nargs='?', default=DEFAULT_FILE, help="CSV файл")
+
+    get_parser = subparsers.add_parser('get', help="Найти блогера")
+    get_parser.add_argument('query', help="URL, @handle или platform:handle")
+    get_parser.add_argument('file', nargs='?', default=DEFAULT_FILE, help="CSV файл")
+
+    bench_parser = subparsers.add_parser('bench', help="Сравнить с полным проходом")
+    bench_parser.add_argument('file', nargs='?', default=DEFAULT_FILE, help="CSV файл")
+    bench_parser.add_argument('--lookups', type=int, default=10_000, help="Количество поисков")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.file):
+        print(f"❌ Файл {args.file} не найден")
+        return
+
+    if args.command == 'build':
+        started = time.perf_counter()
+        index = RowIndex.build(args.file)
+        index.save()
+        print(f"✅ {index_file(args.file)}: {len(index):,} ключей за "
+              f"{time.perf_counter() - started:.2f} с")
+    elif args.command == 'get':
+        bloggers = RowIndex.open(args.file).get(args.query)
+        if not bloggers:
+            print(f"Не найдено: {args.query}")
+        for b in bloggers:
+            print(f"{b.name} ({b.platform}) {b.url}")
+            print(f"   👥 {b.audience_formatted} | 🚀 {b.viral_coef}x | 👁 {b.views_formatted} | "
+                  f"{b.trend} | {b.updated_formatted}")
+    else:
+        benchmark(args.file, args.lookups)
+
+
+if __name__ == "__main__":
+    main()
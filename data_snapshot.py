@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Снимок данных о вирусных блогерах в памяти с горячей перезагрузкой
+
+Файл читается один раз в неизменяемый снимок (Snapshot). Перед выдачей
+снимка кэш не чаще раза в check_interval секунд проверяет os.stat файла
+(mtime + размер); при изменении считает хэш содержимого и, если данные
+действительно другие, строит новый снимок в executor и атомарно
+подменяет ссылку. Команды бота получают текущий снимок сразу, не
+дожидаясь перезагрузки, поэтому их задержка не зависит от размера файла.
+
+Все производные структуры (рейтинг, корзины, подсчет по платформам,
+индекс поиска по имени и никнейму, места в рейтингах, индекс строк CSV
+и готовые тексты ответов через функцию render) строятся один раз вместе
+со снимком - обработчик команды делает только поиск в словаре.
+
+Требования:
+pip install numpy
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime
+from itertools import takewhile
+from typing import Callable, Dict, List, Optional, Tuple
+
+from blogger_model import Blogger, iter_bloggers
+from csv_index import RowIndex, file_digest
+from leaderboard import Leaderboard, LeaderboardBuilder
+from search_index import SearchIndex, SearchIndexBuilder
+from stream_pipeline import tap
+from viral_table import ViralTable
+
+VIRAL_MIN_COEF = 5.0
+MEGA_MIN_COEF = 10.0
+
+# Как часто проверять файл на изменения (секунды)
+CHECK_INTERVAL = float(os.getenv('SNAPSHOT_CHECK_INTERVAL', '5'))
+
+
+def file_signature(filename: str) -> Optional[Tuple[int, int]]:
+    """Дешевая подпись файла: (mtime в наносекундах, размер) или None"""
+    try:
+        stat = os.stat(filename)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class Snapshot:
+    """
+    Неизменяемый снимок данных
+
+    viral - вирусные блогеры (coef >= min_coef) по убыванию коэффициента,
+    mega - их префикс с coef >= MEGA_MIN_COEF,
+    table - колоночная таблица по всему файлу для статистики,
+    search - индекс поиска по всем блогерам файла,
+    leaderboard - места всех блогеров по коэффициенту и просмотрам,
+    rows - индекс строк CSV: полная запись блогера по URL или @handle,
+    buckets / platform_counts - готовые сводки,
+    replies - тексты ответов, построенные функцией render.
+    Записи внутри снимка не изменяются после построения.
+    """
+
+    __slots__ = ('viral', 'mega', 'table', 'search', 'leaderboard', 'rows', 'buckets',
+                 'platform_counts', 'replies', 'signature', 'digest', 'loaded_at')
+
+    def __init__(self, viral: Tuple[Blogger, ...] = (), table: Optional[ViralTable] = None,
+                 signature: Optional[Tuple[int, int]] = None, digest: str = '',
+                 render: Optional[Callable[['Snapshot'], Dict[str, Optional[str]]]] = None,
+                 min_coef: float = VIRAL_MIN_COEF, search: Optional[SearchIndex] = None,
+                 leaderboard: Optional[Leaderboard] = None, rows: Optional[RowIndex] = None):
+        self.viral = viral
+        self.mega = tuple(takewhile(lambda b: b.viral_coef >= MEGA_MIN_COEF, viral))
+        self.table = table
+        self.search = search
+        self.leaderboard = leaderboard
+        self.rows = rows
+        self.buckets = table.bucket_counts() if table is not None else {}
+        self.platform_counts = (
+            table.platform_counts(table.rows_min_coef(min_coef)) if table is not None else {}
+        )
+        self.signature = signature
+        self.digest = digest
+        self.loaded_at = datetime.now()
+        self.replies = render(self) if render else {}
+
+    def __bool__(self):
+        return self.table is not None
+
+    def with_signature(self, signature: Tuple[int, int]) -> 'Snapshot':
+        """Тот же снимок с новой подписью файла (файл тронут, но не изменен)"""
+        snapshot = object.__new__(Snapshot)
+        for name in self.__slots__:
+            setattr(snapshot, name, getattr(self, name))
+        snapshot.signature = signature
+        return snapshot
+
+
+def build_snapshot(filename: str, min_coef: float = VIRAL_MIN_COEF,
+                   signature: Optional[Tuple[int, int]] = None,
+                   digest: Optional[str] = None,
+                   render: Optional[Callable[[Snapshot], Dict[str, Optional[str]]]] = None) -> Snapshot:
+    """Читает файл за один проход и строит снимок (блокирующая функция)"""
+    signature = signature or file_signature(filename)
+    digest = digest or file_digest(filename)
+
+    viral: List[Blogger] = []
+    search = SearchIndexBuilder()
+    ranks = LeaderboardBuilder()
+
+    def collect(blogger: Blogger):
+        search.add(blogger)
+        ranks.add(blogger)
+        if blogger.viral_coef >= min_coef:
+            viral.append(blogger)
+
+    table = ViralTable.from_bloggers(tap(iter_bloggers(filename), collect), keep_rows=False)
+    viral.sort(key=lambda b: b.viral_coef, reverse=True)
+    index = search.build()
+
+    def describe(row: int) -> dict:
+        hit = index.entry(row, '')
+        return {'name': hit.name, 'username': hit.username, 'platform': hit.platform, 'url': hit.url}
+
+    # Индекс строк обычно уже обновлен записавшим файл скриптом (finish_write). Если нет
+    # (файл изменен вручную, sidecar поврежден) - строится в памяти: бот sidecar не пишет
+    # и не гоняется за ним с писателем CSV
+    rows = RowIndex.open(filename, digest, save=False)
+
+    return Snapshot(tuple(viral), table, signature, digest, render, min_coef, index,
+                    ranks.build(describe, digest), rows)
+
+
+class SnapshotCache:
+    """Кэш снимка файла с проверкой изменений и перезагрузкой вне event loop"""
+
+    def __init__(self, filename: str, min_coef: float = VIRAL_MIN_COEF,
+                 check_interval: float = CHECK_INTERVAL,
+                 render: Optional[Callable[[Snapshot], Dict[str, Optional[str]]]] = None):
+        """
+        Args:
+            filename: CSV файл с метриками вирусности
+            min_coef: Порог вирусности для рейтинга
+            check_interval: Минимальный интервал между проверками файла
+            render: Функция, которая строит тексты ответов для снимка
+        """
+        self.filename = filename
+        self.min_coef = min_coef
+        self.check_interval = check_interval
+        self.render = render
+        self.reloads = 0
+        self._snapshot = Snapshot(render=render, min_coef=min_coef)
+        self._checked_at: Optional[float] = None
+        self._reload_task: Optional[asyncio.Task] = None
+        self._reload_forced = False
+
+    @property
+    def current(self) -> Snapshot:
+        """Текущий снимок без проверки файла"""
+        return self._snapshot
+
+    def _load(self, signature: Optional[Tuple[int, int]]) -> Snapshot:
+        """Строит новый снимок (выполняется в executor)"""
+        if signature is None:
+            print(f"Файл {self.filename} не найден!")
+            return Snapshot(render=self.render, min_coef=self.min_coef)
+
+        digest = file_digest(self.filename)
+        if digest == self._snapshot.digest:
+            return self._snapshot.with_signature(signature)
+
+        snapshot = build_snapshot(self.filename, self.min_coef, signature, digest, self.render)
+        self.reloads += 1
+        return snapshot
+
+    async def _reload(self, force: bool) -> Snapshot:
+        self._checked_at = time.monotonic()
+        signature = file_signature(self.filename)
+        if not force and signature == self._snapshot.signature:
+            return self._snapshot
+
+        loop = asyncio.get_running_loop()
+        try:
+            snapshot = await loop.run_in_executor(None, self._load, signature)
+        except Exception as e:
+            # Файл мог быть перезаписан во время чтения - остаемся на старом снимке
+            print(f"Ошибка перезагрузки {self.filename}: {e}")
+            return self._snapshot
+
+        # Замена ссылки атомарна: обработчики видят либо старый, либо новый снимок
+        self._snapshot = snapshot
+        return snapshot
+
+    def _start_reload(self, force: bool) -> asyncio.Task:
+        if self._reload_task is None or self._reload_task.done():
+            self._reload_task = asyncio.ensure_future(self._reload(force))
+            self._reload_forced = force
+        return self._reload_task
+
+    async def refresh(self, force: bool = False) -> Snapshot:
+        """Проверяет файл и дожидается перезагрузки, если он изменился"""
+        # Идущая фоновая проверка может пропустить перезагрузку: ждем ее и запускаем свою
+        while force and self._reload_task is not None and not self._reload_task.done() \
+                and not self._reload_forced:
+            await asyncio.shield(self._reload_task)
+        snapshot = await asyncio.shield(self._start_reload(force))
+        if file_signature(self.filename) != snapshot.signature:
+            # Проверка началась до того, как файл дописали - повторяем
+            snapshot = await asyncio.shield(self._start_reload(False))
+        return snapshot
+
+    async def get(self) -> Snapshot:
+        """
+        Текущий снимок для обработчика команды
+
+        Первый вызов дожидается загрузки. Дальше снимок возвращается сразу,
+        а проверка файла (не чаще check_interval) идет в фоне.
+        """
+        if self._checked_at is None:
+            return await self.refresh(force=True)
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            self._start_reload(False)
+        return self._snapshot
@@ -0,0 +1,581 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Дедупликация блогеров между файлами базы (entity resolution)
+
+Один и тот же аккаунт встречается в fitness_trainers_complete.csv, _1000plus,
+_viral, _top50, _data и в имена.csv с разными вариантами URL, никнейма и имени.
+
+Алгоритм без сравнения "каждый с каждым":
+1. Нормализация URL и никнейма -> (платформа, handle); точные совпадения
+   объединяются за O(n) через словарь
+2. Блокирующий индекс для оставшихся уникальных аккаунтов:
+   - соседи по отсортированному handle с общим префиксом (4 символа)
+   - MinHash по триграммам имени, LSH-корзины по полосам подписи
+   Внутри блока берутся только ближайшие соседи (окно), поэтому число
+   кандидатов линейно по n
+3. Векторный отсев кандидатов (цифры, длина handle, оценка MinHash),
+   точное сравнение триграмм только для оставшихся пар. Имя сравнивается
+   без учета порядка слов; имена, которые отличаются только родом одного
+   слова (Козлов / Козлова, Евгений / Евгения), - разные люди, даже при
+   похожих handle. При полностью совпавшем имени handle может отличаться
+   сильнее (опечатка в коротком handle)
+4. Union-find -> канонический ID аккаунта и отчет о слияниях
+
+Требования:
+pip install numpy
+
+Запуск: python entity_resolution.py [файлы...]
+        python entity_resolution.py --synthetic 1000000
+        (синтетические дубликаты известны заранее - печатаются точность и полнота)
+"""
+
+import argparse
+import csv
+import os
+import re
+import time
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    print("❌ Установите библиотеку: pip install numpy")
+    exit(1)
+
+from blogger_model import Blogger, iter_bloggers
+
+DEFAULT_FILES = [
+    'fitness_trainers_complete.csv',
+    'fitness_trainers_1000plus.csv',
+    'fitness_trainers_viral.csv',
+    'fitness_trainers_top50.csv',
+    'fitness_trainers_data.csv',
+    'имена.csv',
+]
+
+PLATFORM_CODES = {
+    'Instagram': 'instagram',
+    'TikTok': 'tiktok',
+    'YouTube': 'youtube',
+    'Telegram': 'telegram',
+    'ВКонтакте': 'vk',
+}
+
+HOST_PLATFORMS = {
+    'instagram.com': 'instagram',
+    'tiktok.com': 'tiktok',
+    'youtube.com': 'youtube',
+    'youtu.be': 'youtube',
+    't.me': 'telegram',
+    'telegram.me': 'telegram',
+    'vk.com': 'vk',
+    'vk.ru': 'vk',
+}
+
+# Параметры блокирования и сравнения
+PREFIX_LENGTH = 4
+WINDOW = 3
+MINHASH_BANDS = 4
+MINHASH_ROWS = 2
+HANDLE_THRESHOLD = 0.8
+SAME_NAME_HANDLE_THRESHOLD = 0.7
+NAME_THRESHOLD = 0.8
+
+MINHASH_BATCH = 20_000
+MAX_NAME_LENGTH = 64
+
+_MERSENNE = (1 << 31) - 1
+_NOT_ALNUM_RE = re.compile(r'[^0-9a-zа-яё]+')
+_DIGITS_RE = re.compile(r'\d+')
+
+# Мужская и женская формы: Козлов / Козлова, Соколовский / Соколовская, Евгений / Евгения
+_GENDER_ENDINGS = (('', 'а'), ('ий', 'ая'), ('ой', 'ая'), ('ий', 'ия'),
+                   ('', 'a'), ('iy', 'aya'), ('oy', 'aya'), ('iy', 'iya'))
+
+
+def normalize_url(url: str) -> Tuple[str, str]:
+    """
+    Приводит URL профиля к виду (платформа, handle)
+
+    https://www.tiktok.com/@user/?lang=ru -> ('tiktok', 'user')
+    https://youtube.com/c/name и https://youtube.com/@name -> ('youtube', 'name')
+    """
+    value = url.strip().lower()
+    value = value.split('://', 1)[-1].split('?', 1)[0].split('#', 1)[0]
+    host, _, path = value.partition('/')
+    for prefix in ('www.', 'm.', 'mobile.'):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+
+    platform = HOST_PLATFORMS.get(host, host)
+    parts = [part for part in path.split('/') if part]
+    if not parts:
+        return platform, ''
+    if platform == 'youtube' and parts[0] in ('c', 'user', 'channel') and len(parts) > 1:
+        return platform, parts[1]
+    return platform, parts[0].lstrip('@')
+
+
+def compact_handle(handle: str) -> str:
+    """Handle без регистра и разделителей: vladimir.olefirenko == vladimir_olefirenko"""
+    return _NOT_ALNUM_RE.sub('', handle.lower().replace('ё', 'е'))
+
+
+def normalize_name(name: str) -> str:
+    """Имя без регистра, пунктуации и лишних пробелов"""
+    return _NOT_ALNUM_RE.sub(' ', name.casefold().replace('ё', 'е')).strip()
+
+
+def name_key(name: str) -> str:
+    """Нормализованное имя со словами по алфавиту (Егорова Ксения == Ксения Егорова)"""
+    return ' '.join(sorted(normalize_name(name).split()))
+
+
+def gendered_names(a: str, b: str) -> bool:
+    """Имена отличаются только родом одного слова (Сергей Козлов / Сергей Козлова)"""
+    words_a, words_b = set(a.split()), set(b.split())
+    only_a, only_b = words_a - words_b, words_b - words_a
+    if len(only_a) != 1 or len(only_b) != 1:
+        return False
+    x, y = only_a.pop(), only_b.pop()
+    for male, female in _GENDER_ENDINGS:
+        for short, long in ((x, y), (y, x)):
+            if short.endswith(male) and short[:len(short) - len(male)] + female == long:
+                return True
+    return False
+
+
+def trigrams(text: str) -> frozenset:
+    """Множество символьных триграмм строки"""
+    padded = f"  {text} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    """Коэффициент Жаккара двух множеств"""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def iter_discovery_csv(filename: str) -> Iterable[Blogger]:
+    """Читает результат поиска аккаунтов (имена.csv) как записи Blogger"""
+    with open(filename, 'r', encoding='utf-8-sig', newline='') as f:
+        for row in csv.DictReader(f):
+            username = (row.get('Instagram Username') or '').strip().lstrip('@')
+            if not username:
+                continue
+            try:
+                audience = str(int(row.get('Количество подписчиков') or 0))
+            except ValueError:
+                audience = ''
+            yield Blogger(
+                name=username,
+                username=f"@{username}",
+                platform='Instagram',
+                url=f"https://instagram.com/{username}",
+                audience=audience
+            )
+
+
+class EntityResolver:
+    """Сопоставление записей из разных файлов с каноническими аккаунтами"""
+
+    def __init__(self, seed: int = 7):
+        self.seed = seed
+        self.sources: List[str] = []
+        self.rows: List[int] = []
+        self.records: List[Blogger] = []
+        self.platforms: List[str] = []
+        self.handles: List[str] = []
+        self.compact: List[str] = []
+        self.digits: List[str] = []
+        self.names: List[str] = []
+        self.parent: List[int] = []
+        self.fuzzy_scores: Dict[int, float] = {}
+        self.comparisons = 0
+
+    def add(self, blogger: Blogger, source: str, row: int):
+        """Добавляет запись и нормализует ее ключи"""
+        platform, handle = normalize_url(blogger.url) if blogger.url else ('', '')
+        code = PLATFORM_CODES.get(blogger.platform)
+        if code and platform not in PLATFORM_CODES.values():
+            platform = code
+        if not handle:
+            handle = blogger.username.strip().lstrip('@').lower()
+
+        self.sources.append(source)
+        self.rows.append(row)
+        self.records.append(blogger)
+        self.platforms.append(platform)
+        self.handles.append(handle)
+        self.compact.append(compact_handle(handle))
+        name = name_key(blogger.name)
+        self.names.append(name)
+        # Числа в имени и handle различают аккаунты (fit_girl1 / fit_girl2)
+        self.digits.append(' '.join(_DIGITS_RE.findall(f"{handle} {name}")))
+        self.parent.append(len(self.parent))
+
+    def add_file(self, filename: str) -> int:
+        """Добавляет все записи файла, возвращает их количество"""
+        reader = iter_discovery_csv if os.path.basename(filename) == 'имена.csv' else iter_bloggers
+        count = 0
+        for row, blogger in enumerate(reader(filename), 1):
+            self.add(blogger, filename, row)
+            count += 1
+        return count
+
+    def _find(self, i: int) -> int:
+        parent = self.parent
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+        while parent[i] != root:
+            parent[i], i = root, parent[i]
+        return root
+
+    def _union(self, a: int, b: int):
+        ra, rb = self._find(a), self._find(b)
+        if ra != rb:
+            # Корнем остается более ранняя запись - она дает канонический ID
+            if rb < ra:
+                ra, rb = rb, ra
+            self.parent[rb] = ra
+
+    def _exact_stage(self) -> List[int]:
+        """Объединяет записи с одинаковым (платформа, handle), возвращает представителей"""
+        first_seen = {}
+        for i, (platform, handle) in enumerate(zip(self.platforms, self.handles)):
+            if not handle:
+                continue
+            key = (platform, handle)
+            j = first_seen.get(key)
+            if j is None:
+                first_seen[key] = i
+            else:
+                self._union(j, i)
+        return list(first_seen.values())
+
+    def _minhash(self, names: List[str]) -> 'np.ndarray':
+        """
+        MinHash-подписи строк по триграммам: массив (полосы*строки, len(names))
+
+        Строки переводятся в массив кодов символов UCS-4, код триграммы
+        собирается из трех соседних символов - без циклов Python по символам.
+        """
+        rng = np.random.default_rng(self.seed)
+        k = MINHASH_BANDS * MINHASH_ROWS
+        a = rng.integers(1, _MERSENNE, (k, 1, 1), dtype=np.uint64)
+        b = rng.integers(0, _MERSENNE, (k, 1, 1), dtype=np.uint64)
+        signatures = np.empty((k, len(names)), dtype=np.uint64)
+
+        for start in range(0, len(names), MINHASH_BATCH):
+            batch = [f"  {name[:MAX_NAME_LENGTH]} " for name in names[start:start + MINHASH_BATCH]]
+            width = max(map(len, batch))
+            chars = np.array(batch, dtype=f'<U{width}').view(np.uint32).reshape(len(batch), width)
+            chars = chars.astype(np.uint64)
+            grams = ((chars[:, :-2] << 42) | (chars[:, 1:-1] << 21) | chars[:, 2:]) % _MERSENNE
+
+            # Позиции за концом строки не участвуют в минимуме
+            lengths = np.fromiter(map(len, batch), dtype=np.int64, count=len(batch))
+            valid = np.arange(width - 2) < (lengths[:, None] - 2)
+            hashed = (a * grams[None] + b) % _MERSENNE
+            hashed[:, ~valid] = _MERSENNE
+            signatures[:, start:start + len(batch)] = hashed.min(axis=2)
+
+        return signatures
+
+    @staticmethod
+    def _window_pairs(order: 'np.ndarray', group: 'np.ndarray') -> List['np.ndarray']:
+        """
+        Пары соседей в пределах окна внутри одной группы отсортированного массива
+
+        Пара (i, j), i < j, кодируется одним числом i * n + j
+        """
+        n = len(order)
+        pairs = []
+        for distance in range(1, min(WINDOW, n - 1) + 1):
+            same = group[:-distance] == group[distance:]
+            left = order[:-distance][same]
+            right = order[distance:][same]
+            pairs.append(np.minimum(left, right) * n + np.maximum(left, right))
+        return pairs
+
+    @staticmethod
+    def _codes(values: Iterable) -> Tuple['np.ndarray', list]:
+        """Категориальные коды значений и список различных значений"""
+        index = {}
+        codes = np.array([index.setdefault(value, len(index)) for value in values], dtype=np.int64)
+        return codes, list(index)
+
+    def _candidate_pairs(self, reps: List[int]) -> 'np.ndarray':
+        """Кандидаты на слияние из блокирующего индекса (индексы в reps)"""
+        n = len(reps)
+        if n < 2:
+            return np.empty((0, 2), dtype=np.int64)
+
+        platform_codes, _ = self._codes(self.platforms[i] for i in reps)
+        handles = [self.compact[i] for i in reps]
+        handle_rank = np.empty(n, dtype=np.int64)
+        handle_rank[sorted(range(n), key=handles.__getitem__)] = np.arange(n)
+
+        pairs = []
+
+        # Блок 1: платформа + префикс handle, соседи по сортировке handle
+        prefixes, prefix_values = self._codes(h[:PREFIX_LENGTH] for h in handles)
+        order = np.lexsort((handle_rank, platform_codes))
+        group = platform_codes[order] * (len(prefix_values) + 1) + prefixes[order]
+        pairs.extend(self._window_pairs(order, group))
+
+        # Блок 2: LSH по MinHash имени - одинаковая полоса подписи в пределах платформы
+        name_codes, names = self._codes(self.names[i] for i in reps)
+        signatures = self._minhash(names)[:, name_codes]
+        for band in range(MINHASH_BANDS):
+            rows = signatures[band * MINHASH_ROWS:(band + 1) * MINHASH_ROWS]
+            key = rows[0].astype(np.int64)
+            for row in rows[1:]:
+                key = key * _MERSENNE + row.astype(np.int64)
+            order = np.lexsort((handle_rank, key, platform_codes))
+            # Номер группы растет там, где меняется платформа или ключ полосы
+            changed = (np.diff(platform_codes[order]) != 0) | (np.diff(key[order]) != 0)
+            group = np.concatenate([[0], np.cumsum(changed)])
+            pairs.extend(self._window_pairs(order, group))
+
+        codes = np.concatenate(pairs)
+        pairs = np.stack([codes // n, codes % n], axis=1)
+        codes = codes[self._prefilter(pairs, reps, handles, signatures)]
+        codes = np.unique(codes)
+        return np.stack([codes // n, codes % n], axis=1)
+
+    def _prefilter(self, pairs: 'np.ndarray', reps: List[int], handles: List[str],
+                   signatures: 'np.ndarray') -> 'np.ndarray':
+        """Векторный отсев пар, которые заведомо не пройдут пороги сходства"""
+        left, right = pairs[:, 0], pairs[:, 1]
+        digit_codes, _ = self._codes(self.digits[i] for i in reps)
+        handle_codes, _ = self._codes(handles)
+        lengths = np.fromiter(map(len, handles), dtype=np.int64, count=len(handles))
+
+        # Доля совпавших позиций MinHash - несмещенная оценка Жаккара имен
+        agreement = (signatures[:, left] == signatures[:, right]).mean(axis=0)
+        same_handle = handle_codes[left] == handle_codes[right]
+        close_length = np.abs(lengths[left] - lengths[right]) * 5 <= np.maximum(lengths[left], lengths[right])
+        keep = (digit_codes[left] == digit_codes[right]) & (agreement >= NAME_THRESHOLD / 2)
+        return keep & (same_handle | close_length)
+
+    def _is_match(self, i: int, j: int, cache: Dict[int, tuple]) -> Optional[float]:
+        """Сравнивает две записи, возвращает оценку сходства или None"""
+        self.comparisons += 1
+        for k in (i, j):
+            if k not in cache:
+                cache[k] = (trigrams(self.compact[k]), trigrams(self.names[k]))
+        handle_i, name_i = cache[i]
+        handle_j, name_j = cache[j]
+
+        same_name = self.names[i] == self.names[j]
+        handle_score = jaccard(handle_i, handle_j)
+        if handle_score < (SAME_NAME_HANDLE_THRESHOLD if same_name else HANDLE_THRESHOLD):
+            return None
+        name_score = jaccard(name_i, name_j)
+        if name_score < NAME_THRESHOLD:
+            return None
+        # Триграммы почти совпадают, но это другой человек
+        if gendered_names(self.names[i], self.names[j]):
+            return None
+        return round((handle_score + name_score) / 2, 3)
+
+    def resolve(self) -> Dict[str, List[int]]:
+        """
+        Выполняет сопоставление
+
+        Returns:
+            Словарь канонический ID -> индексы записей кластера
+        """
+        reps = self._exact_stage()
+        cache = {}
+        for a, b in self._candidate_pairs(reps).tolist():
+            i, j = reps[a], reps[b]
+            if self._find(i) == self._find(j):
+                continue
+            score = self._is_match(i, j, cache)
+            if score is not None:
+                self._union(i, j)
+                later = max(i, j)
+                self.fuzzy_scores[later] = max(score, self.fuzzy_scores.get(later, 0.0))
+
+        clusters = {}
+        for i in range(len(self.records)):
+            clusters.setdefault(self._find(i), []).append(i)
+        return {self.canonical_id(root): members for root, members in clusters.items()}
+
+    def canonical_id(self, i: int) -> str:
+        """Канонический ID аккаунта: платформа:handle корневой записи"""
+        root = self._find(i)
+        handle = self.handles[root] or normalize_name(self.records[root].name).replace(' ', '_')
+        return f"{self.platforms[root]}:{handle}"
+
+    def merge_reason(self, i: int) -> str:
+        """Почему запись попала в свой кластер"""
+        root = self._find(i)
+        if i == root:
+            return 'canonical'
+        if (self.platforms[i], self.handles[i]) == (self.platforms[root], self.handles[root]):
+            return 'url'
+        if (self.platforms[i], self.compact[i]) == (self.platforms[root], self.compact[root]):
+            return 'handle'
+        score = self.fuzzy_scores.get(i)
+        return f"fuzzy:{score}" if score is not None else 'fuzzy'
+
+    def write_ids(self, filename: str):
+        """Сохраняет соответствие запись -> канонический ID"""
+        with open(filename, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Файл', 'Строка', 'Имя', 'Ссылка', 'Канонический_ID'])
+            for i, blogger in enumerate(self.records):
+                writer.writerow([self.sources[i], self.rows[i], blogger.name, blogger.url,
+                                 self.canonical_id(i)])
+
+    def write_report(self, clusters: Dict[str, List[int]], filename: str) -> int:
+        """Сохраняет отчет о слияниях (только кластеры из 2+ записей)"""
+        merged = 0
+        with open(filename, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Канонический_ID', 'Файл', 'Строка', 'Имя', 'Никнейм/Название',
+                             'Ссылка', 'Причина'])
+            for canonical, members in clusters.items():
+                if len(members) < 2:
+                    continue
+                merged += 1
+                for i in members:
+                    blogger = self.records[i]
+                    writer.writerow([canonical, self.sources[i], self.rows[i], blogger.name,
+                                     blogger.username, blogger.url, self.merge_reason(i)])
+        return merged
+
+
+def _typo(handle: str) -> str:
+    """Опечатка: удвоенная буква в середине handle (цифры различают аккаунты - их не трогаем)"""
+    letters = [k for k, ch in enumerate(handle) if ch.isalpha()]
+    k = letters[len(letters) // 2]
+    return handle[:k] + handle[k] + handle[k:]
+
+
+def _separators(handle: str) -> str:
+    """
+    Лишние разделители: anna_fit -> anna__fit, annafit -> ann__afit
+
+    Замена "_" на "." дала бы handle другого синтетического аккаунта
+    (генератор выдает и anna_fit, и anna.fit) - это был бы не дубликат
+    """
+    for separator in ('_', '.'):
+        if separator in handle:
+            return handle.replace(separator, separator * 2, 1)
+    middle = len(handle) // 2
+    return f"{handle[:middle]}__{handle[middle:]}"
+
+
+def synthetic_duplicates(count: int, seed: int = 42) -> Iterator[Tuple[int, Blogger]]:
+    """
+    Синтетические записи для бенчмарка: (номер исходной записи, запись)
+
+    Каждая десятая запись повторяется вариантом по очереди:
+    - другой вид URL (www, слэш) и имя заглавными - точное совпадение
+    - другие разделители в handle, слова имени в обратном порядке
+    - опечатка в handle
+    - опечатка в handle и обратный порядок слов имени
+    Номер исходной записи - известный ответ для точности и полноты.
+    """
+    from synthetic_data import generate_bloggers
+
+    for i, blogger in enumerate(generate_bloggers(count, seed=seed, with_metrics=False)):
+        yield i, blogger
+        if i % 10:
+            continue
+        variant = blogger.copy()
+        kind = i // 10 % 4
+        if kind == 0:
+            variant.url = variant.url.replace('https://', 'https://www.') + '/'
+            variant.name = variant.name.upper()
+        else:
+            _, handle = normalize_url(blogger.url)
+            changed = _separators(handle) if kind == 1 else _typo(handle)
+            variant.url = blogger.url.replace(handle, changed)
+            variant.username = blogger.username.replace(handle, changed)
+            if kind != 2:
+                first, _, rest = blogger.name.partition(' ')
+                variant.name = f"{rest} {first}"
+        yield i, variant
+
+
+def pair_quality(clusters: Dict[str, List[int]], truth: List[int]) -> Tuple[float, float]:
+    """
+    Попарные точность и полнота слияний по известному ответу
+
+    Пара записей слита верно, если они в одном кластере и truth у них совпадает.
+    """
+    def pairs(n: int) -> int:
+        return n * (n - 1) // 2
+
+    predicted = correct = 0
+    for members in clusters.values():
+        predicted += pairs(len(members))
+        correct += sum(pairs(n) for n in Counter(truth[i] for i in members).values())
+    actual = sum(pairs(n) for n in Counter(truth).values())
+    return (correct / predicted if predicted else 1.0), (correct / actual if actual else 1.0)
+
+
+def main():
+    """Основная функция"""
+    parser = argparse.ArgumentParser(description="Дедупликация блогеров между файлами")
+    parser.add_argument('files', nargs='*', default=DEFAULT_FILES, help="CSV файлы")
+    parser.add_argument('--synthetic', type=int, default=0,
+                        help="Вместо файлов сгенерировать N синтетических записей")
+    parser.add_argument('--ids', default='entity_ids.csv', help="Файл соответствия ID")
+    parser.add_argument('--report', default='entity_merge_report.csv', help="Отчет о слияниях")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("🔗 ДЕДУПЛИКАЦИЯ БЛОГЕРОВ")
+    print("=" * 70)
+
+    resolver = EntityResolver()
+    start = time.perf_counter()
+
+    truth = []
+    if args.synthetic:
+        for row, (entity, blogger) in enumerate(synthetic_duplicates(args.synthetic), 1):
+            resolver.add(blogger, 'synthetic', row)
+            truth.append(entity)
+        print(f"📄 synthetic: {len(resolver.records):,} записей")
+    else:
+        for filename in args.files:
+            if not os.path.exists(filename):
+                print(f"⚠️  Файл {filename} не найден - пропускаю")
+                continue
+            print(f"📄 {filename}: {resolver.add_file(filename):,} записей")
+
+    loaded = time.perf_counter()
+    clusters = resolver.resolve()
+    resolved = time.perf_counter()
+
+    resolver.write_ids(args.ids)
+    merged = resolver.write_report(clusters, args.report)
+
+    print("\n" + "=" * 70)
+    print(f"Всего записей: {len(resolver.records):,}")
+    print(f"Уникальных аккаунтов: {len(clusters):,}")
+    print(f"Кластеров со слиянием: {merged:,}")
+    print(f"Попарных сравнений: {resolver.comparisons:,}")
+    if truth:
+        precision, recall = pair_quality(clusters, truth)
+        fuzzy = [truth[i] == truth[resolver._find(i)] for i in resolver.fuzzy_scores]
+        print(f"🎯 Точность: {precision:.4f}, полнота: {recall:.4f}")
+        print(f"   Нечеткие слияния: верных {sum(fuzzy):,}, ошибочных {len(fuzzy) - sum(fuzzy):,}")
+    print(f"⏱  Загрузка: {loaded - start:.2f} с, сопоставление: {resolved - loaded:.2f} с")
+    print(f"💾 ID: {args.ids}, отчет: {args.report}")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
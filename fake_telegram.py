@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Локальный fake Telegram для проверки бота без сети
+
+- Сервер Bot API: getMe, setWebhook, deleteWebhook, getUpdates, sendMessage...
+  (бот подключается через TELEGRAM_API_URL / base_url)
+- Инжектор обновлений: отправляет команды на webhook бота с секретным
+  заголовком и ждет ответ sendMessage в тот же чат
+
+Запуск бенчмарка (бот в webhook режиме в этом же процессе):
+python fake_telegram.py --requests 500 --concurrency 20
+
+Требования:
+pip install python-telegram-bot aiohttp
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import aiohttp
+    from aiohttp import web
+except ImportError:
+    print("❌ Установите библиотеку: pip install aiohttp")
+    exit(1)
+
+FAKE_TOKEN = '123456:FAKE-TOKEN'
+SECRET_HEADER = 'X-Telegram-Bot-Api-Secret-Token'
+
+_BOT_USER = {
+    'id': 123456,
+    'is_bot': True,
+    'first_name': 'FakeBot',
+    'username': 'fake_fitness_bot',
+    'can_join_groups': True,
+    'can_read_all_group_messages': False,
+    'supports_inline_queries': True,
+}
+
+
+class FakeTelegram:
+    """Fake Bot API сервер + инжектор обновлений"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8081):
+        self.host = host
+        self.port = port
+        self.webhook_url: Optional[str] = None
+        self.secret_token: Optional[str] = None
+        self.sent: List[Tuple[int, str, float]] = []
+        self.calls: Dict[str, int] = {}
+        self._waiters: Dict[int, asyncio.Future] = {}
+        self._update_ids = itertools.count(1)
+        self._message_ids = itertools.count(1)
+        self._runner: Optional[web.AppRunner] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.webhook_set = asyncio.Event()
+
+    @property
+    def api_url(self) -> str:
+        """base_url для python-telegram-bot"""
+        return f"http://{self.host}:{self.port}/bot"
+
+    async def _params(self, request: web.Request) -> dict:
+        if request.content_type == 'application/json':
+            return await request.json()
+        params = dict(await request.post())
+        for key, value in params.items():
+            # Сложные параметры PTB передает строкой JSON
+            if isinstance(value, str) and value[:1] in '[{':
+                try:
+                    params[key] = json.loads(value)
+                except ValueError:
+                    pass
+        return params
+
+    async def handle(self, request: web.Request) -> web.Response:
+        method = request.match_info['method']
+        params = await self._params(request)
+        self.calls[method] = self.calls.get(method, 0) + 1
+
+        if method == 'getMe':
+            result = _BOT_USER
+        elif method == 'setWebhook':
+            self.webhook_url = params.get('url')
+            self.secret_token = params.get('secret_token')
+            self.webhook_set.set()
+            result = True
+        elif method == 'getUpdates':
+            await asyncio.sleep(1)
+            result = []
+        elif method == 'sendMessage':
+            chat_id = int(params['chat_id'])
+            self.sent.append((chat_id, params.get('text', ''), time.perf_counter()))
+            waiter = self._waiters.pop(chat_id, None)
+            if waiter is not None and not waiter.done():
+                waiter.set_result(time.perf_counter())
+            result = {
+                'message_id': next(self._message_ids),
+                'date': int(time.time()),
+                'chat': {'id': chat_id, 'type': 'private'},
+                'text': params.get('text', ''),
+            }
+        else:
+            result = True
+
+        return web.json_response({'ok': True, 'result': result})
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_route('*', '/bot{token}/{method}', self.handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        self._session = aiohttp.ClientSession()
+
+    async def stop(self):
+        if self._session is not None:
+            await self._session.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    def make_update(self, text: str, chat_id: int) -> dict:
+        """JSON обновления с командой от пользователя"""
+        message = {
+            'message_id': next(self._message_ids),
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private'},
+            'from': {'id': chat_id, 'is_bot': False, 'first_name': f'User{chat_id}'},
+            'text': text,
+        }
+        if text.startswith('/'):
+            message['entities'] = [{'type': 'bot_command', 'offset': 0,
+                                    'length': len(text.split()[0])}]
+        return {'update_id': next(self._update_ids), 'message': message}
+
+    async def post_update(self, update: dict, secret_token: Optional[str] = None) -> int:
+        """Отправляет обновление на webhook, возвращает HTTP статус"""
+        token = self.secret_token if secret_token is None else secret_token
+        headers = {SECRET_HEADER: token} if token else {}
+        async with self._session.post(self.webhook_url, json=update, headers=headers) as response:
+            return response.status
+
+    async def inject(self, text: str, chat_id: int, timeout: float = 10.0) -> float:
+        """
+        Отправляет команду и ждет ответ бота
+
+        Returns:
+            Задержка от отправки обновления до sendMessage (секунды)
+        """
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[chat_id] = waiter
+        started = time.perf_counter()
+        status = await self.post_update(self.make_update(text, chat_id))
+        if status != 200:
+            self._waiters.pop(chat_id, None)
+            raise RuntimeError(f"Webhook ответил {status}")
+        answered = await asyncio.wait_for(waiter, timeout)
+        return answered - started
+
+
+def percentile(values: List[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100 * len(values)))] if values else 0.0
+
+
+async def benchmark(requests: int, concurrency: int, commands: List[str],
+                    api_port: int, webhook_port: int):
+    """Поднимает fake Telegram и бота в webhook режиме, замеряет задержку команд"""
+    # Отдельные файлы состояния, чтобы не трогать рабочие
+    workdir = tempfile.mkdtemp(prefix='fake_telegram_')
+    os.environ.setdefault('SUBSCRIBERS_DB', os.path.join(workdir, 'subscribers.db'))
+    os.environ.setdefault('VIRAL_STATE_FILE', os.path.join(workdir, 'viral_state.json'))
+
+    import telegram_bot
+    from webhook_server import serve_webhook
+
+    fake = FakeTelegram(port=api_port)
+    await fake.start()
+
+    application = telegram_bot.build_application(FAKE_TOKEN, fake.api_url)
+    stop_event = asyncio.Event()
+    bot_task = asyncio.create_task(serve_webhook(
+        application, f"http://127.0.0.1:{webhook_port}", '127.0.0.1', webhook_port,
+        '/telegram', None, stop_event
+    ))
+    await asyncio.wait_for(fake.webhook_set.wait(), 30)
+
+    latencies: Dict[str, List[float]] = {command: [] for command in commands}
+    numbers = iter(range(requests))
+
+    async def user(chat_id: int):
+        # У каждого пользователя не больше одной команды без ответа
+        for i in numbers:
+            command = commands[i % len(commands)]
+            latencies[command].append(await fake.inject(command, chat_id))
+
+    try:
+        # Чужой секрет должен отклоняться
+        rejected = await fake.post_update(fake.make_update('/top10', 1), secret_token='wrong')
+        print(f"🔒 Запрос с неверным секретом: HTTP {rejected}")
+
+        started = time.perf_counter()
+        await asyncio.gather(*(user(1000 + n) for n in range(concurrency)))
+        duration = time.perf_counter() - started
+    finally:
+        stop_event.set()
+        await bot_task
+        await fake.stop()
+
+    print("\n" + "=" * 70)
+    print(f"📊 {requests} команд, конкурентность {concurrency}: {duration:.2f} с, "
+          f"{requests / duration:.0f} команд/с")
+    print("=" * 70)
+    for command, values in latencies.items():
+        print(f"{command:<10} p50 {percentile(values, 50) * 1000:7.2f} мс | "
+              f"p95 {percentile(values, 95) * 1000:7.2f} мс | "
+              f"p99 {percentile(values, 99) * 1000:7.2f} мс")
+
+
+def main():
+    """Основная функция"""
+    parser = argparse.ArgumentParser(description="Бенчмарк бота через fake Telegram")
+    parser.add_argument('--requests', type=int, default=300, help="Количество команд")
+    parser.add_argument('--concurrency', type=int, default=10, help="Одновременных чатов")
+    parser.add_argument('--commands', default='/top10,/mega,/stats', help="Команды через запятую")
+    parser.add_argument('--api-port', type=int, default=8081, help="Порт fake Bot API")
+    parser.add_argument('--webhook-port', type=int, default=8443, help="Порт webhook бота")
+    args = parser.parse_args()
+
+    asyncio.run(benchmark(args.requests, args.concurrency, args.commands.split(','),
+                          args.api_port, args.webhook_port))
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,8 @@ except ImportError:
     print("❌ Установите библиотеку: pip install instagrapi")
     exit(1)
 
+from blogger_model import format_number
+
 
 class FitnessAccountFinder:
     """Поиск фитнес-аккаунтов через хэштеги"""
@@ -95,7 +97,7 @@ class FitnessAccountFinder:
                             if user_info.media_count > 10:
                                 self.found_accounts[username] = followers
                                 found_users.add(username)
-                                print(f"   ✅ @{username}: {self.format_number(followers)} подписчиков")
+                                print(f"   ✅ @{username}: {format_number(followers)} подписчиков")
 
                     # Задержка чтобы не забанили
                     time.sleep(1)
@@ -111,14 +113,6 @@ class FitnessAccountFinder:
 
         return found_users
 
-    def format_number(self, num: int) -> str:
-        """Форматирует число в читаемый вид"""
-        if num >= 1_000_000:
-            return f"{num/1_000_000:.1f}M"
-        elif num >= 1_000:
-            return f"{num/1_000:.0f}K"
-        return str(num)
-
     def find_accounts(self, target_count: int = 500):
         """
         Основная функция поиска аккаунтов
@@ -208,7 +202,7 @@ class FitnessAccountFinder:
         print(f"✅ Сохранено {len(sorted_accounts)} аккаунтов в {filename}")
         print(f"\n🏆 Топ-10 по подписчикам:")
         for i, (username, followers) in enumerate(sorted_accounts[:10], 1):
-            print(f"   {i}. @{username}: {self.format_number(followers)}")
+            print(f"   {i}. @{username}: {format_number(followers)}")
 
 
 def main():
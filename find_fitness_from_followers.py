@@ -8,7 +8,7 @@
 import csv
 import time
 import os
-from typing import Dict, Set
+from typing import Dict, Optional, Set
 
 try:
     from instagrapi import Client
@@ -16,14 +16,18 @@ except ImportError:
     print("❌ Установите библиотеку: pip install instagrapi")
     exit(1)
 
+from blogger_model import format_number
+from csv_index import RowIndex
+
 
 class FitnessAccountFinderFromFollowers:
     """Поиск фитнес-аккаунтов через подписки существующих блогеров"""
 
-    def __init__(self, username: str, password: str):
+    def __init__(self, username: str, password: str, known: Optional[RowIndex] = None):
         self.client = Client()
         self.username = username
         self.password = password
+        self.known = known  # индекс строк существующей базы
         self.found_accounts = {}  # username -> follower_count
         self.processed_usernames = set()
 
@@ -82,6 +86,10 @@ class FitnessAccountFinderFromFollowers:
 
                     self.processed_usernames.add(username_found)
 
+                    # Уже есть в базе - не тратим запрос user_info (поиск по индексу строк)
+                    if self.known is not None and self.known.get(f"instagram:{username_found}"):
+                        continue
+
                     # Получаем полную информацию
                     full_user_info = self.client.user_info(user_id)
 
@@ -100,7 +108,7 @@ class FitnessAccountFinderFromFollowers:
                                 if any(keyword in bio for keyword in keywords):
                                     self.found_accounts[username_found] = followers
                                     found_count += 1
-                                    print(f"   ✅ @{username_found}: {self.format_number(followers)} подписчиков")
+                                    print(f"   ✅ @{username_found}: {format_number(followers)} подписчиков")
 
                     # Задержка
                     time.sleep(1)
@@ -114,14 +122,6 @@ class FitnessAccountFinderFromFollowers:
         except Exception as e:
             print(f"   ❌ Ошибка: {e}")
 
-    def format_number(self, num: int) -> str:
-        """Форматирует число"""
-        if num >= 1_000_000:
-            return f"{num/1_000_000:.1f}M"
-        elif num >= 1_000:
-            return f"{num/1_000:.0f}K"
-        return str(num)
-
     def find_accounts(self, seed_accounts: list, target_count: int = 500):
         """
         Основная функция поиска
@@ -183,7 +183,7 @@ class FitnessAccountFinderFromFollowers:
         print(f"✅ Сохранено {len(sorted_accounts)} аккаунтов в {filename}")
         print(f"\n🏆 Топ-10 по подписчикам:")
         for i, (username, followers) in enumerate(sorted_accounts[:10], 1):
-            print(f"   {i}. @{username}: {self.format_number(followers)}")
+            print(f"   {i}. @{username}: {format_number(followers)}")
 
 
 def main():
@@ -222,7 +222,8 @@ def main():
         exit(1)
 
     # Создаем поисковик
-    finder = FitnessAccountFinderFromFollowers(ig_username, ig_password)
+    known = RowIndex.open('fitness_trainers_viral.csv') if os.path.exists('fitness_trainers_viral.csv') else None
+    finder = FitnessAccountFinderFromFollowers(ig_username, ig_password, known)
 
     # Авторизуемся
     if not finder.login():
@@ -5,24 +5,16 @@
 Использует только реальные данные из базы
 """
 
-import csv
+import heapq
+import os
 import random
 from datetime import datetime, timedelta
-from typing import List, Dict
+from itertools import chain
+from typing import Dict, Iterable, Iterator, List, Tuple
 
-def parse_audience(audience_str: str) -> int:
-    """Преобразует строку аудитории в число"""
-    audience_str = audience_str.strip().replace('+', '').replace(',', '')
-
-    if 'M' in audience_str or 'М' in audience_str:
-        return int(float(audience_str.replace('M', '').replace('М', '')) * 1000000)
-    elif 'K' in audience_str or 'К' in audience_str:
-        return int(float(audience_str.replace('K', '').replace('К', '')) * 1000)
-    else:
-        try:
-            return int(audience_str)
-        except:
-            return random.randint(1000, 300000)
+from blogger_model import Blogger, load_bloggers, trend_code
+from stream_pipeline import WORKERS, read_stage, audience_stage, metrics_stage, tap, write_stage
+from viral_table import ViralTable
 
 def generate_short_video_metrics(platform: str, subscribers: int) -> Dict:
     """Генерирует метрики для коротких видео"""
@@ -57,148 +49,102 @@ def generate_short_video_metrics(platform: str, subscribers: int) -> Dict:
 
     # Генерируем дату последнего обновления
     days_ago = random.randint(0, 30)
-    last_updated = (datetime.now() - timedelta(days=days_ago)).strftime('%Y-%m-%d %H:%M')
-
-    # Определяем тренд
-    if viral_coefficient >= 5.0:
-        trend = '🔥 Вирусный'
-        trend_value = 'viral'
-    elif viral_coefficient >= 2.0:
-        trend = '📈 Растет'
-        trend_value = 'growing'
-    elif viral_coefficient >= 1.0:
-        trend = '➡️ Стабильно'
-        trend_value = 'stable'
-    else:
-        trend = '📉 Падает'
-        trend_value = 'declining'
-
-    # Форматируем числа
-    def format_number(num):
-        if num >= 1000000:
-            return f"{num/1000000:.1f}M"
-        elif num >= 1000:
-            return f"{num/1000:.0f}K"
-        return str(num)
+    last_updated = (datetime.now() - timedelta(days=days_ago)).isoformat(timespec='seconds')
 
     return {
         'short_format': short_format_name,
         'last_video_views': views,
-        'last_video_views_formatted': format_number(views),
         'avg_views': avg_views,
-        'avg_views_formatted': format_number(avg_views),
         'viral_coefficient': round(viral_coefficient, 2),
         'videos_per_month': videos_per_month,
         'last_updated': last_updated,
-        'trend': trend,
-        'trend_value': trend_value
+        'trend_value': trend_code(viral_coefficient)
     }
 
-def read_existing_data(filename: str) -> List[Dict[str, str]]:
+def read_existing_data(filename: str) -> List[Blogger]:
     """Читает существующие данные из CSV"""
-    data = []
     try:
-        with open(filename, 'r', encoding='utf-8-sig') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                if row.get('Имя'):
-                    data.append(row)
+        return load_bloggers(filename)
     except FileNotFoundError:
         print(f"Файл {filename} не найден")
-    return data
-
-def add_viral_metrics(data: List[Dict[str, str]]) -> List[Dict[str, str]]:
-    """Добавляет метрики вирусности к существующим данным"""
-    enhanced_data = []
-
-    for row in data:
-        platform = row.get('Платформа', '')
-        audience_str = row.get('Аудитория', '1K')
-
-        # Парсим количество подписчиков
-        subscribers = parse_audience(audience_str)
-
-        # Генерируем метрики коротких видео
-        metrics = generate_short_video_metrics(platform, subscribers)
-
-        # Добавляем новые поля
-        enhanced_row = row.copy()
-        enhanced_row['Формат_видео'] = metrics['short_format']
-        enhanced_row['Просмотры_последнего'] = metrics['last_video_views']
-        enhanced_row['Просмотры_последнего_форматир'] = metrics['last_video_views_formatted']
-        enhanced_row['Средние_просмотры'] = metrics['avg_views']
-        enhanced_row['Средние_просмотры_форматир'] = metrics['avg_views_formatted']
-        enhanced_row['Коэффициент_вирусности'] = metrics['viral_coefficient']
-        enhanced_row['Видео_в_месяц'] = metrics['videos_per_month']
-        enhanced_row['Последнее_обновление'] = metrics['last_updated']
-        enhanced_row['Тренд'] = metrics['trend']
-        enhanced_row['Тренд_значение'] = metrics['trend_value']
-
-        enhanced_data.append(enhanced_row)
-
-    return enhanced_data
-
-def save_to_csv(data: List[Dict[str, str]], filename: str):
-    """Сохраняет данные в CSV файл"""
-    if not data:
+        return []
+
+def random_audience() -> int:
+    """Аудитория для записей, у которых ее не удалось разобрать"""
+    return random.randint(1000, 300000)
+
+def enrich_blogger(item: Tuple[Blogger, int]) -> Blogger:
+    """Этап метрик: возвращает копию записи с метриками коротких видео"""
+    row, subscribers = item
+
+    # Генерируем метрики коротких видео
+    metrics = generate_short_video_metrics(row.platform, subscribers)
+
+    # Добавляем новые поля
+    enhanced_row = row.copy()
+    enhanced_row.video_format = metrics['short_format']
+    enhanced_row.views = metrics['last_video_views']
+    enhanced_row.avg_views = metrics['avg_views']
+    enhanced_row.viral_coef = metrics['viral_coefficient']
+    enhanced_row.videos_per_month = metrics['videos_per_month']
+    enhanced_row.last_updated = metrics['last_updated']
+    enhanced_row.trend_value = metrics['trend_value']
+
+    return enhanced_row
+
+def add_viral_metrics(data: Iterable[Blogger], workers: int = WORKERS) -> Iterator[Blogger]:
+    """Добавляет метрики вирусности к существующим данным (потоково)"""
+    items = audience_stage(data, missing='1K', default=random_audience)
+    return metrics_stage(items, enrich_blogger, workers=workers)
+
+def save_to_csv(data: Iterable[Blogger], filename: str) -> int:
+    """Сохраняет данные в CSV файл (пустой поток файл не трогает)"""
+    data = iter(data)
+    first = next(data, None)
+    if first is None:
         print("Нет данных для сохранения")
-        return
-
-    fieldnames = [
-        "Имя", "Никнейм/Название", "Платформа", "Ссылка", "Аудитория", "Описание",
-        "Формат_видео", "Просмотры_последнего", "Просмотры_последнего_форматир",
-        "Средние_просмотры", "Средние_просмотры_форматир",
-        "Коэффициент_вирусности", "Видео_в_месяц",
-        "Последнее_обновление", "Тренд", "Тренд_значение"
-    ]
+        return 0
 
-    with open(filename, 'w', encoding='utf-8-sig', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(data)
+    count = write_stage(chain([first], data), filename)
 
     print(f"✅ Данные сохранены в файл: {filename}")
+    return count
+
+def analyze_viral_content(data: Iterable[Blogger]):
+    """Анализирует вирусный контент за один проход по данным"""
+    # Запоминаем только мега вирусные записи, остальное - в колонках таблицы
+    mega_bloggers = []
 
-def analyze_viral_content(data: List[Dict[str, str]]):
-    """Анализирует вирусный контент"""
-    viral_count = 0
-    mega_viral_count = 0
-    total_videos = 0
-    viral_bloggers = []
-
-    for row in data:
-        coef = float(row.get('Коэффициент_вирусности', 0))
-        if coef >= 10.0:
-            mega_viral_count += 1
-            viral_bloggers.append({
-                'name': row['Имя'],
-                'platform': row['Платформа'],
-                'coefficient': coef,
-                'views': row['Просмотры_последнего_форматир']
-            })
-        elif coef >= 5.0:
-            viral_count += 1
-
-        total_videos += int(row.get('Видео_в_месяц', 0))
+    def collect_mega(blogger: Blogger):
+        if blogger.viral_coef >= 10.0:
+            mega_bloggers.append(blogger)
+
+    table = ViralTable.from_bloggers(tap(data, collect_mega), keep_rows=False)
+    if not len(table):
+        print("Нет данных для анализа")
+        return
+
+    buckets = table.bucket_counts()
+    total_videos = table.total('videos_per_month')
 
     print("\n" + "=" * 70)
     print("📊 АНАЛИЗ ВИРУСНОГО КОНТЕНТА")
     print("=" * 70)
-    print(f"Всего блогеров: {len(data)}")
-    print(f"🔥 Вирусный контент (5-10x): {viral_count}")
-    print(f"🚀 Мега вирусный контент (10x+): {mega_viral_count}")
+    print(f"Всего блогеров: {len(table)}")
+    print(f"🔥 Вирусный контент (5-10x): {buckets['viral']}")
+    print(f"🚀 Мега вирусный контент (10x+): {buckets['mega']}")
     print(f"📹 Всего видео за месяц: {total_videos:,}")
-    print(f"📊 Среднее видео на блогера: {total_videos/len(data):.1f}")
+    print(f"📊 Среднее видео на блогера: {total_videos/len(table):.1f}")
 
     # Топ-10 вирусных блогеров
-    if viral_bloggers:
+    if mega_bloggers:
         print("\n" + "=" * 70)
         print("🔥 ТОП-10 МЕГА ВИРУСНЫХ БЛОГЕРОВ")
         print("=" * 70)
-        sorted_bloggers = sorted(viral_bloggers, key=lambda x: x['coefficient'], reverse=True)[:10]
-        for i, blogger in enumerate(sorted_bloggers, 1):
-            print(f"{i}. {blogger['name']} ({blogger['platform']})")
-            print(f"   🚀 {blogger['coefficient']}x | 👁 {blogger['views']}")
+        top = heapq.nlargest(10, mega_bloggers, key=lambda b: b.viral_coef)
+        for i, blogger in enumerate(top, 1):
+            print(f"{i}. {blogger.name} ({blogger.platform})")
+            print(f"   🚀 {blogger.viral_coef}x | 👁 {blogger.views_formatted}")
 
 def main():
     """Основная функция"""
@@ -207,28 +153,26 @@ def main():
     print("=" * 70)
 
     # Используем оригинальный файл с реальными данными
-    existing_data = read_existing_data('fitness_trainers_complete.csv')
+    source = 'fitness_trainers_complete.csv'
 
-    if not existing_data:
+    if not os.path.exists(source):
         print("❌ Ошибка: файл fitness_trainers_complete.csv не найден")
         print("Используем альтернативный источник...")
-        existing_data = read_existing_data('fitness_trainers_1000plus.csv')
+        source = 'fitness_trainers_1000plus.csv'
 
-    if not existing_data:
+    if not os.path.exists(source):
         print("❌ Ошибка: не найдены исходные данные")
         return
 
-    print(f"✅ Прочитано записей: {len(existing_data)}")
-
-    # Добавляем метрики вирусности
+    # Чтение -> метрики -> запись потоком, без загрузки всего файла в память
     print("⚙️ Добавление метрик вирусности...")
-    enhanced_data = add_viral_metrics(existing_data)
-
-    # Сохраняем в новый файл
-    save_to_csv(enhanced_data, 'fitness_trainers_viral.csv')
+    count = save_to_csv(add_viral_metrics(read_stage(source)), 'fitness_trainers_viral.csv')
+    print(f"✅ Обработано записей: {count}")
+    if not count:
+        return
 
     # Анализируем вирусный контент
-    analyze_viral_content(enhanced_data)
+    analyze_viral_content(read_stage('fitness_trainers_viral.csv'))
 
     print("\n" + "=" * 70)
     print("✅ Готово! Создан файл fitness_trainers_viral.csv")
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Движение блогеров в рейтинге между снимками данных
+
+Для каждого снимка строятся места по коэффициенту вирусности и по
+средним просмотрам (место = 1 + число блогеров со значением строго
+больше - одна сортировка и бинарный поиск, O(n log n)). Снимки
+сопоставляются по 64-битному хэшу ключа аккаунта (платформа:handle)
+через отсортированный массив ключей - без словарей на миллион записей.
+
+Трекер хранит два последних различных снимка рейтинга (leaderboard_state.npz),
+поэтому после перезапуска бот продолжает показывать движение. У сайта свое
+состояние (site_data/leaderboard_state.npz): бот и сборка сайта обновляют
+рейтинг в разное время, общий файл переписывал бы чужие снимки. Состояние
+сайта публикуется вместе с site_data/ и восстанавливается в CI.
+
+Запуск: python leaderboard.py [файл.csv] [--output leaderboard.json]
+        (обновляет состояние сайта и пишет JSON; build_dist.py делает то же при сборке)
+
+Требования:
+pip install numpy
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from array import array
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    print("❌ Установите библиотеку: pip install numpy")
+    exit(1)
+
+from blogger_model import Blogger, format_number
+from snapshot_diff import blogger_key
+
+LEADERBOARD_STATE = os.getenv('LEADERBOARD_STATE_FILE', 'leaderboard_state.npz')
+LEADERBOARD_JSON = 'leaderboard.json'
+
+# Рейтинги и их названия
+METRICS = {
+    'viral_coef': 'коэффициент',
+    'avg_views': 'средние просмотры',
+}
+
+# Движение показывается для верхней части рейтинга
+WINDOW = 100
+MOVERS_LIMIT = 10
+
+
+def key_hash(key: str) -> int:
+    """64-битный хэш ключа аккаунта"""
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def competition_ranks(values: 'np.ndarray') -> 'np.ndarray':
+    """Места по убыванию значения: равные значения делят место (1, 2, 2, 4)"""
+    ordered = np.sort(values)
+    return (len(values) - np.searchsorted(ordered, values, 'right') + 1).astype(np.int64)
+
+
+def format_value(metric: str, value: float) -> str:
+    if metric == 'viral_coef':
+        return f"{value}x"
+    return format_number(int(value))
+
+
+class Leaderboard:
+    """Места всех блогеров одного снимка по каждой метрике"""
+
+    def __init__(self, keys: 'np.ndarray', values: Dict[str, 'np.ndarray'], digest: str = '',
+                 created_at: Optional[str] = None, labels: Optional[Dict[int, dict]] = None):
+        """
+        Args:
+            keys: Хэши ключей аккаунтов (uint64) в порядке строк файла
+            values: Значения метрик в порядке строк
+            labels: Имя, платформа и ссылка для строк верхней части рейтингов
+        """
+        self.keys = keys
+        self.values = values
+        self.digest = digest
+        self.created_at = created_at or datetime.now().isoformat(timespec='seconds')
+        self.ranks = {metric: competition_ranks(column) for metric, column in values.items()}
+        self.key_order = np.argsort(keys, kind='stable')
+        self.sorted_keys = keys[self.key_order]
+        self.labels = labels or {}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def top_rows(self, metric: str, n: int = WINDOW) -> 'np.ndarray':
+        """Первые n строк по месту (при равенстве на границе - в порядке файла)"""
+        ranks = self.ranks[metric]
+        rows = np.flatnonzero(ranks <= n)
+        return rows[np.argsort(ranks[rows], kind='stable')][:n]
+
+    def lookup(self, keys: 'np.ndarray') -> 'np.ndarray':
+        """Строки с такими ключами (-1 - ключа нет в снимке)"""
+        if not len(self.sorted_keys):
+            return np.full(len(keys), -1, dtype=np.int64)
+        positions = np.searchsorted(self.sorted_keys, keys).clip(max=len(self.sorted_keys) - 1)
+        found = self.sorted_keys[positions] == keys
+        return np.where(found, self.key_order[positions], -1)
+
+    def to_arrays(self, prefix: str) -> Dict[str, 'np.ndarray']:
+        arrays = {f"{prefix}keys": self.keys}
+        for metric, column in self.values.items():
+            arrays[f"{prefix}{metric}"] = column
+        meta = {'digest': self.digest, 'created_at': self.created_at,
+                'labels': {str(row): label for row, label in self.labels.items()}}
+        arrays[f"{prefix}meta"] = np.array(json.dumps(meta, ensure_ascii=False))
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix: str) -> Optional['Leaderboard']:
+        if f"{prefix}keys" not in arrays:
+            return None
+        meta = json.loads(str(arrays[f"{prefix}meta"]))
+        values = {metric: arrays[f"{prefix}{metric}"] for metric in METRICS}
+        labels = {int(row): label for row, label in meta['labels'].items()}
+        return cls(arrays[f"{prefix}keys"], values, meta['digest'], meta['created_at'], labels)
+
+
+class LeaderboardBuilder:
+    """Накопление ключей и метрик за один проход по файлу"""
+
+    def __init__(self):
+        self.keys = array('Q')
+        self.columns = {metric: array('d') for metric in METRICS}
+
+    def add(self, blogger: Blogger):
+        self.keys.append(key_hash(blogger_key(blogger)))
+        for metric, column in self.columns.items():
+            column.append(getattr(blogger, metric))
+
+    def build(self, describe: Callable[[int], dict], digest: str = '',
+              window: int = WINDOW) -> Leaderboard:
+        """
+        Args:
+            describe: Подпись строки для ответа (имя, платформа, ссылка)
+        """
+        values = {metric: np.frombuffer(column, dtype=np.float64)
+                  for metric, column in self.columns.items()}
+        board = Leaderboard(np.frombuffer(self.keys, dtype=np.uint64), values, digest)
+        # Подписи только для верхней части: их хватает и для выбывших в следующем снимке
+        for metric in METRICS:
+            for row in board.top_rows(metric, window).tolist():
+                if row not in board.labels:
+                    board.labels[row] = describe(row)
+        return board
+
+
+class Mover:
+    """Изменение места одного блогера"""
+
+    __slots__ = ('label', 'rank', 'previous_rank', 'value')
+
+    def __init__(self, label: dict, rank: Optional[int], previous_rank: Optional[int],
+                 value: Optional[float]):
+        self.label = label
+        self.rank = rank
+        self.previous_rank = previous_rank
+        self.value = value
+
+    @property
+    def delta(self) -> Optional[int]:
+        """На сколько мест поднялся (отрицательное - опустился)"""
+        if self.rank is None or self.previous_rank is None:
+            return None
+        return self.previous_rank - self.rank
+
+    def to_dict(self) -> dict:
+        return dict(self.label, rank=self.rank, previous_rank=self.previous_rank,
+                    delta=self.delta, value=self.value)
+
+
+class Movers:
+    """Движение в верхней части рейтинга по одной метрике"""
+
+    def __init__(self, metric: str, climbers: List[Mover], drops: List[Mover],
+                 newcomers: List[Mover], window: int):
+        self.metric = metric
+        self.climbers = climbers
+        self.drops = drops
+        self.newcomers = newcomers
+        self.window = window
+
+    def __bool__(self):
+        return bool(self.climbers or self.drops or self.newcomers)
+
+    def to_dict(self) -> dict:
+        return {
+            'window': self.window,
+            'climbers': [m.to_dict() for m in self.climbers],
+            'drops': [m.to_dict() for m in self.drops],
+            'newcomers': [m.to_dict() for m in self.newcomers],
+        }
+
+
+def compute_movers(previous: Leaderboard, current: Leaderboard, metric: str,
+                   window: int = WINDOW, limit: int = MOVERS_LIMIT) -> Movers:
+    """
+    Движение между двумя снимками
+
+    climbers - поднялись сильнее всех (сейчас в верхних window местах),
+    drops - опустились сильнее всех (были в верхних window местах),
+    newcomers - сейчас в верхних window, в прошлом снимке их не было
+    """
+    rank, previous_rank = current.ranks[metric], previous.ranks[metric]
+
+    rows = current.top_rows(metric, window)
+    matched = previous.lookup(current.keys[rows])
+    known = matched >= 0
+    deltas = previous_rank[matched[known]] - rank[rows[known]]
+    climbed = np.argsort(-deltas, kind='stable')
+    climbers = [
+        Mover(current.labels[row], int(rank[row]), int(previous_rank[before]),
+              float(current.values[metric][row]))
+        for row, before in zip(rows[known][climbed].tolist(), matched[known][climbed].tolist())
+        if rank[row] < previous_rank[before]
+    ][:limit]
+    newcomers = [
+        Mover(current.labels[row], int(rank[row]), None, float(current.values[metric][row]))
+        for row in rows[~known][:limit].tolist()
+    ]
+
+    rows = previous.top_rows(metric, window)
+    matched = current.lookup(previous.keys[rows])
+    now = np.where(matched >= 0, rank[matched], len(current) + 1)
+    deltas = previous_rank[rows] - now
+    dropped = np.argsort(deltas, kind='stable')
+    drops = []
+    for row, after, delta in zip(rows[dropped].tolist(), matched[dropped].tolist(),
+                                 deltas[dropped].tolist()):
+        if len(drops) == limit or delta >= 0:
+            break
+        gone = after < 0
+        drops.append(Mover(previous.labels[row], None if gone else int(rank[after]),
+                           int(previous_rank[row]),
+                           None if gone else float(current.values[metric][after])))
+
+    return Movers(metric, climbers, drops, newcomers, window)
+
+
+class LeaderboardTracker:
+    """Два последних различных снимка рейтинга и движение между ними"""
+
+    def __init__(self, state_file: str = LEADERBOARD_STATE, window: int = WINDOW):
+        self.state_file = state_file
+        self.window = window
+        self.previous: Optional[Leaderboard] = None
+        self.current: Optional[Leaderboard] = None
+        self._movers: Dict[str, Movers] = {}
+        self.load()
+
+    def load(self):
+        """Читает состояние прошлого запуска"""
+        try:
+            with np.load(self.state_file) as arrays:
+                self.previous = Leaderboard.from_arrays(arrays, 'previous_')
+                self.current = Leaderboard.from_arrays(arrays, 'current_')
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️  Не удалось прочитать {self.state_file}: {e} - начинаю заново")
+            self.previous = self.current = None
+
+    def save(self):
+        """Сохраняет состояние атомарно (через временный файл)"""
+        arrays = {}
+        for prefix, board in (('previous_', self.previous), ('current_', self.current)):
+            if board is not None:
+                arrays.update(board.to_arrays(prefix))
+        tmp_file = f"{self.state_file}.tmp.npz"
+        np.savez(tmp_file, **arrays)
+        os.replace(tmp_file, self.state_file)
+
+    def update(self, board: Leaderboard) -> bool:
+        """Запоминает снимок рейтинга; False - данные не изменились"""
+        if self.current is not None and board.digest == self.current.digest:
+            return False
+        self.previous, self.current = self.current, board
+        self._movers.clear()
+        self.save()
+        return True
+
+    def movers(self, metric: str = 'viral_coef') -> Optional[Movers]:
+        """Движение между двумя последними снимками (None - снимок пока один)"""
+        if self.previous is None or self.current is None:
+            return None
+        if metric not in self._movers:
+            self._movers[metric] = compute_movers(self.previous, self.current, metric, self.window)
+        return self._movers[metric]
+
+    def export(self, filename: str) -> bool:
+        """JSON с движением по всем метрикам для сайта"""
+        if self.previous is None or self.current is None:
+            return False
+        data = {
+            'generated_at': self.current.created_at,
+            'previous_at': self.previous.created_at,
+            'metrics': {metric: self.movers(metric).to_dict() for metric in METRICS},
+        }
+        tmp_file = f"{filename}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_file, filename)
+        return True
+
+
+def export_leaderboard(filename: str, output: str = LEADERBOARD_JSON,
+                       data_dir: Optional[str] = None) -> LeaderboardTracker:
+    """
+    Обновляет рейтинг сайта по файлу и пишет JSON с движением
+
+    Args:
+        filename: CSV с метриками
+        output: JSON для сайта
+        data_dir: Папка данных сайта - в ней состояние рейтинга сайта
+
+    Returns:
+        Трекер; без второго снимка (movers() is None) JSON не пишется
+    """
+    from data_snapshot import build_snapshot
+    from site_export import SITE_DATA_DIR
+
+    data_dir = data_dir or SITE_DATA_DIR
+    os.makedirs(data_dir, exist_ok=True)
+    tracker = LeaderboardTracker(os.path.join(data_dir, os.path.basename(LEADERBOARD_STATE)))
+    if not tracker.update(build_snapshot(filename).leaderboard):
+        print("ℹ️  Рейтинг не изменился с прошлого запуска")
+    tracker.export(output)
+    return tracker
+
+
+def main():
+    """Обновляет рейтинг по файлу и пишет JSON с движением"""
+    parser = argparse.ArgumentParser(description="Движение блогеров в рейтинге")
+    parser.add_argument('file', nargs='?', default='fitness_trainers_viral.csv', help="CSV файл")
+    parser.add_argument('--output', default=LEADERBOARD_JSON, help="JSON для сайта")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.file):
+        print(f"❌ Файл {args.file} не найден")
+        return
+
+    tracker = export_leaderboard(args.file, args.output)
+    if tracker.movers() is None:
+        print("📌 Исходный рейтинг сохранен - движение появится после следующего обновления данных")
+        return
+
+    for metric, title in METRICS.items():
+        movers = tracker.movers(metric)
+        print(f"\n📈 {title}: вверх {len(movers.climbers)}, вниз {len(movers.drops)}, "
+              f"новые {len(movers.newcomers)}")
+        for mover in movers.climbers[:3]:
+            print(f"   ▲{mover.delta} {mover.label['name']}: #{mover.previous_rank} → #{mover.rank}")
+    print(f"\n💾 {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Перевод CSV с метриками между схемами v1 и v2
+
+v1 (16 колонок) хранит каждое число дважды: "Просмотры_последнего" и
+"Просмотры_последнего_форматир", код тренда и его подпись, аудиторию
+строкой (1.2M). v2 (13 колонок) хранит только сырые значения: подписчики
+и просмотры целыми числами, время в ISO 8601, тренд кодом. Форматирование
+делают бот и экспорт сайта при выводе.
+
+Аудитория в v2 - число подписчиков: "500K+" и "2.5K" становятся 500000 и
+2500, исходная запись строки не сохраняется.
+
+Читают обе схемы все скрипты (blogger_model.iter_bloggers), поэтому
+миграция необязательна - она уменьшает файл и убирает устаревшие колонки.
+--to 1 возвращает файл в старую схему для внешних программ, читающих
+колонки по номерам.
+
+Запуск:
+python migrate_schema.py                          # fitness_trainers_viral.csv -> v2
+python migrate_schema.py a.csv b.csv --to 1       # обратно в v1
+python migrate_schema.py --check                  # только показать версии
+"""
+
+import argparse
+import csv
+import os
+from typing import Optional
+
+from blogger_model import FIELDNAMES_V1, FIELDNAMES_V2, iter_bloggers, schema_version
+from stream_pipeline import write_stage
+
+DEFAULT_FILES = ['fitness_trainers_viral.csv']
+
+SCHEMAS = {1: FIELDNAMES_V1, 2: FIELDNAMES_V2}
+
+
+def read_header(filename: str) -> Optional[list]:
+    """Заголовок CSV (None - файл пуст)"""
+    with open(filename, 'r', encoding='utf-8-sig', newline='') as f:
+        return next(csv.reader(f), None)
+
+
+def migrate_file(filename: str, version: int = 2) -> Optional[int]:
+    """
+    Переписывает файл в схему version
+
+    Returns:
+        Количество строк или None, если файл уже в этой схеме
+    """
+    header = read_header(filename)
+    if header is None or header == SCHEMAS[version]:
+        return None
+
+    # write_stage пишет через временный файл, заменяет исходный, обновляет
+    # индекс строк и публикует событие - читатели не увидят наполовину записанный CSV
+    return write_stage(iter_bloggers(filename), filename, SCHEMAS[version])
+
+
+def main():
+    """Основная функция"""
+    parser = argparse.ArgumentParser(description="Миграция CSV между схемами v1 и v2")
+    parser.add_argument('files', nargs='*', default=DEFAULT_FILES, help="CSV файлы")
+    parser.add_argument('--to', type=int, choices=sorted(SCHEMAS), default=2, help="Целевая схема")
+    parser.add_argument('--check', action='store_true', help="Только показать версии схем")
+    args = parser.parse_args()
+
+    for filename in args.files:
+        if not os.path.exists(filename):
+            print(f"❌ Файл {filename} не найден")
+            continue
+
+        header = read_header(filename) or []
+        size = os.path.getsize(filename)
+        if args.check:
+            print(f"📄 {filename}: схема v{schema_version(header)}, {size / 1024:.0f} КБ")
+            continue
+
+        count = migrate_file(filename, args.to)
+        if count is None:
+            print(f"✓ {filename}: уже в схеме v{args.to}")
+            continue
+        new_size = os.path.getsize(filename)
+        print(f"✅ {filename}: v{schema_version(header)} -> v{args.to}, {count} строк, "
+              f"{size / 1024:.0f} КБ -> {new_size / 1024:.0f} КБ")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Запуск всей цепочки обработки данных как графа этапов
+
+Каждый этап объявляет входные и выходные файлы (скрипты этапа - тоже
+входы), зависимости между этапами выводятся из них:
+
+    fitness_trainers_complete.csv
+      ├─ expanded   -> fitness_trainers_1000plus.csv
+      └─ viral      -> fitness_trainers_viral.csv
+           ├─ youtube    -> collected_youtube.csv    ┐ параллельно,
+           └─ instagram  -> collected_instagram.csv  ┘ в разных процессах
+                merge    -> fitness_trainers_viral_real.csv
+                  site   -> dist/
+
+Этап пропускается, если хэши его входов совпадают с прошлым успешным
+запуском, а выходы не тронуты (.pipeline_state.json). Пропущенный этап не
+меняет свои выходы, поэтому следующие за ним этапы тоже пропускаются.
+Сборщикам нужны свежие данные из API, поэтому их результат устаревает
+через COLLECT_MAX_AGE секунд даже без изменения входов. Этап без
+API ключа или учетных данных не запускается, а merge берет только
+имеющиеся результаты.
+
+Готовые к запуску этапы выполняются параллельно в пуле процессов, вывод
+каждого этапа - в pipeline_logs/<этап>.log. В конце печатается время
+каждого этапа.
+
+Запуск:
+python orchestrator.py                 # все этапы, только изменившиеся
+python orchestrator.py site --force    # этап site и нужные ему, site - заново
+python orchestrator.py --dry-run       # что будет запущено
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import redirect_stderr, redirect_stdout
+from datetime import datetime
+from importlib.util import find_spec
+from typing import Callable, Dict, List, Optional, Tuple
+
+from blogger_model import COLLECTED_FILE, VIRAL_FILE
+from csv_index import file_digest
+
+PIPELINE_STATE = os.getenv('PIPELINE_STATE_FILE', '.pipeline_state.json')
+LOG_DIR = os.getenv('PIPELINE_LOG_DIR', 'pipeline_logs')
+JOBS = int(os.getenv('PIPELINE_JOBS', '2'))
+
+# Результат сборщиков устаревает через сутки, даже если входы не менялись
+COLLECT_MAX_AGE = float(os.getenv('COLLECT_MAX_AGE', str(24 * 3600)))
+
+COMPLETE_FILE = 'fitness_trainers_complete.csv'
+EXPANDED_FILE = 'fitness_trainers_1000plus.csv'
+YOUTUBE_FILE = 'collected_youtube.csv'
+INSTAGRAM_FILE = 'collected_instagram.csv'
+REAL_FILE = COLLECTED_FILE
+DIST_DIR = 'dist'
+
+# Модули, от которых зависят все этапы с CSV
+MODEL_FILES = ['blogger_model.py', 'stream_pipeline.py']
+
+# Статусы этапа
+DONE = 'выполнен'
+FRESH = 'актуален'
+UNAVAILABLE = 'нет доступа'
+FAILED = 'ошибка'
+BLOCKED = 'не запущен'
+SCHEDULED = 'будет запущен'
+
+
+def path_digest(path: str) -> str:
+    """Хэш файла или папки (имена и содержимое всех файлов); 'missing' - пути нет"""
+    if os.path.isfile(path):
+        return file_digest(path)
+    if not os.path.isdir(path):
+        return 'missing'
+    entries = []
+    for root, _, names in os.walk(path):
+        for name in sorted(names):
+            full = os.path.join(root, name)
+            entries.append(f"{os.path.relpath(full, path)}:{file_digest(full)}")
+    listing = '\n'.join(sorted(entries)).encode('utf-8')
+    return hashlib.blake2b(listing, digest_size=16).hexdigest()
+
+
+# Функции этапов: выполняются в процессе пула, пути приходят из объявления этапа
+
+def run_expanded(output: str):
+    # generate_expanded_data сам читает fitness_trainers_complete.csv
+    from generate_expanded_data import generate_expanded_data, save_to_csv
+    save_to_csv(generate_expanded_data(), output)
+
+
+def run_viral(source: str, output: str):
+    from clean_original_data import clean_and_enhance
+    clean_and_enhance(source, output)
+
+
+def run_youtube(source: str, output: str):
+    from collect_youtube_data import collect_youtube_data, load_api_key
+    collect_youtube_data(load_api_key(), source, output)
+
+
+def run_instagram(source: str, output: str):
+    from collect_instagram_data import collect_instagram_data, load_credentials
+    username, password = load_credentials()
+    collect_instagram_data(username, password, source, output)
+
+
+def run_merge(base: str, output: str, *sources: Tuple[str, str]):
+    """Берет из результата каждого сборщика строки его платформы, остальные - из base"""
+    from blogger_model import load_bloggers, save_bloggers
+    from snapshot_diff import blogger_key
+
+    updates = {}
+    for platform, filename in sources:
+        if not os.path.exists(filename):
+            print(f"⚠️  {filename} нет - {platform} остается без обновления")
+            continue
+        collected = {blogger_key(b): b for b in load_bloggers(filename) if b.platform == platform}
+        print(f"📥 {filename}: {len(collected)} записей {platform}")
+        updates.update(collected)
+
+    merged = [updates.get(blogger_key(b), b) for b in load_bloggers(base)]
+    count = save_bloggers(merged, output)
+    print(f"✅ {output}: {count} записей")
+
+
+def run_site(source: str, output: str):
+    from build_dist import build_dist
+    build_dist(source, output)
+
+
+def youtube_access() -> Optional[str]:
+    """Причина, по которой сбор YouTube невозможен (None - можно запускать)"""
+    if find_spec('requests') is None:
+        return "pip install requests"
+    from collect_youtube_data import load_api_key
+    return None if load_api_key() else "нет YouTube API ключа"
+
+
+def instagram_access() -> Optional[str]:
+    """Причина, по которой сбор Instagram невозможен (None - можно запускать)"""
+    if find_spec('instagrapi') is None:
+        return "pip install instagrapi"
+    from collect_instagram_data import load_credentials
+    return None if all(load_credentials()) else "нет учетных данных Instagram"
+
+
+class Stage:
+    """Этап графа: функция, ее аргументы, входы и выходы"""
+
+    __slots__ = ('name', 'func', 'args', 'inputs', 'optional', 'outputs', 'max_age', 'access')
+
+    def __init__(self, name: str, func: Callable, args: tuple, inputs: List[str],
+                 outputs: List[str], optional: Tuple[str, ...] = (), max_age: Optional[float] = None,
+                 access: Optional[Callable[[], Optional[str]]] = None):
+        """
+        Args:
+            name: Имя этапа
+            func: Функция уровня модуля (выполняется в другом процессе)
+            args: Аргументы func
+            inputs: Файлы, от содержимого которых зависит результат (включая код)
+            outputs: Файлы и папки, которые этап создает
+            optional: Входы, которых может не быть (результаты необязательных этапов)
+            max_age: Через сколько секунд результат устаревает без изменения входов
+            access: Проверка ключей и библиотек: строка - причина не запускать
+        """
+        self.name = name
+        self.func = func
+        self.args = args
+        self.inputs = inputs
+        self.optional = optional
+        self.outputs = outputs
+        self.max_age = max_age
+        self.access = access
+
+    def signature(self) -> Dict[str, str]:
+        """Хэши всех входов"""
+        return {path: path_digest(path) for path in self.inputs}
+
+
+STAGES = [
+    Stage('expanded', run_expanded, (EXPANDED_FILE,),
+          [COMPLETE_FILE, 'generate_expanded_data.py', 'synthetic_data.py'] + MODEL_FILES,
+          [EXPANDED_FILE]),
+    Stage('viral', run_viral, (COMPLETE_FILE, VIRAL_FILE),
+          [COMPLETE_FILE, 'clean_original_data.py'] + MODEL_FILES,
+          [VIRAL_FILE]),
+    Stage('youtube', run_youtube, (VIRAL_FILE, YOUTUBE_FILE),
+          [VIRAL_FILE, 'collect_youtube_data.py'] + MODEL_FILES,
+          [YOUTUBE_FILE], max_age=COLLECT_MAX_AGE, access=youtube_access),
+    Stage('instagram', run_instagram, (VIRAL_FILE, INSTAGRAM_FILE),
+          [VIRAL_FILE, 'collect_instagram_data.py'] + MODEL_FILES,
+          [INSTAGRAM_FILE], max_age=COLLECT_MAX_AGE, access=instagram_access),
+    Stage('merge', run_merge,
+          (VIRAL_FILE, REAL_FILE, ('YouTube', YOUTUBE_FILE), ('Instagram', INSTAGRAM_FILE)),
+          [VIRAL_FILE, YOUTUBE_FILE, INSTAGRAM_FILE] + MODEL_FILES,
+          [REAL_FILE], optional=(YOUTUBE_FILE, INSTAGRAM_FILE)),
+    Stage('site', run_site, (REAL_FILE, DIST_DIR),
+          # build_dist публикует и остальные базы как есть
+          [REAL_FILE, EXPANDED_FILE, COMPLETE_FILE, 'index.html', 'site_export.py', 'build_dist.py']
+          + MODEL_FILES,
+          [DIST_DIR]),
+]
+
+STAGE_MAP = {stage.name: stage for stage in STAGES}
+
+
+def upstream(stage: Stage) -> List[Stage]:
+    """Этапы, создающие входы этапа"""
+    producers = {path: s for s in STAGES for path in s.outputs}
+    return [producers[path] for path in stage.inputs if path in producers]
+
+
+def select(targets: List[str]) -> List[Stage]:
+    """Этапы targets и все, от которых они зависят, в порядке объявления"""
+    if not targets:
+        return list(STAGES)
+    needed = set()
+    queue = [STAGE_MAP[name] for name in targets]
+    while queue:
+        stage = queue.pop()
+        if stage.name not in needed:
+            needed.add(stage.name)
+            queue.extend(upstream(stage))
+    return [stage for stage in STAGES if stage.name in needed]
+
+
+def is_fresh(stage: Stage, inputs: Dict[str, str], record: Optional[dict]) -> bool:
+    """Прошлый запуск этапа с теми же входами, выходы не тронуты и не устарели"""
+    if not record or record.get('inputs') != inputs:
+        return False
+    if stage.max_age is not None and time.time() - record.get('finished_at', 0) > stage.max_age:
+        return False
+    return all(path_digest(path) == digest for path, digest in record.get('outputs', {}).items())
+
+
+def execute(name: str) -> Tuple[bool, float, str]:
+    """
+    Выполняет этап (в процессе пула), вывод - в лог этапа
+
+    Returns:
+        (успех, длительность в секундах, описание ошибки)
+    """
+    stage = STAGE_MAP[name]
+    os.makedirs(LOG_DIR, exist_ok=True)
+    started = time.perf_counter()
+    with open(os.path.join(LOG_DIR, f"{name}.log"), 'w', encoding='utf-8') as log, \
+            redirect_stdout(log), redirect_stderr(log):
+        try:
+            stage.func(*stage.args)
+        except BaseException as e:  # скрипты сборщиков завершаются через exit()
+            traceback.print_exc()
+            return False, time.perf_counter() - started, f"{type(e).__name__}: {e}"
+
+    missing = [path for path in stage.outputs if not os.path.exists(path)]
+    if missing:
+        return False, time.perf_counter() - started, f"не созданы: {', '.join(missing)}"
+    return True, time.perf_counter() - started, ''
+
+
+def load_state(filename: str = PIPELINE_STATE) -> dict:
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_state(state: dict, filename: str = PIPELINE_STATE):
+    """Сохраняет состояние атомарно (через временный файл)"""
+    tmp_file = f"{filename}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_file, filename)
+
+
+def run_pipeline(targets: List[str] = (), force: bool = False, jobs: int = JOBS,
+                 dry_run: bool = False) -> Dict[str, dict]:
+    """
+    Выполняет этапы targets (и нужные им) в порядке зависимостей
+
+    Args:
+        targets: Имена этапов (пусто - все)
+        force: Запустить этапы targets заново, даже если входы не изменились
+        jobs: Сколько этапов выполнять одновременно
+        dry_run: Только определить, какие этапы будут запущены
+
+    Returns:
+        Этап -> {'status', 'seconds', 'error'}
+    """
+    stages = select(list(targets))
+    forced = {stage.name for stage in stages} if force and not targets else set(targets if force else ())
+    state = load_state()
+    results: Dict[str, dict] = {}
+    pending = list(stages)
+    running = {}
+
+    def finished(stage: Stage) -> bool:
+        return stage.name in results
+
+    with ProcessPoolExecutor(max_workers=max(1, jobs)) as pool:
+        while pending or running:
+            for stage in list(pending):
+                deps = upstream(stage)
+                if not all(finished(dep) for dep in deps if dep in stages):
+                    continue
+                pending.remove(stage)
+
+                # Зависимость не выполнилась: нужен ли ее результат этому этапу
+                broken = [dep.name for dep in deps if results.get(dep.name, {}).get('status') in (FAILED, BLOCKED)
+                          or (results.get(dep.name, {}).get('status') == UNAVAILABLE
+                              and not set(dep.outputs) <= set(stage.optional))]
+                produced = {path for dep in deps for path in dep.outputs}
+                missing = [path for path in stage.inputs if path not in stage.optional
+                           and path not in produced and not os.path.exists(path)]
+                reason = stage.access() if stage.access else None
+                if broken or missing:
+                    results[stage.name] = {'status': BLOCKED, 'seconds': 0.0,
+                                           'error': f"нет входов: {', '.join(broken or missing)}"}
+                    continue
+                if reason:
+                    results[stage.name] = {'status': UNAVAILABLE, 'seconds': 0.0, 'error': reason}
+                    continue
+
+                inputs = stage.signature()
+                record = state.get(stage.name)
+                # При --dry-run входы еще не пересобраны: этап после запускаемого тоже будет запущен
+                rerun = dry_run and any(results[dep.name]['status'] == SCHEDULED for dep in deps if dep in stages)
+                if stage.name not in forced and not rerun and is_fresh(stage, inputs, record):
+                    results[stage.name] = {'status': FRESH, 'seconds': record.get('seconds', 0.0),
+                                           'error': ''}
+                    continue
+                if dry_run:
+                    results[stage.name] = {'status': SCHEDULED, 'seconds': 0.0, 'error': ''}
+                    continue
+
+                print(f"▶️  {stage.name}")
+                running[pool.submit(execute, stage.name)] = (stage, inputs)
+
+            if not running:
+                continue
+            completed, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in completed:
+                stage, inputs = running.pop(future)
+                ok, seconds, error = future.result()
+                results[stage.name] = {'status': DONE if ok else FAILED, 'seconds': seconds, 'error': error}
+                print(f"{'✅' if ok else '❌'} {stage.name} ({seconds:.1f} с){': ' + error if error else ''}")
+                if ok:
+                    state[stage.name] = {
+                        'inputs': inputs,
+                        'outputs': {path: path_digest(path) for path in stage.outputs},
+                        'finished_at': time.time(),
+                        'seconds': seconds,
+                    }
+                else:
+                    state.pop(stage.name, None)
+                save_state(state)
+
+    return results
+
+
+def print_summary(results: Dict[str, dict], total: float):
+    """Таблица этапов: статус и время"""
+    print("\n" + "=" * 70)
+    print(f"{'Этап':<12}{'Статус':<14}{'Время':>10}  Примечание")
+    print("-" * 70)
+    for stage in STAGES:
+        result = results.get(stage.name)
+        if result is None:
+            continue
+        # Для пропущенного этапа - время прошлого запуска
+        seconds = f"{result['seconds']:.1f} с" if result['status'] in (DONE, FAILED) else \
+            f"({result['seconds']:.1f} с)" if result['seconds'] else '-'
+        print(f"{stage.name:<12}{result['status']:<14}{seconds:>10}  {result['error']}")
+    print("-" * 70)
+    print(f"Всего: {total:.1f} с")
+    print("=" * 70)
+
+
+def main():
+    """Основная функция"""
+    parser = argparse.ArgumentParser(description="Граф этапов обработки данных")
+    parser.add_argument('stages', nargs='*', help=f"Этапы ({', '.join(STAGE_MAP)}), по умолчанию все")
+    parser.add_argument('--force', action='store_true', help="Запустить заново, даже если входы не менялись")
+    parser.add_argument('--jobs', type=int, default=JOBS, help="Этапов одновременно")
+    parser.add_argument('--dry-run', action='store_true', help="Только показать, что будет запущено")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.stages if name not in STAGE_MAP]
+    if unknown:
+        parser.error(f"неизвестные этапы: {', '.join(unknown)}")
+
+    print("=" * 70)
+    print(f"🔧 Обработка данных: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
+    print("=" * 70)
+    started = time.perf_counter()
+    results = run_pipeline(args.stages, args.force, args.jobs, args.dry_run)
+    print_summary(results, time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    main()
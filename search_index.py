@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Поиск блогеров по имени и никнейму (для /find и inline запросов бота)
+
+Ключи поиска записи: никнейм без @, полное имя и слова имени после
+первого. Регистр и ё/е не различаются (casefold для кириллицы и латиницы).
+
+Индекс строится один раз для снимка данных и дальше только читается:
+- префиксы: отсортированная таблица различных ключей (UTF-8, NumPy) -
+  сжатое представление trie: все ключи с префиксом q лежат одним
+  диапазоном и находятся двумя бинарными поисками. Для больших диапазонов
+  (короткие и частые префиксы) лучшие записи посчитаны заранее
+- опечатки: инвертированный индекс триграмм ключей (байты UTF-8).
+  Кандидаты берутся только из самых редких триграмм запроса, остальные
+  триграммы проверяются бинарным поиском в списках - частые триграммы
+  не перебираются целиком
+
+Требования:
+pip install numpy
+
+Бенчмарк: python search_index.py --synthetic 1000000
+"""
+
+import argparse
+import math
+import random
+import time
+from array import array
+from typing import Iterable, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    print("❌ Установите библиотеку: pip install numpy")
+    exit(1)
+
+from blogger_model import Blogger
+
+# Ключи обрезаются до этой длины (байты UTF-8): длиннее префиксы не нужны
+KEY_WIDTH = 24
+
+# Диапазон больше этого - берется заранее посчитанный топ префикса
+SCAN_LIMIT = 4096
+TOP_K = 50
+
+# Поиск с опечатками: минимальная длина запроса и порог сходства триграмм
+FUZZY_MIN_LENGTH = 4
+FUZZY_THRESHOLD = 0.4
+FUZZY_CANDIDATES = 2048
+FUZZY_VERIFY = 256
+
+# Ключей за шаг при построении индекса триграмм (ограничивает пиковую память)
+GRAM_BATCH = 100_000
+
+_SEPARATOR = '\x1f'
+
+
+def fold(text: str) -> str:
+    """Строка для сравнения: без регистра, ё -> е, одиночные пробелы"""
+    return ' '.join(text.casefold().replace('ё', 'е').split())
+
+
+def search_keys(name: str, username: str) -> List[str]:
+    """Ключи поиска записи: никнейм, полное имя, слова имени после первого"""
+    keys = []
+    handle = fold(username).lstrip('@')
+    if handle:
+        keys.append(handle)
+    name = fold(name)
+    if name:
+        keys.append(name)
+        keys.extend(name.split(' ')[1:])
+    return keys
+
+
+def _key_bytes(text: str) -> bytes:
+    return text.encode('utf-8')[:KEY_WIDTH]
+
+
+def _query_grams(key: bytes) -> List[int]:
+    """Различные триграммы ключа (коды байтов с пробелами по краям)"""
+    padded = b'  ' + key + b' '
+    return sorted({
+        (padded[i] << 16) | (padded[i + 1] << 8) | padded[i + 2]
+        for i in range(len(padded) - 2)
+    })
+
+
+class SearchHit:
+    """Найденный блогер"""
+
+    __slots__ = ('name', 'username', 'platform', 'url', 'viral_coef', 'match')
+
+    def __init__(self, name: str, username: str, platform: str, url: str,
+                 viral_coef: float, match: str):
+        self.name = name
+        self.username = username
+        self.platform = platform
+        self.url = url
+        self.viral_coef = viral_coef
+        self.match = match
+
+    def __repr__(self):
+        return f"SearchHit({self.name!r}, {self.username!r}, {self.viral_coef}x, {self.match})"
+
+
+class SearchIndexBuilder:
+    """Накопление записей за один проход по файлу"""
+
+    def __init__(self):
+        self.keys: List[bytes] = []
+        self.owners = array('q')
+        self.coefs = array('d')
+        self.records = bytearray()
+        self.offsets = array('q', [0])
+
+    def add(self, blogger: Blogger):
+        entry = len(self.coefs)
+        self.coefs.append(blogger.viral_coef)
+        # Поля для ответа хранятся одним буфером - без объекта на запись
+        self.records += _SEPARATOR.join(
+            (blogger.name, blogger.username, blogger.platform, blogger.url)
+        ).encode('utf-8')
+        self.offsets.append(len(self.records))
+        for key in search_keys(blogger.name, blogger.username):
+            self.keys.append(_key_bytes(key))
+            self.owners.append(entry)
+
+    def build(self) -> 'SearchIndex':
+        return SearchIndex(self)
+
+
+class SearchIndex:
+    """Неизменяемый индекс поиска по снимку данных"""
+
+    def __init__(self, builder: SearchIndexBuilder):
+        self.coefs = np.frombuffer(builder.coefs, dtype=np.float64)
+        self.records = bytes(builder.records)
+        self.offsets = np.frombuffer(builder.offsets, dtype=np.int64)
+
+        keys = np.array(builder.keys, dtype=f'S{KEY_WIDTH}')
+        owners = np.frombuffer(builder.owners, dtype=np.int64)
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        self.owners = owners[order]
+
+        # Различные ключи и диапазоны их владельцев в self.owners
+        if len(keys):
+            starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+        else:
+            starts = np.empty(0, dtype=np.int64)
+        self.keys = keys[starts]
+        self.key_starts = np.append(starts, len(keys))
+
+        self.top = self._prefix_tops()
+        self.gram_codes, self.gram_starts, self.postings, self.gram_counts = self._trigrams()
+
+    def __len__(self):
+        return len(self.coefs)
+
+    def _top_entries(self, owners: 'np.ndarray', k: int) -> 'np.ndarray':
+        """Различные записи с наибольшим коэффициентом (по убыванию)"""
+        coefs = self.coefs[owners]
+        if len(owners) > 3 * k:
+            picked = np.argpartition(-coefs, 3 * k)[:3 * k]
+            owners, coefs = owners[picked], coefs[picked]
+        ranked = owners[np.argsort(-coefs, kind='stable')]
+        return np.array(list(dict.fromkeys(ranked.tolist()))[:k], dtype=np.int64)
+
+    def _prefix_tops(self) -> dict:
+        """Топ записей для префиксов, диапазон которых больше SCAN_LIMIT"""
+        tops = {}
+        n = len(self.keys)
+        if not n or len(self.owners) <= SCAN_LIMIT:
+            return tops
+
+        matrix = self.keys.view(np.uint8).reshape(n, KEY_WIDTH)
+        changed = np.zeros(n - 1, dtype=bool)
+        for length in range(1, KEY_WIDTH + 1):
+            column = matrix[:, length - 1]
+            changed |= column[1:] != column[:-1]
+            group_starts = np.concatenate(([0], np.flatnonzero(changed) + 1))
+            group_ends = np.append(group_starts[1:], n)
+            sizes = self.key_starts[group_ends] - self.key_starts[group_starts]
+
+            large = np.flatnonzero((sizes > SCAN_LIMIT) & (column[group_starts] != 0))
+            if not len(large):
+                break
+            for g in large:
+                start, end = group_starts[g], group_ends[g]
+                prefix = matrix[start, :length].tobytes()
+                owners = self.owners[self.key_starts[start]:self.key_starts[end]]
+                tops[prefix] = self._top_entries(owners, TOP_K)
+        return tops
+
+    def _key_grams(self, key_ids: 'np.ndarray') -> 'np.ndarray':
+        """Коды триграмм ключей: строка на ключ, -1 за концом ключа"""
+        n = len(key_ids)
+        keys = self.keys[key_ids]
+        matrix = np.zeros((n, KEY_WIDTH + 3), dtype=np.int64)
+        matrix[:, :2] = 0x20
+        matrix[:, 2:KEY_WIDTH + 2] = keys.view(np.uint8).reshape(n, KEY_WIDTH)
+        lengths = np.char.str_len(keys)
+        matrix[np.arange(n), lengths + 2] = 0x20
+
+        codes = (matrix[:, :-2] << 16) | (matrix[:, 1:-1] << 8) | matrix[:, 2:]
+        codes[np.arange(KEY_WIDTH + 1) >= (lengths[:, None] + 1)] = -1
+        return codes
+
+    def _trigrams(self) -> Tuple['np.ndarray', 'np.ndarray', 'np.ndarray', 'np.ndarray']:
+        """Инвертированный индекс триграмм различных ключей (CSR)"""
+        n = len(self.keys)
+        chunks = []
+        for start in range(0, n, GRAM_BATCH):
+            key_ids = np.arange(start, min(start + GRAM_BATCH, n), dtype=np.int64)
+            codes = self._key_grams(key_ids)
+            valid = codes >= 0
+            chunks.append((codes[valid] << 32) | np.broadcast_to(key_ids[:, None], codes.shape)[valid])
+
+        # Сортировка + соседние различия (np.unique на десятках миллионов медленнее)
+        pairs = np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int64)
+        del chunks
+        pairs.sort()
+        if len(pairs):
+            pairs = pairs[np.concatenate(([True], pairs[1:] != pairs[:-1]))]
+        gram_of_pair = pairs >> 32
+        postings = (pairs & 0xFFFFFFFF).astype(np.int32)
+        del pairs
+
+        starts = np.flatnonzero(np.concatenate(([True], gram_of_pair[1:] != gram_of_pair[:-1])))
+        gram_codes = gram_of_pair[starts] if len(postings) else np.empty(0, dtype=np.int64)
+        gram_starts = np.append(starts, len(postings))
+        gram_counts = np.bincount(postings, minlength=n).astype(np.int32)
+        return gram_codes, gram_starts, postings, gram_counts
+
+    def entry(self, i: int, match: str) -> SearchHit:
+        """Запись индекса как результат поиска"""
+        record = self.records[self.offsets[i]:self.offsets[i + 1]].decode('utf-8')
+        name, username, platform, url = record.split(_SEPARATOR)
+        return SearchHit(name, username, platform, url, float(self.coefs[i]), match)
+
+    def _prefix(self, key: bytes, limit: int) -> Tuple[List[int], List[int]]:
+        """Записи с точным ключом и с ключом, начинающимся с key"""
+        lo = int(np.searchsorted(self.keys, key, 'left'))
+        hi = int(np.searchsorted(self.keys, key + b'\xff', 'left'))
+        if lo == hi:
+            return [], []
+
+        exact = []
+        if self.keys[lo] == key:
+            owners = self.owners[self.key_starts[lo]:self.key_starts[lo + 1]]
+            exact = self._top_entries(owners, limit).tolist()
+
+        start, end = self.key_starts[lo], self.key_starts[hi]
+        if end - start > SCAN_LIMIT:
+            ranked = self.top[key]
+        else:
+            ranked = self._top_entries(self.owners[start:end], limit + len(exact))
+        return exact, ranked.tolist()
+
+    def _fuzzy(self, key: bytes, first: bytes, limit: int) -> List[int]:
+        """Записи с похожим ключом (доля общих триграмм не ниже порога)"""
+        if not len(self.gram_codes):
+            return []
+        grams = np.array(_query_grams(key), dtype=np.int64)
+        slots = np.searchsorted(self.gram_codes, grams).clip(max=len(self.gram_codes) - 1)
+        present = self.gram_codes[slots] == grams
+        starts = np.where(present, self.gram_starts[slots], 0)
+        ends = np.where(present, self.gram_starts[slots + 1], 0)
+
+        # Первая буква считается верной: ключи с ней - один диапазон номеров,
+        # списки обрезаются до него (границы того же типа, что списки, -
+        # иначе searchsorted копирует список)
+        bounds = np.searchsorted(self.keys, [first, first + b'\xff']).astype(self.postings.dtype)
+        lists = []
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            postings = self.postings[start:end]
+            lo, hi = postings.searchsorted(bounds)
+            lists.append(postings[lo:hi])
+
+        # Похожий ключ содержит хотя бы одну из (t - m + 1) самых редких триграмм
+        total = len(grams)
+        required = math.ceil(FUZZY_THRESHOLD * total)
+        lists.sort(key=len)
+        sources = []
+        budget = FUZZY_CANDIDATES
+        for postings in lists[:total - required + 1]:
+            if budget <= 0:
+                break
+            # Очень частые триграммы (у тысяч похожих ключей) - берем часть списка
+            sources.append(postings[:budget])
+            budget -= len(postings)
+        if not sources:
+            return []
+
+        # Проверка только кандидатов, найденных в большем числе редких списков
+        candidates, hits = np.unique(np.concatenate(sources), return_counts=True)
+        if len(candidates) > FUZZY_VERIFY:
+            candidates = candidates[np.argpartition(-hits, FUZZY_VERIFY)[:FUZZY_VERIFY]]
+        if not len(candidates):
+            return []
+
+        # Общие триграммы считаются по байтам самих ключей кандидатов
+        codes = self._key_grams(candidates.astype(np.int64))
+        positions = np.searchsorted(grams, codes).clip(max=total - 1)
+        shared = np.minimum((grams[positions] == codes).sum(axis=1), total)
+        # Запрос - часто начало ключа: длинный ключ сравнивается как ключ длины запроса
+        key_total = np.minimum(self.gram_counts[candidates], total)
+        similarity = shared / np.maximum(total + key_total - shared, 1)
+        good = similarity >= FUZZY_THRESHOLD
+        candidates, similarity = candidates[good], similarity[good]
+        best = candidates[np.argsort(-similarity, kind='stable')[:limit]]
+
+        found = []
+        for key_id in best.tolist():
+            owners = self.owners[self.key_starts[key_id]:self.key_starts[key_id + 1]]
+            found.extend(owners.tolist() if len(owners) == 1 else self._top_entries(owners, limit).tolist())
+        return found
+
+    def find(self, query: str, limit: int = 10) -> List[SearchHit]:
+        """
+        Ищет блогеров по началу имени/никнейма, при нехватке - с опечатками
+
+        Порядок: точное совпадение ключа, затем по префиксу (по убыванию
+        коэффициента), затем похожие ключи
+        """
+        text = fold(query).lstrip('@')
+        if not text or not len(self.keys):
+            return []
+        key = _key_bytes(text)
+
+        exact, prefixed = self._prefix(key, limit)
+        matches = dict.fromkeys(exact, 'exact')
+        for i in prefixed:
+            matches.setdefault(i, 'prefix')
+        if len(matches) < limit and len(text) >= FUZZY_MIN_LENGTH:
+            for i in self._fuzzy(key, _key_bytes(text[0]), limit):
+                matches.setdefault(i, 'fuzzy')
+
+        return [self.entry(i, match) for i, match in list(matches.items())[:limit]]
+
+
+def build_index(bloggers: Iterable[Blogger]) -> SearchIndex:
+    """Строит индекс по потоку записей"""
+    builder = SearchIndexBuilder()
+    for blogger in bloggers:
+        builder.add(blogger)
+    return builder.build()
+
+
+def _typo(text: str, rng: random.Random) -> str:
+    position = rng.randrange(len(text))
+    return text[:position] + text[position + 1:]
+
+
+def main():
+    """Бенчмарк поиска"""
+    parser = argparse.ArgumentParser(description="Бенчмарк поиска блогеров")
+    parser.add_argument('file', nargs='?', default='fitness_trainers_viral.csv', help="CSV файл")
+    parser.add_argument('--synthetic', type=int, default=0,
+                        help="Вместо файла сгенерировать N синтетических записей")
+    parser.add_argument('--queries', type=int, default=2000, help="Количество запросов")
+    parser.add_argument('--query', help="Выполнить один запрос и показать результат")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("🔎 ПОИСК БЛОГЕРОВ")
+    print("=" * 70)
+
+    samples: List[Tuple[str, str]] = []
+
+    def bloggers() -> Iterable[Blogger]:
+        if args.synthetic:
+            from synthetic_data import generate_bloggers
+            source = generate_bloggers(args.synthetic)
+        else:
+            from blogger_model import iter_bloggers
+            source = iter_bloggers(args.file)
+        for i, blogger in enumerate(source):
+            if i % 97 == 0:
+                samples.append((blogger.name, blogger.username))
+            yield blogger
+
+    start = time.perf_counter()
+    index = build_index(bloggers())
+    built = time.perf_counter() - start
+    print(f"📄 Записей: {len(index):,}, ключей: {len(index.keys):,}, "
+          f"триграмм в индексе: {len(index.postings):,}")
+    print(f"⏱  Построение: {built:.2f} с")
+
+    if args.query:
+        for hit in index.find(args.query):
+            print(f"  {hit.match:<6} {hit.viral_coef:>6}x  {hit.name} ({hit.username}, {hit.platform})")
+        return
+    if not samples:
+        return
+
+    rng = random.Random(7)
+    kinds = {
+        'префикс никнейма': lambda name, user: user.lstrip('@')[:rng.randint(2, 8)],
+        'префикс имени': lambda name, user: name[:rng.randint(2, 10)],
+        'фамилия': lambda name, user: name.split(' ')[-1],
+        'опечатка': lambda name, user: _typo(user.lstrip('@'), rng),
+    }
+    print("\n" + "=" * 70)
+    for kind, make in kinds.items():
+        queries = [make(*rng.choice(samples)) for _ in range(args.queries)]
+        timings = []
+        found = 0
+        for query in queries:
+            started = time.perf_counter()
+            hits = index.find(query)
+            timings.append(time.perf_counter() - started)
+            found += bool(hits)
+        timings.sort()
+        print(f"{kind:<18} p50 {timings[len(timings) // 2] * 1e6:7.0f} мкс | "
+              f"p99 {timings[int(len(timings) * 0.99)] * 1e6:7.0f} мкс | "
+              f"найдено {found / len(queries):.0%}")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
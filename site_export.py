@@ -0,0 +1,674 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Статический экспорт данных для index.html
+
+Вместо разбора всего CSV в браузере страница загружает готовые JSON шарды:
+- каждый вид (платформа x корзина вирусности) заранее отфильтрован
+  и отсортирован для каждого варианта сортировки страницы
+- шард - SHARD_SIZE строк подряд, строка - массив значений в порядке
+  manifest['fields'] (числа уже числами)
+- manifest.json - версия данных, количество строк в каждом виде и
+  счетчики для баннера статистики
+
+Для первой отрисовки страница загружает manifest и один шард.
+Каждая строка попадает в 4 вида (все/своя платформа x все/своя корзина)
+для каждой из 5 сортировок - на диске примерно 20 копий данных.
+
+Шарды пишутся в папку версии (первые символы хэша CSV), manifest
+заменяется последним - клиенты не видят наполовину записанную версию.
+Хранятся текущая и предыдущая версии.
+
+С --html первая страница (по вирусности, без фильтров) и баннер статистики
+вписываются прямо в index.html между метками <!-- prerender:... -->,
+вместе с manifest и строками страницы для гидрации - первая отрисовка
+не ждет загрузки данных и не зависит от их объема.
+
+Поиск на странице идет по индексу: слова имени, никнейма и описания
+(без регистра, кириллица в латиницу - "anna" находит "Анна") сгруппированы
+в блоки по первым двум буквам, в блоке - отсортированные слова и списки
+позиций блогеров в виде "по вирусности, все". Запрос загружает только блоки
+своих префиксов и шарды с найденными строками.
+
+Для автообновления страницы публикуются снимки версий (все строки с ID
+блогера) и дельты от последних KEEP_SNAPSHOTS версий к текущей (только
+измененные и удаленные строки). versions.json - маленький файл с текущей
+версией и списком дельт: клиент с недавней версией скачивает только дельту,
+слишком старый - снимок целиком.
+
+Запуск: python site_export.py [файл.csv] [--output site_data] [--html index.html]
+
+Требования:
+pip install numpy
+"""
+
+import argparse
+import html
+import json
+import os
+import re
+import shutil
+from datetime import datetime
+from typing import Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    print("❌ Установите библиотеку: pip install numpy")
+    exit(1)
+
+from blogger_model import TRANSLIT, TREND_THRESHOLDS, Blogger, iter_bloggers
+from csv_index import file_digest
+from entity_resolution import PLATFORM_CODES
+from search_index import fold
+from snapshot_diff import blogger_key
+
+SITE_DATA_DIR = os.getenv('SITE_DATA_DIR', 'site_data')
+MANIFEST_FILE = 'manifest.json'
+MANIFEST_VERSION = 1
+
+# Снимки версий и дельты между ними для автообновления страницы
+VERSIONS_FILE = 'versions.json'
+SNAPSHOTS_DIR = 'snapshots'
+DELTAS_DIR = 'deltas'
+KEEP_SNAPSHOTS = 6
+# Дельта больше этой доли строк не публикуется - дешевле скачать снимок
+DELTA_MAX_RATIO = 0.5
+
+# Строк на странице index.html и в одном шарде (10 страниц)
+PAGE_SIZE = 18
+SHARD_SIZE = PAGE_SIZE * 10
+
+# Поля строки шарда: имя поля на странице -> атрибут Blogger
+# (отформатированные значения вычисляются свойствами Blogger при экспорте)
+FIELDS = {
+    'name': 'name',
+    'username': 'username',
+    'platform': 'platform',
+    'url': 'url',
+    'audience': 'audience_formatted',
+    'description': 'description',
+    'lastViews': 'views',
+    'lastViewsFormatted': 'views_formatted',
+    'avgViews': 'avg_views',
+    'avgViewsFormatted': 'avg_views_formatted',
+    'viralCoef': 'viral_coef',
+    'videosPerMonth': 'videos_per_month',
+    'trend': 'trend',
+}
+
+# Варианты сортировки страницы (значения <select id="sortBy">)
+SORTS = ('viral_desc', 'viral_asc', 'views_desc', 'subscribers_desc', 'name_asc')
+
+# Корзины вирусности страницы и их нижние границы (коэффициент < 1 - только в "all");
+# границы - те же, что у кодов тренда: stable / growing / viral / mega
+VIRAL_BUCKETS = ('normal', 'good', 'high', 'mega')
+VIRAL_THRESHOLDS = TREND_THRESHOLDS
+
+ALL = 'all'
+
+# Сдвиг латиницы за кириллицу для сортировки по имени
+_LATIN_SHIFT = 0x10000
+
+# Поисковый индекс: блоки по первым буквам слова
+SEARCH_DIR = 'search'
+SEARCH_PREFIX = 2
+
+# Кириллица -> латиница для слов индекса и запросов (таблица TRANSLIT уходит в manifest)
+_TRANSLIT_TABLE = str.maketrans(TRANSLIT)
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# Вид, который index.html показывает при открытии
+DEFAULT_SORT = 'viral_desc'
+DEFAULT_VIEW = 'all/all'
+
+# Размеченные области index.html: <!-- prerender:имя -->...<!-- /prerender:имя -->
+_PRERENDER_RE = re.compile(r'(<!-- prerender:(\w+) -->)(.*?)(<!-- /prerender:\2 -->)', re.S)
+
+# Значок вирусности карточки: нижняя граница -> (класс, эмодзи), как в createTrainerCard
+_CARD_BADGES = ((10, 'viral-mega', '🚀'), (5, 'viral-high', '🔥'), (2, 'viral-good', '📈'))
+
+# Папки версий шардов - первые символы хэша CSV
+_VERSION_DIR_RE = re.compile(r'[0-9a-f]{12}')
+
+
+def platform_slug(platform: str) -> str:
+    """Имя платформы для пути шарда (латиница)"""
+    slug = PLATFORM_CODES.get(platform)
+    if slug is None:
+        slug = ''.join(c for c in platform.lower() if c.isascii() and c.isalnum()) or 'other'
+    return slug
+
+
+def name_key(name: str) -> str:
+    """
+    Ключ сортировки по имени, близкий к localeCompare(..., 'ru') в браузере:
+    регистр и ё не влияют, кириллица идет раньше латиницы
+    """
+    folded = name.casefold().replace('ё', 'е')
+    return ''.join(chr(ord(c) + _LATIN_SHIFT) if 'a' <= c <= 'z' else c for c in folded)
+
+
+def view_key(platform: str, viral: str) -> str:
+    """Ключ вида в manifest['views'] и в пути шарда"""
+    return f"{platform}/{viral}"
+
+
+def shard_path(base: str, sort: str, key: str, number: int) -> str:
+    """Путь шарда относительно папки данных"""
+    return f"{base}/{sort}/{key}/{number}.json"
+
+
+def search_tokens(text: str) -> List[str]:
+    """Слова для поиска: без регистра, ё -> е, кириллица латиницей"""
+    return _TOKEN_RE.findall(fold(text).translate(_TRANSLIT_TABLE))
+
+
+def compact_json(value) -> str:
+    """JSON без пробелов и экранирования кириллицы"""
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+def encode_row(blogger: Blogger) -> str:
+    """Строка шарда в компактном JSON"""
+    return compact_json([getattr(blogger, attr) for attr in FIELDS.values()])
+
+
+class SiteColumns:
+    """Закодированные строки и колонки для фильтров и сортировок"""
+
+    def __init__(self, bloggers):
+        ids = []
+        seen: Dict[str, int] = {}
+        rows = []
+        names = []
+        texts = []
+        coef = []
+        views = []
+        subscribers = []
+        videos = []
+        platforms = []
+        platform_index: Dict[str, int] = {}
+
+        for b in bloggers:
+            # Повторы одного аккаунта в файле различаются номером
+            key = blogger_key(b)
+            seen[key] = seen.get(key, 0) + 1
+            ids.append(key if seen[key] == 1 else f"{key}#{seen[key]}")
+            rows.append(encode_row(b))
+            names.append(name_key(b.name))
+            texts.append(f"{b.name} {b.username} {b.description}")
+            coef.append(b.viral_coef)
+            views.append(b.views)
+            subscribers.append(b.subscribers or 0)
+            videos.append(b.videos_per_month)
+            platforms.append(platform_index.setdefault(b.platform, len(platform_index)))
+
+        self.ids = ids
+        self.rows = rows
+        self.names = names
+        self.texts = texts
+        self.coef = np.array(coef, dtype=np.float64)
+        self.views = np.array(views, dtype=np.int64)
+        self.subscribers = np.array(subscribers, dtype=np.int64)
+        self.videos = np.array(videos, dtype=np.int64)
+        self.platform_codes = np.array(platforms, dtype=np.int64)
+        self.platforms = list(platform_index)
+        self.bucket_codes = np.digitize(self.coef, VIRAL_THRESHOLDS) - 1
+
+    def __len__(self):
+        return len(self.rows)
+
+    def order(self, sort: str) -> 'np.ndarray':
+        """Индексы строк в порядке сортировки (устойчивой, как в браузере)"""
+        if sort == 'viral_desc':
+            return np.argsort(-self.coef, kind='stable')
+        if sort == 'viral_asc':
+            return np.argsort(self.coef, kind='stable')
+        if sort == 'views_desc':
+            return np.argsort(-self.views, kind='stable')
+        if sort == 'subscribers_desc':
+            return np.argsort(-self.subscribers, kind='stable')
+        if sort == 'name_asc':
+            return np.array(sorted(range(len(self.names)), key=self.names.__getitem__), dtype=np.int64)
+        raise ValueError(f"Неизвестная сортировка: {sort}")
+
+    def masks(self) -> Dict[str, 'np.ndarray']:
+        """Маски строк для каждого вида (платформа x корзина)"""
+        platform_masks = {ALL: np.ones(len(self), dtype=bool)}
+        for code, platform in enumerate(self.platforms):
+            platform_masks[platform_slug(platform)] = self.platform_codes == code
+        bucket_masks = {ALL: np.ones(len(self), dtype=bool)}
+        for code, bucket in enumerate(VIRAL_BUCKETS):
+            bucket_masks[bucket] = self.bucket_codes == code
+
+        return {
+            view_key(platform, bucket): platform_mask & bucket_mask
+            for platform, platform_mask in platform_masks.items()
+            for bucket, bucket_mask in bucket_masks.items()
+        }
+
+    @property
+    def facet_span(self) -> int:
+        """Число сочетаний платформа x корзина (включая коэффициент < 1)"""
+        return len(self.platforms) * (len(VIRAL_BUCKETS) + 1)
+
+    def search_blocks(self, order: 'np.ndarray') -> Dict[str, str]:
+        """
+        Блоки поискового индекса: префикс -> JSON блока
+
+        Позиция в списке - место строки в порядке order; к ней добавлен код
+        платформы и корзины (значение = позиция * span + фасет), чтобы фильтры
+        применялись без загрузки строк. Списки хранятся разностями.
+        """
+        span = self.facet_span
+        facets = self.platform_codes * (len(VIRAL_BUCKETS) + 1) + self.bucket_codes + 1
+        postings: Dict[str, List[int]] = {}
+        for position, i in enumerate(order.tolist()):
+            value = position * span + int(facets[i])
+            for token in set(search_tokens(self.texts[i])):
+                postings.setdefault(token, []).append(value)
+
+        blocks: Dict[str, List[str]] = {}
+        for token in sorted(postings):
+            blocks.setdefault(token[:SEARCH_PREFIX], []).append(token)
+
+        encoded = {}
+        for prefix, tokens in blocks.items():
+            gaps = []
+            for token in tokens:
+                values = postings[token]
+                gaps.append([values[0]] + [b - a for a, b in zip(values, values[1:])])
+            encoded[prefix] = compact_json({'tokens': tokens, 'postings': gaps})
+        return encoded
+
+    def facets(self) -> dict:
+        """Счетчики для баннера статистики и кнопок фильтров"""
+        platform_counts = np.bincount(self.platform_codes, minlength=len(self.platforms))
+        valid = self.bucket_codes >= 0
+        bucket_counts = np.bincount(self.bucket_codes[valid], minlength=len(VIRAL_BUCKETS))
+        return {
+            'stats': {
+                'total': len(self),
+                'viral': int(np.count_nonzero(self.coef >= 5)),
+                'mega': int(np.count_nonzero(self.coef >= 10)),
+                'videos': int(self.videos.sum()),
+            },
+            'platform': {p: int(c) for p, c in zip(self.platforms, platform_counts)},
+            'viral': {b: int(c) for b, c in zip(VIRAL_BUCKETS, bucket_counts)},
+        }
+
+
+def read_manifest(output_dir: str = SITE_DATA_DIR) -> Optional[dict]:
+    """Текущий manifest или None"""
+    try:
+        with open(os.path.join(output_dir, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def write_json(filename: str, data: str):
+    """Атомарная запись готового JSON текста"""
+    tmp_file = f"{filename}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        f.write(data)
+    os.replace(tmp_file, filename)
+
+
+def snapshot_file(base: str) -> str:
+    """Путь снимка версии относительно папки данных"""
+    return f"{SNAPSHOTS_DIR}/{base}.json"
+
+
+def delta_file(old_base: str, base: str) -> str:
+    """Путь дельты между версиями относительно папки данных"""
+    return f"{DELTAS_DIR}/{old_base}-{base}.json"
+
+
+def read_snapshot(filename: str) -> Dict[str, str]:
+    """Строки снимка версии: ID -> строка в компактном JSON"""
+    with open(filename, 'r', encoding='utf-8') as f:
+        snapshot = json.load(f)
+    return {
+        blogger_id: compact_json(row)
+        for blogger_id, row in zip(snapshot['ids'], snapshot['rows'])
+    }
+
+
+def encode_delta(old_base: str, base: str, old_rows: Dict[str, str],
+                 columns: SiteColumns) -> Optional[str]:
+    """JSON дельты от старой версии или None, если дельта слишком велика"""
+    changed = [i for i, (blogger_id, row) in enumerate(zip(columns.ids, columns.rows))
+               if old_rows.get(blogger_id) != row]
+    current = set(columns.ids)
+    removed = [blogger_id for blogger_id in old_rows if blogger_id not in current]
+    if len(changed) + len(removed) > DELTA_MAX_RATIO * max(len(columns), 1):
+        return None
+
+    return (f'{{"from":{json.dumps(old_base)},"to":{json.dumps(base)},'
+            f'"ids":{compact_json([columns.ids[i] for i in changed])},'
+            f'"rows":[{",".join(columns.rows[i] for i in changed)}],'
+            f'"remove":{compact_json(removed)}}}')
+
+
+def publish_versions(output_dir: str, base: str, columns: SiteColumns, generated_at: str) -> dict:
+    """
+    Пишет снимок текущей версии, дельты от прошлых версий и versions.json
+
+    Returns:
+        Содержимое versions.json
+    """
+    try:
+        with open(os.path.join(output_dir, VERSIONS_FILE), 'r', encoding='utf-8') as f:
+            history = json.load(f).get('history', [])
+    except (FileNotFoundError, ValueError):
+        history = []
+    history = [base] + [old for old in history if old != base and
+                        os.path.exists(os.path.join(output_dir, snapshot_file(old)))]
+    history = history[:KEEP_SNAPSHOTS]
+
+    os.makedirs(os.path.join(output_dir, SNAPSHOTS_DIR), exist_ok=True)
+    os.makedirs(os.path.join(output_dir, DELTAS_DIR), exist_ok=True)
+    write_json(os.path.join(output_dir, snapshot_file(base)),
+               f'{{"base":{json.dumps(base)},"fields":{compact_json(list(FIELDS))},'
+               f'"ids":{compact_json(columns.ids)},'
+               f'"rows":[{",".join(columns.rows)}]}}')
+
+    deltas = {}
+    for old_base in history[1:]:
+        delta = encode_delta(old_base, base, read_snapshot(os.path.join(output_dir, snapshot_file(old_base))),
+                             columns)
+        if delta is not None:
+            deltas[old_base] = delta_file(old_base, base)
+            write_json(os.path.join(output_dir, deltas[old_base]), delta)
+
+    versions = {
+        'current': base,
+        'generated_at': generated_at,
+        'snapshot': snapshot_file(base),
+        'deltas': deltas,
+        'history': history,
+    }
+    write_json(os.path.join(output_dir, VERSIONS_FILE), json.dumps(versions, indent=1))
+    return versions
+
+
+def prune_site_data(output_dir: str = SITE_DATA_DIR) -> List[str]:
+    """
+    Удаляет версии шардов, снимки и дельты, на которые не ссылаются manifest и versions.json
+
+    Остаются текущая и предыдущая (manifest['previous']) версии шардов - для страниц,
+    открытых до обновления, снимки версий из истории и дельты к текущей версии.
+    Данные, восстановленные из прошлой публикации, могут содержать что угодно -
+    чистка не зависит от того, пересобиралась ли версия.
+
+    Returns:
+        Удаленные пути относительно output_dir
+    """
+    manifest = read_manifest(output_dir)
+    if not manifest:
+        return []
+    try:
+        with open(os.path.join(output_dir, VERSIONS_FILE), 'r', encoding='utf-8') as f:
+            versions = json.load(f)
+    except (FileNotFoundError, ValueError):
+        versions = {}
+
+    removed = []
+    keep = {manifest['base'], manifest.get('previous')}
+    for name in os.listdir(output_dir):
+        path = os.path.join(output_dir, name)
+        if os.path.isdir(path) and _VERSION_DIR_RE.fullmatch(name) and name not in keep:
+            shutil.rmtree(path, ignore_errors=True)
+            removed.append(name)
+
+    for folder, keep in ((SNAPSHOTS_DIR, {snapshot_file(b) for b in versions.get('history', [])}),
+                         (DELTAS_DIR, set(versions.get('deltas', {}).values()))):
+        if not os.path.isdir(os.path.join(output_dir, folder)):
+            continue
+        for name in os.listdir(os.path.join(output_dir, folder)):
+            if f"{folder}/{name}" not in keep:
+                os.remove(os.path.join(output_dir, folder, name))
+                removed.append(f"{folder}/{name}")
+    return removed
+
+
+def export_site(filename: str, output_dir: str = SITE_DATA_DIR, shard_size: int = SHARD_SIZE,
+                force: bool = False) -> dict:
+    """
+    Пишет шарды и manifest для index.html
+
+    Args:
+        filename: CSV с метриками
+        output_dir: Папка данных сайта
+        shard_size: Строк в одном шарде
+        force: Пересобрать, даже если данные не изменились
+
+    Returns:
+        Записанный (или уже актуальный) manifest
+    """
+    digest = file_digest(filename)
+    previous = read_manifest(output_dir)
+    if (not force and previous and previous.get('digest') == digest
+            and previous.get('shard_size') == shard_size
+            and os.path.isdir(os.path.join(output_dir, previous['base']))
+            and os.path.exists(os.path.join(output_dir, VERSIONS_FILE))):
+        return previous
+
+    columns = SiteColumns(iter_bloggers(filename))
+    base = digest[:12]
+    version_dir = os.path.join(output_dir, base)
+    shutil.rmtree(version_dir, ignore_errors=True)
+
+    masks = columns.masks()
+    default_order = columns.order(DEFAULT_SORT)
+    blocks = columns.search_blocks(default_order)
+    os.makedirs(os.path.join(version_dir, SEARCH_DIR), exist_ok=True)
+    for prefix, block in blocks.items():
+        write_json(os.path.join(version_dir, SEARCH_DIR, f"{prefix}.json"), block)
+    views = {}
+    for sort in SORTS:
+        order = default_order if sort == DEFAULT_SORT else columns.order(sort)
+        for key, mask in masks.items():
+            indices = order[mask[order]]
+            views[key] = len(indices)
+            if not len(indices):
+                continue
+            os.makedirs(os.path.join(version_dir, sort, key), exist_ok=True)
+            for number, start in enumerate(range(0, len(indices), shard_size)):
+                rows = ','.join(columns.rows[i] for i in indices[start:start + shard_size])
+                write_json(os.path.join(output_dir, shard_path(base, sort, key, number)), f"[{rows}]")
+
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'digest': digest,
+        'base': base,
+        # Предыдущая версия шардов остается для страниц, открытых до обновления
+        'previous': previous.get('base') if previous else None,
+        'source': os.path.basename(filename),
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'page_size': PAGE_SIZE,
+        'shard_size': shard_size,
+        'fields': list(FIELDS),
+        'sorts': list(SORTS),
+        'platforms': {p: platform_slug(p) for p in columns.platforms},
+        'buckets': dict(zip(VIRAL_BUCKETS, VIRAL_THRESHOLDS)),
+        'views': views,
+        'search': {
+            'view': f"{DEFAULT_SORT}/{DEFAULT_VIEW}",
+            'prefix_length': SEARCH_PREFIX,
+            'blocks': sorted(blocks),
+            'platforms': columns.platforms,
+            'buckets': list(VIRAL_BUCKETS),
+            'facet_span': columns.facet_span,
+            'translit': TRANSLIT,
+        },
+        **columns.facets(),
+    }
+    write_json(os.path.join(output_dir, MANIFEST_FILE),
+               json.dumps(manifest, ensure_ascii=False, indent=1))
+    publish_versions(output_dir, base, columns, manifest['generated_at'])
+    prune_site_data(output_dir)
+    return manifest
+
+
+def js_number(value) -> str:
+    """Число так, как его выводит JavaScript (3.0 -> 3)"""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def render_card(t: dict) -> str:
+    """HTML карточки блогера (повторяет createTrainerCard из index.html)"""
+    e = {key: html.escape(str(value)) for key, value in t.items()}
+    platform_class = html.escape(t['platform'].lower().replace('вконтакте', 'vk'))
+    badge_class, badge_text = 'viral-normal', '➡️'
+    for threshold, css, emoji in _CARD_BADGES:
+        if t['viralCoef'] >= threshold:
+            badge_class, badge_text = css, emoji
+            break
+    coef = js_number(t['viralCoef'])
+
+    return f"""
+                <div class="trainer-card">
+                    <div class="card-header">
+                        <span class="platform-badge badge-{platform_class}">{e['platform']}</span>
+                        <span class="viral-badge {badge_class}">{badge_text} {coef}x</span>
+                    </div>
+
+                    <div class="trainer-name">{e['name']}</div>
+                    <div class="trainer-handle">{e['username']}</div>
+
+                    <div class="trainer-stats">
+                        <div class="stat">
+                            <span class="stat-label">Подписчики:</span>
+                            <span class="stat-value">{e['audience']}</span>
+                        </div>
+                        <div class="stat">
+                            <span class="stat-label">Видео/мес:</span>
+                            <span class="stat-value">{e['videosPerMonth']}</span>
+                        </div>
+                    </div>
+
+                    <div class="viral-metrics">
+                        <div class="viral-coef">
+                            <div class="viral-coef-value">{coef}x</div>
+                            <div class="viral-coef-label">Коэффициент вирусности</div>
+                        </div>
+                        <div class="viral-views">
+                            <div class="viral-views-item">
+                                <div class="viral-views-value">{e['lastViewsFormatted']}</div>
+                                <div class="viral-views-label">Последний ролик</div>
+                            </div>
+                            <div class="viral-views-item">
+                                <div class="viral-views-value">{e['avgViewsFormatted']}</div>
+                                <div class="viral-views-label">Средние</div>
+                            </div>
+                        </div>
+                    </div>
+
+                    <div class="trainer-description">{e['description']}</div>
+                    <a href="{e['url']}" class="trainer-link" target="_blank">Перейти на страницу →</a>
+                </div>
+            """
+
+
+def render_stats(stats: dict) -> str:
+    """HTML баннера статистики (как updateStats в index.html)"""
+    # toLocaleString() в ru-RU разделяет разряды неразрывным пробелом
+    items = (
+        (stats['total'], 'Всего блогеров'),
+        (stats['viral'], 'Вирусных (5x+)'),
+        (stats['mega'], 'Мега вирусных (10x+)'),
+        (f"{stats['videos']:,}".replace(',', '\u00a0'), 'Видео в месяц'),
+    )
+    return ''.join(f"""
+            <div class="stat-item">
+                <div class="stat-value">{value}</div>
+                <div class="stat-label">{label}</div>
+            </div>""" for value, label in items) + '\n            '
+
+
+def prerender_html(html_file: str, manifest: dict, output_dir: str = SITE_DATA_DIR) -> bool:
+    """
+    Вписывает первую страницу, статистику и данные для гидрации в index.html
+
+    Returns:
+        True, если файл изменился
+    """
+    key = DEFAULT_VIEW
+    rows = []
+    if manifest['views'].get(key):
+        with open(os.path.join(output_dir, shard_path(manifest['base'], DEFAULT_SORT, key, 0)),
+                  'r', encoding='utf-8') as f:
+            rows = json.load(f)[:manifest['page_size']]
+    cards = [render_card(dict(zip(manifest['fields'], row))) for row in rows]
+
+    initial = {'manifest': manifest, 'sort': DEFAULT_SORT, 'view': key, 'rows': rows}
+    # "</" внутри <script> закрыл бы тег раньше времени
+    payload = compact_json(initial).replace('</', '<\\/')
+    updated = datetime.fromisoformat(manifest['generated_at']).strftime('%d.%m.%Y, %H:%M:%S')
+
+    sections = {
+        'stats': render_stats(manifest['stats']),
+        'found': f"Найдено: {manifest['views'].get(key, 0)} блогеров",
+        'content': f"""
+            <div id="loadingMessage" class="loading" style="display: none;">
+                🔄 Загрузка данных...
+            </div>
+
+            <div id="trainersGrid" class="trainers-grid" style="display: {'grid' if cards else 'none'};">{''.join(cards)}</div>
+            """,
+        'updated': updated,
+        'data': f"""
+    <script id="initialData" type="application/json">{payload}</script>
+    """,
+    }
+
+    with open(html_file, 'r', encoding='utf-8') as f:
+        page = f.read()
+    rendered = _PRERENDER_RE.sub(
+        lambda m: m.group(1) + sections.get(m.group(2), m.group(3)) + m.group(4), page)
+    if rendered == page:
+        return False
+
+    tmp_file = f"{html_file}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        f.write(rendered)
+    os.replace(tmp_file, html_file)
+    return True
+
+
+def main():
+    """Основная функция"""
+    parser = argparse.ArgumentParser(description="Экспорт JSON шардов для index.html")
+    parser.add_argument('file', nargs='?', default='fitness_trainers_viral.csv', help="CSV файл")
+    parser.add_argument('--output', default=SITE_DATA_DIR, help="Папка данных сайта")
+    parser.add_argument('--shard-size', type=int, default=SHARD_SIZE, help="Строк в шарде")
+    parser.add_argument('--force', action='store_true', help="Пересобрать без изменений в данных")
+    parser.add_argument('--html', help="Вписать первую страницу в HTML (обычно index.html)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.file):
+        print(f"❌ Файл {args.file} не найден")
+        return
+
+    os.makedirs(args.output, exist_ok=True)
+    previous = read_manifest(args.output)
+    manifest = export_site(args.file, args.output, args.shard_size, args.force)
+    if args.html and prerender_html(args.html, manifest, args.output):
+        print(f"🖼️ Первая страница вписана в {args.html}")
+    if previous and previous['generated_at'] == manifest['generated_at']:
+        print(f"✅ Данные не изменились: {args.output}/{MANIFEST_FILE} (версия {manifest['base']})")
+        return
+
+    shards = sum(-(-count // manifest['shard_size']) for count in manifest['views'].values())
+    print(f"✅ {manifest['stats']['total']} блогеров -> {len(manifest['views'])} видов x "
+          f"{len(manifest['sorts'])} сортировок, {shards * len(manifest['sorts'])} шардов")
+    print(f"💾 {args.output}/{MANIFEST_FILE} (версия {manifest['base']})")
+
+
+if __name__ == "__main__":
+    main()
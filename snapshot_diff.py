@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Сравнение последовательных снимков данных для уведомлений
+
+Блогеры сопоставляются по ключу аккаунта (платформа:handle из URL),
+сравнение с предыдущим снимком дает события:
+- mega  - блогер вошел в мега вирусный уровень
+- jump  - коэффициент вырос на заданную величину
+- top   - новый блогер в топ-N
+
+Состояние (коэффициенты и места прошлого снимка + объявленные события)
+хранится в JSON, поэтому после перезапуска бот не повторяет старые
+уведомления. Первый запуск только запоминает исходное состояние.
+"""
+
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+from blogger_model import Blogger
+from entity_resolution import normalize_url
+
+STATE_FILE = os.getenv('VIRAL_STATE_FILE', 'viral_state.json')
+
+# Пороги событий
+MEGA_COEF = 15.0
+JUMP_COEF = 5.0
+TOP_N = 10
+
+
+def blogger_key(blogger: Blogger) -> str:
+    """Ключ аккаунта, устойчивый к вариантам записи URL"""
+    platform, handle = normalize_url(blogger.url) if blogger.url else ('', '')
+    if not handle:
+        platform, handle = blogger.platform.lower(), blogger.username.strip().lstrip('@').lower()
+    return f"{platform}:{handle}"
+
+
+class ViralEvent:
+    """Событие изменения данных о блогере"""
+
+    __slots__ = ('kind', 'key', 'blogger', 'rank', 'previous')
+
+    def __init__(self, kind: str, key: str, blogger: Blogger, rank: int,
+                 previous: Optional[float] = None):
+        self.kind = kind
+        self.key = key
+        self.blogger = blogger
+        self.rank = rank
+        self.previous = previous
+
+    @property
+    def event_id(self) -> str:
+        """Идентификатор для учета объявленных событий"""
+        if self.kind == 'jump':
+            return f"jump:{self.key}:{self.blogger.viral_coef}"
+        return f"{self.kind}:{self.key}"
+
+    def __repr__(self):
+        return f"ViralEvent({self.kind!r}, {self.key!r}, {self.blogger.viral_coef}x)"
+
+
+class SnapshotDiff:
+    """Сравнивает рейтинг вирусных блогеров с предыдущим и помнит объявленное"""
+
+    def __init__(self, state_file: str = STATE_FILE, mega_coef: float = MEGA_COEF,
+                 jump_coef: float = JUMP_COEF, top_n: int = TOP_N):
+        self.state_file = state_file
+        self.mega_coef = mega_coef
+        self.jump_coef = jump_coef
+        self.top_n = top_n
+        self.previous: Optional[Dict[str, list]] = None
+        self.announced: Dict[str, str] = {}
+        self.load()
+
+    def load(self):
+        """Читает состояние прошлого запуска"""
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"⚠️  Не удалось прочитать {self.state_file}: {e} - начинаю заново")
+            return
+        self.previous = state.get('bloggers')
+        self.announced = state.get('announced', {})
+
+    def save(self):
+        """Сохраняет состояние атомарно (через временный файл)"""
+        tmp_file = f"{self.state_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'bloggers': self.previous, 'announced': self.announced},
+                      f, ensure_ascii=False)
+        os.replace(tmp_file, self.state_file)
+
+    def diff(self, ranking: Sequence[Blogger]) -> List[ViralEvent]:
+        """
+        Новые события относительно прошлого снимка (состояние не меняется)
+
+        Args:
+            ranking: Вирусные блогеры по убыванию коэффициента
+        """
+        if self.previous is None:
+            return []
+
+        events = []
+        for rank, blogger in enumerate(ranking, 1):
+            key = blogger_key(blogger)
+            coef = blogger.viral_coef
+            before = self.previous.get(key)
+            before_coef, before_rank = before if before else (None, None)
+
+            if coef >= self.mega_coef and (before_coef is None or before_coef < self.mega_coef):
+                event = ViralEvent('mega', key, blogger, rank, before_coef)
+            elif before_coef is not None and coef - before_coef >= self.jump_coef:
+                event = ViralEvent('jump', key, blogger, rank, before_coef)
+            elif rank <= self.top_n and (before_rank is None or before_rank > self.top_n):
+                event = ViralEvent('top', key, blogger, rank, before_coef)
+            else:
+                continue
+
+            if event.event_id not in self.announced:
+                events.append(event)
+        return events
+
+    def commit(self, ranking: Sequence[Blogger], announced: Sequence[ViralEvent] = ()):
+        """Запоминает снимок как прошлый и отмечает объявленные события"""
+        first_run = self.previous is None
+        current = {}
+        for rank, blogger in enumerate(ranking, 1):
+            current.setdefault(blogger_key(blogger), [blogger.viral_coef, rank])
+        self.previous = current
+
+        now = datetime.now().isoformat(timespec='seconds')
+        for event in announced:
+            self.announced[event.event_id] = now
+
+        # Событие снова можно объявить, когда блогер покинул уровень или топ
+        self.announced = {
+            event_id: at for event_id, at in self.announced.items()
+            if self._still_holds(event_id, current)
+        }
+        self.save()
+
+        if first_run:
+            print(f"📌 Исходное состояние сохранено: {len(current)} блогеров")
+
+    def _still_holds(self, event_id: str, current: Dict[str, list]) -> bool:
+        kind, rest = event_id.split(':', 1)
+        if kind == 'jump':
+            key, coef = rest.rsplit(':', 1)
+            return current.get(key, [0])[0] >= float(coef)
+        state = current.get(rest)
+        if state is None:
+            return False
+        if kind == 'mega':
+            return state[0] >= self.mega_coef
+        return state[1] <= self.top_n
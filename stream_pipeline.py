@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Потоковый конвейер обработки данных о блогерах
+
+Этапы - генераторы, которые соединяются друг с другом:
+чтение -> фильтр URL с кириллицей -> разбор аудитории -> метрики -> запись.
+В памяти одновременно находится только текущий блок строк, поэтому
+конвейер обрабатывает многомиллионные файлы при постоянном расходе памяти.
+
+CPU-ёмкий этап метрик можно выполнять в пуле процессов:
+PIPELINE_WORKERS=4 python clean_original_data.py
+"""
+
+import csv
+import os
+import random
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, Union
+
+from blogger_model import COLUMN_ATTRS, FIELDNAMES, Blogger, finish_write, iter_bloggers, parse_audience
+
+# Количество процессов для этапа метрик (0 - в текущем процессе)
+WORKERS = int(os.getenv('PIPELINE_WORKERS', '0'))
+
+# Размер блока строк для пула процессов и для записи на диск
+CHUNK_SIZE = 10_000
+
+# Буфер файла при записи
+WRITE_BUFFER = 1 << 20
+
+_CYRILLIC_RE = re.compile(r'[а-яА-ЯёЁ]')
+
+
+def has_cyrillic_in_url(url: str) -> bool:
+    """Проверяет наличие кириллицы в URL"""
+    return _CYRILLIC_RE.search(url) is not None
+
+
+def chunked(items: Iterable, size: int) -> Iterator[list]:
+    """Разбивает поток на списки длиной не более size"""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def read_stage(filename: str) -> Iterator[Blogger]:
+    """Этап чтения: потоково выдает записи из CSV"""
+    return iter_bloggers(filename)
+
+
+def filter_cyrillic_urls(bloggers: Iterable[Blogger]) -> Iterator[Blogger]:
+    """Этап фильтрации: пропускает записи с кириллицей в URL"""
+    for blogger in bloggers:
+        if not has_cyrillic_in_url(blogger.url):
+            yield blogger
+
+
+def audience_stage(bloggers: Iterable[Blogger], missing: str,
+                   default: Union[int, Callable[[], int]]) -> Iterator[Tuple[Blogger, int]]:
+    """
+    Этап разбора аудитории: выдает пары (запись, число подписчиков)
+
+    Args:
+        bloggers: Поток записей
+        missing: Строка аудитории для записей без значения (например '10K')
+        default: Число или функция, если строку разобрать не удалось
+    """
+    for blogger in bloggers:
+        subscribers = parse_audience(blogger.audience or missing)
+        if subscribers is None:
+            subscribers = default() if callable(default) else default
+        yield blogger, subscribers
+
+
+def _reseed():
+    """Инициализатор процесса: свой генератор случайных чисел в каждом процессе"""
+    random.seed()
+
+
+def _apply_chunk(func: Callable, chunk: list) -> list:
+    return [func(item) for item in chunk]
+
+
+def metrics_stage(items: Iterable, func: Callable, workers: int = WORKERS,
+                  chunk_size: int = CHUNK_SIZE) -> Iterator[Blogger]:
+    """
+    Этап расчета метрик: применяет func к каждому элементу
+
+    При workers > 0 блоки по chunk_size элементов обрабатываются в пуле
+    процессов. Порядок строк сохраняется, а в работе одновременно не больше
+    2 * workers блоков - память остается постоянной. func должна быть
+    функцией уровня модуля (пересылается в процессы через pickle).
+    """
+    if workers <= 0:
+        for item in items:
+            yield func(item)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_reseed) as executor:
+        pending = deque()
+        for chunk in chunked(items, chunk_size):
+            pending.append(executor.submit(_apply_chunk, func, chunk))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def apply_metrics(blogger: Blogger, metrics: dict) -> Blogger:
+    """Записывает словарь метрик с русскими названиями колонок в запись"""
+    for column, value in metrics.items():
+        setattr(blogger, COLUMN_ATTRS[column], value)
+    return blogger
+
+
+def tap(bloggers: Iterable[Blogger], callback: Callable[[Blogger], None]) -> Iterator[Blogger]:
+    """Пропускает поток без изменений, вызывая callback для каждой записи"""
+    for blogger in bloggers:
+        callback(blogger)
+        yield blogger
+
+
+def write_stage(bloggers: Iterable[Blogger], filename: str,
+                fieldnames: Optional[List[str]] = None, chunk_size: int = CHUNK_SIZE) -> int:
+    """
+    Этап записи: сохраняет поток в CSV блоками
+
+    Returns:
+        Количество записанных строк
+    """
+    fieldnames = fieldnames or FIELDNAMES
+    attrs = [COLUMN_ATTRS[column] for column in fieldnames]
+    count = 0
+
+    tmp_file = f"{filename}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8-sig', newline='', buffering=WRITE_BUFFER) as f:
+        writer = csv.writer(f)
+        writer.writerow(fieldnames)
+        for chunk in chunked(bloggers, chunk_size):
+            writer.writerows([getattr(blogger, attr) for attr in attrs] for blogger in chunk)
+            count += len(chunk)
+
+    finish_write(tmp_file, filename)
+    return count
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Хранилище подписчиков бота с персональными фильтрами уведомлений
+
+Подписки хранятся в SQLite и переживают перезапуск бота. Фильтры
+подписки: платформы, минимальный коэффициент, диапазон подписчиков
+блогера и список конкретных блогеров.
+
+Для рассылки подписки индексируются в памяти:
+- корзины по платформе (и общая корзина "все платформы")
+- корзины по handle блогера для подписок на конкретных блогеров
+Внутри корзины подписки отсортированы по минимальному коэффициенту,
+поэтому для события с коэффициентом c бинарный поиск сразу отсекает
+подписки с порогом выше c - полный перебор подписок не нужен.
+Подписки без фильтра по числу подписчиков лежат в отдельных корзинах
+и выдаются срезом списка без проверки каждой.
+
+С background=True (так работает бот) индекс в памяти меняется сразу,
+а запись в SQLite уходит в очередь одного потока-писателя: обработчик
+команды не ждет commit на event loop, порядок записей сохраняется.
+"""
+
+import os
+import sqlite3
+from bisect import bisect_left, bisect_right
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence
+
+from blogger_model import parse_audience
+from snapshot_diff import ViralEvent
+
+SUBSCRIBERS_DB = os.getenv('SUBSCRIBERS_DB', 'subscribers.db')
+
+ALL_PLATFORMS = '*'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS subscriptions (
+    chat_id INTEGER PRIMARY KEY,
+    platforms TEXT NOT NULL DEFAULT '',
+    min_coef REAL NOT NULL DEFAULT 0,
+    min_followers INTEGER NOT NULL DEFAULT 0,
+    max_followers INTEGER,
+    bloggers TEXT NOT NULL DEFAULT '',
+    created_at TEXT NOT NULL
+)
+"""
+
+_COLUMNS = ('chat_id', 'platforms', 'min_coef', 'min_followers', 'max_followers', 'bloggers')
+
+
+class Subscription:
+    """Подписка одного чата с фильтрами"""
+
+    __slots__ = ('chat_id', 'platforms', 'min_coef', 'min_followers', 'max_followers', 'bloggers')
+
+    def __init__(self, chat_id: int, platforms: Iterable[str] = (), min_coef: float = 0.0,
+                 min_followers: int = 0, max_followers: Optional[int] = None,
+                 bloggers: Iterable[str] = ()):
+        self.chat_id = chat_id
+        self.platforms: FrozenSet[str] = frozenset(platforms)
+        self.min_coef = min_coef
+        self.min_followers = min_followers
+        self.max_followers = max_followers
+        self.bloggers: FrozenSet[str] = frozenset(bloggers)
+
+    @classmethod
+    def from_row(cls, row: tuple) -> 'Subscription':
+        chat_id, platforms, min_coef, min_followers, max_followers, bloggers = row
+        return cls(chat_id, filter(None, platforms.split(',')), min_coef, min_followers,
+                   max_followers, filter(None, bloggers.split(',')))
+
+    def to_row(self) -> tuple:
+        return (self.chat_id, ','.join(sorted(self.platforms)), self.min_coef,
+                self.min_followers, self.max_followers, ','.join(sorted(self.bloggers)))
+
+    @property
+    def has_followers_filter(self) -> bool:
+        return bool(self.min_followers) or self.max_followers is not None
+
+    def index_keys(self) -> List[str]:
+        """Корзины индекса, в которые попадает подписка"""
+        if self.bloggers:
+            # Блогер - на каждой выбранной платформе: фильтр платформ действует и здесь
+            platforms = self.platforms or (ALL_PLATFORMS,)
+            keys = [f"blogger:{platform}:{key}" for platform in platforms for key in self.bloggers]
+        elif self.platforms:
+            keys = [f"platform:{platform}" for platform in self.platforms]
+        else:
+            keys = [f"platform:{ALL_PLATFORMS}"]
+        if self.has_followers_filter:
+            keys = [f"{key}|followers" for key in keys]
+        return keys
+
+    def accepts_followers(self, followers: Optional[int]) -> bool:
+        """Проверка диапазона подписчиков блогера (неизвестное число проходит без фильтра)"""
+        if followers is None:
+            return not self.has_followers_filter
+        if followers < self.min_followers:
+            return False
+        return self.max_followers is None or followers <= self.max_followers
+
+    def describe(self) -> str:
+        """Описание фильтров для пользователя"""
+        lines = [
+            f"Платформы: {', '.join(sorted(self.platforms)) if self.platforms else 'все'}",
+            f"Минимальный коэффициент: {self.min_coef}x",
+        ]
+        if self.has_followers_filter:
+            upper = self.max_followers if self.max_followers is not None else '∞'
+            lines.append(f"Подписчики блогера: {self.min_followers} - {upper}")
+        if self.bloggers:
+            lines.append(f"Блогеры: {', '.join(sorted(self.bloggers))}")
+        return '\n'.join(lines)
+
+
+class _ThresholdBucket:
+    """Чаты, отсортированные по минимальному коэффициенту (параллельные списки)"""
+
+    __slots__ = ('coefs', 'chats')
+
+    def __init__(self):
+        self.coefs: List[float] = []
+        self.chats: List[int] = []
+
+    def __len__(self):
+        return len(self.chats)
+
+    def add(self, coef: float, chat_id: int):
+        position = bisect_right(self.coefs, coef)
+        self.coefs.insert(position, coef)
+        self.chats.insert(position, chat_id)
+
+    def remove(self, coef: float, chat_id: int):
+        lo = bisect_left(self.coefs, coef)
+        hi = bisect_right(self.coefs, coef)
+        position = self.chats.index(chat_id, lo, hi)
+        del self.coefs[position]
+        del self.chats[position]
+
+    def up_to(self, coef: float) -> List[int]:
+        """Чаты с порогом не выше coef"""
+        return self.chats[:bisect_right(self.coefs, coef)]
+
+
+def _report_write_error(future: Future):
+    error = future.exception()
+    if error is not None:
+        print(f"⚠️  Не удалось сохранить подписку: {error}")
+
+
+class SubscriberStore:
+    """Подписки в SQLite + индекс для сопоставления событий с чатами"""
+
+    def __init__(self, filename: str = SUBSCRIBERS_DB, background: bool = False):
+        """
+        Args:
+            filename: Файл SQLite
+            background: Писать в SQLite в отдельном потоке (для event loop)
+        """
+        self.filename = filename
+        # Соединением пользуется только поток-писатель (и этот - до первой записи)
+        self.db = sqlite3.connect(filename, check_same_thread=not background)
+        self.db.execute(_SCHEMA)
+        self.db.commit()
+        self._writer: Optional[ThreadPoolExecutor] = None
+        if background:
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='subscribers')
+
+        self._subscriptions: Dict[int, Subscription] = {}
+        self._buckets: Dict[str, _ThresholdBucket] = {}
+        for row in self.db.execute(f"SELECT {', '.join(_COLUMNS)} FROM subscriptions"):
+            self._index(Subscription.from_row(row))
+
+    def __len__(self):
+        return len(self._subscriptions)
+
+    def __contains__(self, chat_id: int) -> bool:
+        return chat_id in self._subscriptions
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(list(self._subscriptions))
+
+    def get(self, chat_id: int) -> Optional[Subscription]:
+        return self._subscriptions.get(chat_id)
+
+    def _index(self, subscription: Subscription):
+        self._subscriptions[subscription.chat_id] = subscription
+        for key in subscription.index_keys():
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = _ThresholdBucket()
+            bucket.add(subscription.min_coef, subscription.chat_id)
+
+    def _unindex(self, subscription: Subscription):
+        del self._subscriptions[subscription.chat_id]
+        for key in subscription.index_keys():
+            bucket = self._buckets[key]
+            bucket.remove(subscription.min_coef, subscription.chat_id)
+            if not bucket:
+                del self._buckets[key]
+
+    def _execute(self, sql: str, params: tuple):
+        self.db.execute(sql, params)
+        self.db.commit()
+
+    def _write(self, sql: str, params: tuple):
+        """Запрос с commit - сразу или в очередь потока-писателя"""
+        if self._writer is None:
+            self._execute(sql, params)
+        else:
+            self._writer.submit(self._execute, sql, params).add_done_callback(_report_write_error)
+
+    def flush(self):
+        """Ждет, пока поток-писатель сохранит все изменения"""
+        if self._writer is not None:
+            self._writer.submit(lambda: None).result()
+
+    def _save(self, subscription: Subscription):
+        self._write(
+            f"INSERT INTO subscriptions ({', '.join(_COLUMNS)}, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(chat_id) DO UPDATE SET platforms = excluded.platforms, "
+            "min_coef = excluded.min_coef, min_followers = excluded.min_followers, "
+            "max_followers = excluded.max_followers, bloggers = excluded.bloggers",
+            subscription.to_row() + (datetime.now().isoformat(timespec='seconds'),)
+        )
+
+    def subscribe(self, chat_id: int) -> bool:
+        """Подписывает чат с фильтрами по умолчанию; False - уже подписан"""
+        if chat_id in self._subscriptions:
+            return False
+        subscription = Subscription(chat_id)
+        self._save(subscription)
+        self._index(subscription)
+        return True
+
+    def unsubscribe(self, chat_id: int) -> bool:
+        """Удаляет подписку; False - подписки не было"""
+        subscription = self._subscriptions.get(chat_id)
+        if subscription is None:
+            return False
+        self._write("DELETE FROM subscriptions WHERE chat_id = ?", (chat_id,))
+        self._unindex(subscription)
+        return True
+
+    def update(self, chat_id: int, **filters) -> Subscription:
+        """
+        Меняет фильтры подписки (подписывает чат, если подписки нет)
+
+        Args:
+            filters: platforms, min_coef, min_followers, max_followers, bloggers
+        """
+        current = self._subscriptions.get(chat_id) or Subscription(chat_id)
+        values = {name: getattr(current, name) for name in Subscription.__slots__}
+        values.update(filters)
+        subscription = Subscription(**values)
+
+        self._save(subscription)
+        if chat_id in self._subscriptions:
+            self._unindex(current)
+        self._index(subscription)
+        return subscription
+
+    def migrate(self, old_chat_id: int, new_chat_id: int):
+        """Переносит подписку на новый id чата (группа стала супергруппой)"""
+        subscription = self._subscriptions.get(old_chat_id)
+        if subscription is None:
+            return
+        # Сначала новая запись, потом удаление старой: при ошибке подписка не теряется
+        values = {name: getattr(subscription, name) for name in Subscription.__slots__ if name != 'chat_id'}
+        self.update(new_chat_id, **values)
+        self.unsubscribe(old_chat_id)
+
+    def match(self, handle: str, platform: str, coef: float,
+              followers: Optional[int]) -> List[int]:
+        """Чаты, которым интересно событие о блогере"""
+        chats = []
+        for key in (f"platform:{platform}", f"platform:{ALL_PLATFORMS}",
+                    f"blogger:{platform}:{handle}", f"blogger:{ALL_PLATFORMS}:{handle}"):
+            # Подписки с порогом не выше coef - префикс отсортированной корзины
+            bucket = self._buckets.get(key)
+            if bucket:
+                chats.extend(bucket.up_to(coef))
+
+            bucket = self._buckets.get(f"{key}|followers")
+            if bucket:
+                subscriptions = self._subscriptions
+                chats.extend(chat_id for chat_id in bucket.up_to(coef)
+                             if subscriptions[chat_id].accepts_followers(followers))
+        return chats
+
+    def match_events(self, events: Sequence[ViralEvent]) -> Dict[int, List[ViralEvent]]:
+        """Распределяет события по чатам с учетом фильтров"""
+        matches: Dict[int, List[ViralEvent]] = {}
+        for event in events:
+            blogger = event.blogger
+            followers = parse_audience(blogger.audience) if blogger.audience else None
+            handle = event.key.split(':', 1)[-1]
+            for chat_id in self.match(handle, blogger.platform, blogger.viral_coef, followers):
+                matches.setdefault(chat_id, []).append(event)
+        return matches
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.shutdown(wait=True)
+        self.db.close()
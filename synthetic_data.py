@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Детерминированный генератор синтетических данных о блогерах
+
+Для нагрузочного тестирования бота, экспорта сайта и аналитики:
+- один и тот же seed всегда дает один и тот же файл
+- случайные величины выбираются векторно блоками (NumPy) с теми же
+  распределениями, что и generate_short_video_metrics
+- имена и никнеймы уникальны без повторных попыток: счетчик на базовое значение
+- результат выдается потоком и пишется в CSV блоками (10K-10M строк)
+
+Требования:
+pip install numpy
+
+Запуск: python synthetic_data.py 1000000 --seed 42 --output synthetic.csv
+"""
+
+import argparse
+import re
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    print("❌ Установите библиотеку: pip install numpy")
+    exit(1)
+
+from blogger_model import TRANSLIT, Blogger, trend_code
+from stream_pipeline import write_stage
+
+# Базовые данные для генерации
+FIRST_NAMES_FEMALE = [
+    "Анастасия", "Мария", "Дарья", "Екатерина", "Анна", "Полина", "Ольга", "Елена",
+    "Ирина", "Татьяна", "Наталья", "Юлия", "Светлана", "Виктория", "Алена", "Кристина",
+    "Валерия", "Ксения", "Марина", "Диана", "Алина", "София", "Вероника", "Александра",
+    "Евгения", "Оксана", "Людмила", "Инна", "Галина", "Яна"
+]
+
+FIRST_NAMES_MALE = [
+    "Александр", "Дмитрий", "Сергей", "Андрей", "Алексей", "Иван", "Евгений", "Михаил",
+    "Владимир", "Николай", "Максим", "Артем", "Денис", "Павел", "Егор", "Роман",
+    "Кирилл", "Игорь", "Антон", "Виктор", "Олег", "Юрий", "Константин", "Илья"
+]
+
+LAST_NAMES = [
+    "Иванова", "Петрова", "Сидорова", "Козлова", "Новикова", "Морозова", "Попова",
+    "Волкова", "Соколова", "Лебедева", "Егорова", "Павлова", "Семенова", "Голубева",
+    "Виноградова", "Богданова", "Воробьева", "Федорова", "Михайлова", "Беляева",
+    "Иванов", "Петров", "Сидоров", "Козлов", "Новиков", "Морозов", "Попов",
+    "Волков", "Соколов", "Лебедев", "Егоров", "Павлов", "Семенов", "Голубев"
+]
+
+PLATFORMS = ["Instagram", "YouTube", "TikTok", "Telegram", "ВКонтакте"]
+
+DESCRIPTIONS = [
+    "Помогаю достичь фигуры мечты без диет и изнуряющих тренировок",
+    "Онлайн-тренировки для похудения и набора мышечной массы",
+    "Персональные программы тренировок и питания",
+    "Марафоны похудения, более 500 учеников достигли результата",
+    "Функциональный тренинг для всех уровней подготовки",
+    "Здоровое тело через правильное движение и питание",
+    "Йога и растяжка для гибкости и здоровья позвоночника",
+    "Силовые тренировки для набора мышечной массы",
+    "Домашние тренировки без оборудования",
+    "Курсы по правильному питанию и ЗОЖ",
+    "Трансформация тела: до и после. Реальные результаты",
+    "Фитнес для мам: восстановление после родов",
+    "Профессиональные программы онлайн-тренировок",
+    "Здоровый образ жизни и мотивация каждый день",
+    "Растяжка, шпагат за 30 дней",
+    "Бодибилдинг и правильное питание для роста мышц",
+    "Калистеника: сила и рельеф без тренажерного зала",
+    "Йога для начинающих: путь к гармонии тела и духа",
+    "Кроссфит и функциональные тренировки",
+    "ПП-рецепты и тренировки для стройности"
+]
+
+FIRST_NAME_TAGS = ['fit', 'sport', 'fitness', 'yoga', 'health']
+LAST_NAME_TAGS = ['training', 'coach', 'trainer', 'pro']
+
+# Аудитория по платформам (как в generate_expanded_data.generate_audience)
+AUDIENCE_RANGES = {
+    "Instagram": (1000, 300000, "K"),
+    "YouTube": (1000, 300000, "K"),
+    "TikTok": (1000, 300000, "K+"),
+    "Telegram": (1000, 100000, "K+"),
+    "ВКонтакте": (1000, 200000, "K"),
+}
+
+SHORT_FORMATS = {
+    'Instagram': 'Reels',
+    'TikTok': 'Видео',
+    'YouTube': 'Shorts',
+    'ВКонтакте': 'Клипы',
+    'Telegram': 'Видео'
+}
+
+# Смесь распределений коэффициента вирусности (как в generate_short_video_metrics)
+COEF_BAND_EDGES = (0.70, 0.90, 0.98)
+COEF_BAND_LOW = (0.8, 2.0, 5.0, 10.0)
+COEF_BAND_HIGH = (2.0, 5.0, 10.0, 50.0)
+
+# Фиксированная точка отсчета дат - результат зависит только от seed
+REFERENCE_TIME = datetime(2025, 11, 8, 12, 0)
+
+BATCH_SIZE = 100_000
+
+_NAME_SUFFIX_RE = re.compile(r'^(.*) (\d+)$')
+
+
+def transliterate(text: str) -> str:
+    """Переводит кириллицу в латиницу для никнеймов и URL"""
+    return ''.join(TRANSLIT.get(ch, ch) for ch in text.lower())
+
+
+def _reserved_counters(reserved_names: Iterable[str]) -> Dict[str, int]:
+    """Счетчики базовых имен, чтобы не пересечься с уже существующими"""
+    counters = {}
+    for name in reserved_names:
+        match = _NAME_SUFFIX_RE.match(name)
+        if match:
+            base, next_index = match.group(1), int(match.group(2)) + 1
+        else:
+            base, next_index = name, 1
+        if counters.get(base, 0) < next_index:
+            counters[base] = next_index
+    return counters
+
+
+class SyntheticGenerator:
+    """Генератор синтетических блогеров с фиксированным seed"""
+
+    def __init__(self, seed: int = 42, reserved_names: Iterable[str] = (),
+                 reference_time: datetime = REFERENCE_TIME, with_metrics: bool = True):
+        self.rng = np.random.default_rng(seed)
+        self.with_metrics = with_metrics
+        self.name_counters = _reserved_counters(reserved_names)
+        self.username_counters = {}
+
+        self.first_names = FIRST_NAMES_FEMALE + FIRST_NAMES_MALE
+        self.first_latin = [transliterate(n) for n in self.first_names]
+        self.last_latin = [transliterate(n) for n in LAST_NAMES]
+
+        self.audience_low = np.array([AUDIENCE_RANGES[p][0] for p in PLATFORMS])
+        self.audience_high = np.array([AUDIENCE_RANGES[p][1] for p in PLATFORMS])
+        self.dates = [
+            (reference_time - timedelta(days=d)).isoformat(timespec='seconds') for d in range(31)
+        ]
+
+    def _sample(self, n: int) -> dict:
+        """Векторно выбирает все случайные величины для блока из n строк"""
+        rng = self.rng
+        female = rng.random(n) < 0.65  # 65% женщин, 35% мужчин
+        first = np.where(
+            female,
+            rng.integers(0, len(FIRST_NAMES_FEMALE), n),
+            len(FIRST_NAMES_FEMALE) + rng.integers(0, len(FIRST_NAMES_MALE), n)
+        )
+        platform = rng.integers(0, len(PLATFORMS), n)
+        audience = rng.integers(self.audience_low[platform], self.audience_high[platform] + 1)
+
+        sample = {
+            'first': first,
+            'last': rng.integers(0, len(LAST_NAMES), n),
+            'platform': platform,
+            'pattern': rng.integers(0, 6, n),
+            'first_tag': rng.integers(0, len(FIRST_NAME_TAGS), n),
+            'last_tag': rng.integers(0, len(LAST_NAME_TAGS), n),
+            'number': rng.integers(100, 1000, n),
+            'audience': audience,
+            'description': rng.integers(0, len(DESCRIPTIONS), n),
+        }
+
+        if self.with_metrics:
+            band = np.searchsorted(COEF_BAND_EDGES, rng.random(n), side='right')
+            low = np.take(COEF_BAND_LOW, band)
+            high = np.take(COEF_BAND_HIGH, band)
+            coef = low + (high - low) * rng.random(n)
+            views = (audience * coef).astype(np.int64)
+            sample.update({
+                'coef': np.round(coef, 2),
+                'views': views,
+                'avg_views': (views * rng.uniform(0.3, 0.7, n)).astype(np.int64),
+                'videos': rng.integers(4, 31, n),
+                'days_ago': rng.integers(0, 31, n),
+            })
+
+        return {key: value.tolist() for key, value in sample.items()}
+
+    def _unique_name(self, base: str) -> str:
+        index = self.name_counters.get(base, 0)
+        self.name_counters[base] = index + 1
+        return base if index == 0 else f"{base} {index}"
+
+    def _unique_username(self, base: str) -> str:
+        # Суффикс "_N" не совпадает ни с одним базовым никнеймом
+        index = self.username_counters.get(base, 0)
+        self.username_counters[base] = index + 1
+        return base if index == 0 else f"{base}_{index}"
+
+    def _username_base(self, first: int, last: int, pattern: int,
+                       first_tag: int, last_tag: int, number: int) -> str:
+        f, l = self.first_latin[first], self.last_latin[last]
+        if pattern == 0:
+            return f"{f}_{l}"
+        elif pattern == 1:
+            return f"{f}.{l}"
+        elif pattern == 2:
+            return f"{f}{l}"
+        elif pattern == 3:
+            return f"{f}_{FIRST_NAME_TAGS[first_tag]}"
+        elif pattern == 4:
+            return f"{l}_{LAST_NAME_TAGS[last_tag]}"
+        return f"{f[:4]}{number}"
+
+    def batch(self, n: int) -> List[Blogger]:
+        """Генерирует блок из n записей"""
+        s = self._sample(n)
+        bloggers = []
+
+        for i in range(n):
+            first, last = s['first'][i], s['last'][i]
+            platform = PLATFORMS[s['platform'][i]]
+            name = self._unique_name(f"{self.first_names[first]} {LAST_NAMES[last]}")
+            handle = self._unique_username(self._username_base(
+                first, last, s['pattern'][i], s['first_tag'][i], s['last_tag'][i], s['number'][i]
+            ))
+
+            if platform == "Instagram":
+                username, url = f"@{handle}", f"https://instagram.com/{handle}"
+            elif platform == "TikTok":
+                username, url = f"@{handle}", f"https://tiktok.com/@{handle}"
+            elif platform == "Telegram":
+                username, url = f"@{handle}", f"https://t.me/{handle}"
+            elif platform == "ВКонтакте":
+                username, url = handle.replace("_", " ").title(), f"https://vk.com/{handle}"
+            else:
+                username, url = handle, f"https://youtube.com/c/{handle}"
+
+            blogger = Blogger(
+                name=name,
+                username=username,
+                platform=platform,
+                url=url,
+                audience=f"{s['audience'][i] // 1000}{AUDIENCE_RANGES[platform][2]}",
+                description=DESCRIPTIONS[s['description'][i]]
+            )
+
+            if self.with_metrics:
+                coef = s['coef'][i]
+                blogger.video_format = SHORT_FORMATS[platform]
+                blogger.views = s['views'][i]
+                blogger.avg_views = s['avg_views'][i]
+                blogger.viral_coef = coef
+                blogger.videos_per_month = s['videos'][i]
+                blogger.last_updated = self.dates[s['days_ago'][i]]
+                blogger.trend_value = trend_code(coef)
+
+            bloggers.append(blogger)
+
+        return bloggers
+
+
+def generate_bloggers(count: int, seed: int = 42, reserved_names: Iterable[str] = (),
+                      with_metrics: bool = True,
+                      batch_size: int = BATCH_SIZE) -> Iterator[Blogger]:
+    """
+    Потоково генерирует count синтетических блогеров
+
+    Args:
+        count: Количество записей
+        seed: Зерно генератора (одинаковый seed - одинаковые данные)
+        reserved_names: Уже занятые имена (например, из реальной базы)
+        with_metrics: Добавить метрики вирусности (иначе только 6 базовых колонок)
+        batch_size: Размер блока векторной генерации
+    """
+    generator = SyntheticGenerator(seed, reserved_names, with_metrics=with_metrics)
+    remaining = count
+    while remaining > 0:
+        n = min(batch_size, remaining)
+        yield from generator.batch(n)
+        remaining -= n
+
+
+def write_synthetic_csv(filename: str, count: int, seed: int = 42,
+                        fieldnames: Optional[List[str]] = None) -> int:
+    """Записывает count синтетических блогеров в CSV, возвращает число строк"""
+    return write_stage(generate_bloggers(count, seed=seed), filename, fieldnames)
+
+
+def main():
+    """Основная функция"""
+    parser = argparse.ArgumentParser(description="Генератор синтетических данных о блогерах")
+    parser.add_argument('count', type=int, nargs='?', default=10_000, help="Количество записей")
+    parser.add_argument('--seed', type=int, default=42, help="Зерно генератора")
+    parser.add_argument('--output', default='fitness_trainers_synthetic.csv', help="Файл CSV")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"Генерация {args.count:,} синтетических блогеров (seed={args.seed})")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    written = write_synthetic_csv(args.output, args.count, seed=args.seed)
+    elapsed = time.perf_counter() - start
+
+    print(f"✅ Записано: {written:,} строк в {args.output}")
+    print(f"⏱  Время: {elapsed:.1f} с ({written / elapsed:,.0f} строк/с)")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,22 +4,35 @@
 Telegram бот для уведомлений о вирусных роликах фитнес-блогеров
 
 Требования:
-pip install python-telegram-bot python-dotenv
+pip install python-telegram-bot python-dotenv numpy
 
 Настройка:
 1. Создайте бота через @BotFather в Telegram
 2. Скопируйте токен бота
 3. Создайте файл .env с содержимым: TELEGRAM_BOT_TOKEN=ваш_токен
 4. Запустите: python telegram_bot.py
+
+Webhook режим (вместо long polling, нужен pip install aiohttp):
+BOT_MODE=webhook WEBHOOK_URL=https://example.com python telegram_bot.py
 """
 
 import os
-import csv
 import asyncio
+import time
 from datetime import datetime
-from typing import List, Dict
-from telegram import Update
-from telegram.ext import Application, CommandHandler, ContextTypes
+from typing import Dict, List, Optional
+from telegram import InlineQueryResultArticle, InputTextMessageContent, Update
+from telegram.ext import Application, CommandHandler, ContextTypes, InlineQueryHandler
+
+from blogger_model import COLLECTED_FILE, VIRAL_FILE, Blogger, parse_audience
+from broadcast import Broadcaster
+from change_events import ChangeListener
+from data_snapshot import Snapshot, SnapshotCache
+from entity_resolution import PLATFORM_CODES, normalize_url
+from leaderboard import METRICS, LeaderboardTracker, Movers, format_value
+from search_index import SearchHit
+from snapshot_diff import SnapshotDiff, ViralEvent
+from subscriber_store import SubscriberStore
 
 # Загрузка переменных окружения
 try:
@@ -29,40 +42,213 @@ except ImportError:
     print("Установите python-dotenv: pip install python-dotenv")
 
 BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN', 'YOUR_BOT_TOKEN_HERE')
-CHECK_INTERVAL = 30 * 60  # 30 минут
 
-# Хранилище подписчиков
-subscribers = set()
+# Режим получения обновлений: polling или webhook
+BOT_MODE = os.getenv('BOT_MODE', 'polling')
+WEBHOOK_URL = os.getenv('WEBHOOK_URL', '')
+WEBHOOK_HOST = os.getenv('WEBHOOK_HOST', '127.0.0.1')
+WEBHOOK_PORT = int(os.getenv('WEBHOOK_PORT', '8443'))
+WEBHOOK_PATH = os.getenv('WEBHOOK_PATH', '/telegram')
+WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET', '')
 
-def load_viral_data() -> List[Dict]:
-    """Загружает данные о блогерах из CSV"""
-    data = []
-    try:
-        with open('fitness_trainers_viral.csv', 'r', encoding='utf-8-sig') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                try:
-                    coef = float(row.get('Коэффициент_вирусности', 0))
-                    if coef >= 5.0:  # Только вирусные
-                        data.append({
-                            'name': row['Имя'],
-                            'platform': row['Платформа'],
-                            'username': row['Никнейм/Название'],
-                            'viral_coef': coef,
-                            'views': row['Просмотры_последнего_форматир'],
-                            'url': row['Ссылка']
-                        })
-                except (ValueError, KeyError):
-                    continue
-    except FileNotFoundError:
-        print("Файл fitness_trainers_viral.csv не найден!")
-
-    return sorted(data, key=lambda x: x['viral_coef'], reverse=True)
+# Адрес Bot API (для локальных тестов с fake_telegram.py)
+TELEGRAM_API_URL = os.getenv('TELEGRAM_API_URL', '')
+
+# Бот показывает результат сборщиков, а пока его нет - базовый файл; события ждем от обоих
+DATA_FILES = (COLLECTED_FILE, VIRAL_FILE)
+CHECK_INTERVAL = 30 * 60  # 30 минут - запасная проверка, основная по событиям коллекторов
+ALERT_MIN_COEF = 15.0
+MAX_EVENTS_PER_ALERT = 10
+
+# Поиск: результатов в ответе /find и в inline режиме (Telegram - не больше 50)
+FIND_RESULTS = 10
+INLINE_RESULTS = 20
+INLINE_CACHE_TIME = 60
+
+# Движение в рейтинге: сколько блогеров показывать в каждом списке /movers
+MOVERS_SHOWN = 5
+
+# Хранилище подписчиков с фильтрами (SQLite, переживает перезапуск);
+# открывается при запуске приложения, запись в SQLite - в отдельном потоке
+subscribers: Optional[SubscriberStore] = None
+
+# Названия платформ для /filter: instagram, tiktok, vk -> как в базе
+PLATFORM_NAMES = {name.lower(): name for name in PLATFORM_CODES}
+PLATFORM_NAMES.update({code: name for name, code in PLATFORM_CODES.items()})
+
+# Рассылка уведомлений и слушатель событий (создаются при запуске приложения)
+broadcaster: Optional[Broadcaster] = None
+change_listener: Optional[ChangeListener] = None
+
+# Проверка по событию и периодическая проверка не должны идти одновременно
+check_lock = asyncio.Lock()
+
+def render_top10(snapshot: Snapshot) -> str:
+    """Текст ответа /top10"""
+    if not snapshot.viral:
+        return "Данные не найдены"
+
+    message = "🔥 ТОП-10 ВИРУСНЫХ БЛОГЕРОВ\n\n"
+    for i, blogger in enumerate(snapshot.viral[:10], 1):
+        emoji = "🚀" if blogger.viral_coef >= 10 else "🔥"
+        message += (
+            f"{i}. {blogger.name} ({blogger.platform})\n"
+            f"   {emoji} {blogger.viral_coef}x | 👁 {blogger.views_formatted}\n"
+            f"   🔗 {blogger.url}\n\n"
+        )
+    return message
+
+def render_mega(snapshot: Snapshot) -> str:
+    """Текст ответа /mega"""
+    if not snapshot.mega:
+        return "Пока нет мега вирусных роликов"
+
+    message = "🚀 МЕГА ВИРУСНЫЕ РОЛИКИ (10x+)\n\n"
+    for i, blogger in enumerate(snapshot.mega[:10], 1):
+        message += (
+            f"{i}. {blogger.name} ({blogger.platform})\n"
+            f"   🚀 {blogger.viral_coef}x | 👁 {blogger.views_formatted}\n"
+            f"   {blogger.username}\n"
+            f"   🔗 {blogger.url}\n\n"
+        )
+    return message
+
+def render_stats(snapshot: Snapshot) -> Optional[str]:
+    """Текст ответа /stats без строки времени (None - данных нет)"""
+    if not snapshot:
+        return None
+
+    buckets = snapshot.buckets
+    message = (
+        "📊 СТАТИСТИКА ВИРУСНОГО КОНТЕНТА\n\n"
+        f"Всего вирусных блогеров: {buckets['viral'] + buckets['mega']}\n"
+        f"🚀 Мега вирусных (10x+): {buckets['mega']}\n"
+        f"🔥 Вирусных (5-10x): {buckets['viral']}\n\n"
+        "По платформам:\n"
+    )
+    for platform, count in snapshot.platform_counts.items():
+        message += f"  • {platform}: {count}\n"
+    return message
+
+def render_hit(hit: SearchHit) -> str:
+    """Карточка найденного блогера"""
+    emoji = "🚀" if hit.viral_coef >= 10 else "🔥" if hit.viral_coef >= 5 else "📊"
+    similar = " (похожее)" if hit.match == 'fuzzy' else ""
+    return (
+        f"{hit.name} ({hit.platform}){similar}\n"
+        f"   {emoji} {hit.viral_coef}x | {hit.username}\n"
+        f"   🔗 {hit.url}\n"
+    )
+
+def render_blogger(blogger: Blogger) -> str:
+    """Полная карточка блогера из индекса строк (/find по URL или @handle)"""
+    return (
+        f"{blogger.name} ({blogger.platform})\n"
+        f"   👥 {blogger.audience_formatted} | 🚀 {blogger.viral_coef}x | {blogger.trend}\n"
+        f"   👁 {blogger.views_formatted} последний, {blogger.avg_views_formatted} в среднем, "
+        f"{blogger.videos_per_month} видео/мес\n"
+        f"   ⏰ {blogger.updated_formatted}\n"
+        f"   🔗 {blogger.url}\n"
+    )
+
+def render_hits(query: str, hits: List[SearchHit]) -> str:
+    """Текст ответа /find"""
+    if not hits:
+        return f"Ничего не найдено по запросу «{query}»"
+
+    message = f"🔎 ПОИСК: {query}\n\n"
+    for i, hit in enumerate(hits, 1):
+        message += f"{i}. {render_hit(hit)}\n"
+    return message
+
+def render_movers(movers: Optional[Movers], metric: str) -> str:
+    """Текст ответа /movers"""
+    if movers is None:
+        return "📌 Рейтинг запомнен - движение появится после следующего обновления данных"
+    if not movers:
+        return f"Изменений в топ-{movers.window} нет"
+
+    message = f"📈 ДВИЖЕНИЕ В РЕЙТИНГЕ ({METRICS[metric]}, топ-{movers.window})\n\n"
+    if movers.climbers:
+        message += "⬆️ Поднялись:\n"
+        for mover in movers.climbers[:MOVERS_SHOWN]:
+            label = mover.label
+            message += (
+                f"  {label['name']} ({label['platform']}): "
+                f"#{mover.previous_rank} → #{mover.rank} (+{mover.delta})\n"
+            )
+        message += "\n"
+    if movers.drops:
+        message += "⬇️ Опустились:\n"
+        for mover in movers.drops[:MOVERS_SHOWN]:
+            label = mover.label
+            now = f"#{mover.rank} ({mover.delta})" if mover.rank is not None else "нет в данных"
+            message += f"  {label['name']} ({label['platform']}): #{mover.previous_rank} → {now}\n"
+        message += "\n"
+    if movers.newcomers:
+        message += "🆕 Новые:\n"
+        for mover in movers.newcomers[:MOVERS_SHOWN]:
+            label = mover.label
+            message += (
+                f"  {label['name']} ({label['platform']}): "
+                f"#{mover.rank}, {format_value(metric, mover.value)}\n"
+            )
+    return message
+
+def render_event(event: ViralEvent) -> str:
+    """Текст одного события для уведомления"""
+    blogger = event.blogger
+    if event.kind == 'mega':
+        header = f"🚀 {blogger.name} ({blogger.platform}) - мега вирусный ролик!\n"
+    elif event.kind == 'jump':
+        header = f"📈 {blogger.name} ({blogger.platform}) - рост {event.previous}x → {blogger.viral_coef}x\n"
+    else:
+        header = f"🏆 {blogger.name} ({blogger.platform}) - новый в топ-10 (#{event.rank})\n"
+
+    return (
+        header +
+        f"Коэффициент: {blogger.viral_coef}x\n"
+        f"Просмотры: {blogger.views_formatted}\n"
+        f"Ссылка: {blogger.url}\n\n"
+    )
+
+def render_events(events: List[ViralEvent]) -> Optional[str]:
+    """Текст уведомления о новых событиях (None - уведомлять не о чем)"""
+    if not events:
+        return None
+
+    message = "🚨 НОВЫЙ МЕГА ВИРУСНЫЙ РОЛИК!\n\n" if events[0].kind == 'mega' else "🚨 ИЗМЕНЕНИЯ В ТОПЕ!\n\n"
+    for event in events[:MAX_EVENTS_PER_ALERT]:
+        message += render_event(event)
+    if len(events) > MAX_EVENTS_PER_ALERT:
+        message += f"...и еще {len(events) - MAX_EVENTS_PER_ALERT}\n"
+    return message
+
+def render_replies(snapshot: Snapshot) -> Dict[str, Optional[str]]:
+    """Готовые ответы на команды - строятся один раз для каждого снимка"""
+    return {
+        'top10': render_top10(snapshot),
+        'mega': render_mega(snapshot),
+        'stats': render_stats(snapshot),
+    }
+
+def data_file() -> str:
+    """Файл, который показывает бот: первый существующий из DATA_FILES"""
+    return next((filename for filename in DATA_FILES if os.path.exists(filename)), VIRAL_FILE)
+
+# Снимок данных в памяти (перезагружается при изменении файла)
+viral_snapshot = SnapshotCache(data_file(), render=render_replies)
+
+# Сравнение с прошлой проверкой: уведомления только о новых событиях
+viral_diff = SnapshotDiff(mega_coef=ALERT_MIN_COEF)
+
+# Места в рейтингах двух последних различных снимков (для /movers)
+leaderboard = LeaderboardTracker()
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Обработчик команды /start"""
     user_id = update.effective_user.id
-    subscribers.add(user_id)
+    subscribers.subscribe(user_id)
 
     await update.message.reply_text(
         "🔥 Добро пожаловать в систему мониторинга вирусных роликов!\n\n"
@@ -72,108 +258,250 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "/stop - Отписаться от уведомлений\n"
         "/top10 - Топ-10 вирусных блогеров сейчас\n"
         "/mega - Мега вирусные ролики (10x+)\n"
-        "/stats - Статистика по вирусному контенту"
+        "/stats - Статистика по вирусному контенту\n"
+        "/find <имя, никнейм, @handle или ссылка> - Найти блогера\n"
+        "/movers - Кто поднялся и опустился в рейтинге\n"
+        "/filter - Настроить фильтры уведомлений"
     )
 
 async def stop(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Обработчик команды /stop"""
     user_id = update.effective_user.id
-    if user_id in subscribers:
-        subscribers.remove(user_id)
+    if subscribers.unsubscribe(user_id):
         await update.message.reply_text("❌ Вы отписаны от уведомлений")
     else:
         await update.message.reply_text("Вы не были подписаны на уведомления")
 
 async def top10(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Показывает топ-10 вирусных блогеров"""
-    data = load_viral_data()
-
-    if not data:
-        await update.message.reply_text("Данные не найдены")
-        return
-
-    message = "🔥 ТОП-10 ВИРУСНЫХ БЛОГЕРОВ\n\n"
-    for i, blogger in enumerate(data[:10], 1):
-        emoji = "🚀" if blogger['viral_coef'] >= 10 else "🔥"
-        message += (
-            f"{i}. {blogger['name']} ({blogger['platform']})\n"
-            f"   {emoji} {blogger['viral_coef']}x | 👁 {blogger['views']}\n"
-            f"   🔗 {blogger['url']}\n\n"
-        )
-
-    await update.message.reply_text(message)
+    snapshot = await viral_snapshot.get()
+    await update.message.reply_text(snapshot.replies['top10'])
 
 async def mega_viral(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Показывает мега вирусные ролики (10x+)"""
-    data = load_viral_data()
-    mega = [b for b in data if b['viral_coef'] >= 10]
+    snapshot = await viral_snapshot.get()
+    await update.message.reply_text(snapshot.replies['mega'])
 
-    if not mega:
-        await update.message.reply_text("Пока нет мега вирусных роликов")
+async def stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Показывает статистику"""
+    message = (await viral_snapshot.get()).replies['stats']
+    if message is None:
+        await update.message.reply_text("Данные не найдены")
         return
 
-    message = "🚀 МЕГА ВИРУСНЫЕ РОЛИКИ (10x+)\n\n"
-    for i, blogger in enumerate(mega[:10], 1):
-        message += (
-            f"{i}. {blogger['name']} ({blogger['platform']})\n"
-            f"   🚀 {blogger['viral_coef']}x | 👁 {blogger['views']}\n"
-            f"   {blogger['username']}\n"
-            f"   🔗 {blogger['url']}\n\n"
-        )
+    message += f"\n⏰ Обновлено: {datetime.now().strftime('%d.%m.%Y %H:%M')}"
 
     await update.message.reply_text(message)
 
-async def stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Показывает статистику"""
-    data = load_viral_data()
+async def find(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Ищет блогера по имени или никнейму"""
+    query = ' '.join(context.args or [])
+    if not query:
+        await update.message.reply_text("Использование: /find <имя или никнейм>\nНапример: /find anna")
+        return
 
-    total = len(data)
-    mega = len([b for b in data if b['viral_coef'] >= 10])
-    high = len([b for b in data if 5 <= b['viral_coef'] < 10])
+    snapshot = await viral_snapshot.get()
+    if snapshot.search is None:
+        await update.message.reply_text("Данные не найдены")
+        return
 
-    platforms = {}
-    for b in data:
-        platforms[b['platform']] = platforms.get(b['platform'], 0) + 1
+    # URL, @handle или platform:handle - точная запись из индекса строк CSV
+    if snapshot.rows is not None and (query.startswith('@') or '/' in query or ':' in query):
+        bloggers = snapshot.rows.get(query)
+        if bloggers:
+            await update.message.reply_text("\n".join(render_blogger(b) for b in bloggers[:FIND_RESULTS]))
+            return
+
+    await update.message.reply_text(render_hits(query, snapshot.search.find(query, FIND_RESULTS)))
+
+async def inline_find(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Inline поиск: @бот <имя или никнейм> в любом чате"""
+    query = update.inline_query.query.strip()
+    snapshot = await viral_snapshot.get()
+    if not query or snapshot.search is None:
+        await update.inline_query.answer([], cache_time=INLINE_CACHE_TIME)
+        return
 
-    message = (
-        "📊 СТАТИСТИКА ВИРУСНОГО КОНТЕНТА\n\n"
-        f"Всего вирусных блогеров: {total}\n"
-        f"🚀 Мега вирусных (10x+): {mega}\n"
-        f"🔥 Вирусных (5-10x): {high}\n\n"
-        "По платформам:\n"
-    )
+    results = [
+        InlineQueryResultArticle(
+            id=str(i),
+            title=f"{hit.name} ({hit.platform})",
+            description=f"{hit.viral_coef}x | {hit.username}",
+            url=hit.url,
+            input_message_content=InputTextMessageContent(render_hit(hit)),
+        )
+        for i, hit in enumerate(snapshot.search.find(query, INLINE_RESULTS))
+    ]
+    await update.inline_query.answer(results, cache_time=INLINE_CACHE_TIME)
+
+async def movers(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Показывает движение в рейтинге (/movers views - по средним просмотрам)"""
+    metric = 'avg_views' if context.args and context.args[0].lower() in ('views', 'просмотры') else 'viral_coef'
+    snapshot = await viral_snapshot.get()
+    if snapshot.leaderboard is None:
+        await update.message.reply_text("Данные не найдены")
+        return
 
-    for platform, count in sorted(platforms.items(), key=lambda x: x[1], reverse=True):
-        message += f"  • {platform}: {count}\n"
+    leaderboard.update(snapshot.leaderboard)
+    await update.message.reply_text(render_movers(leaderboard.movers(metric), metric))
 
-    message += f"\n⏰ Обновлено: {datetime.now().strftime('%d.%m.%Y %H:%M')}"
+FILTER_HELP = (
+    "⚙️ Фильтры уведомлений\n\n"
+    "/filter platforms TikTok Instagram - только эти платформы (all - все)\n"
+    "/filter coef 10 - минимальный коэффициент\n"
+    "/filter followers 10K 1M - диапазон подписчиков блогера\n"
+    "/filter bloggers @user1 @user2 - только эти блогеры (none - все)\n"
+    "/filter reset - сбросить фильтры"
+)
 
-    await update.message.reply_text(message)
+async def filter_settings(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Обработчик команды /filter - настройка фильтров уведомлений"""
+    user_id = update.effective_user.id
+    args = context.args or []
+
+    if not args:
+        subscription = subscribers.get(user_id)
+        if subscription is None:
+            await update.message.reply_text("Вы не подписаны. Отправьте /start")
+            return
+        await update.message.reply_text(f"{subscription.describe()}\n\n{FILTER_HELP}")
+        return
 
-async def check_viral_updates(context: ContextTypes.DEFAULT_TYPE):
-    """Периодически проверяет новые вирусные ролики"""
-    data = load_viral_data()
+    name, values = args[0].lower(), args[1:]
+    try:
+        if name == 'reset':
+            subscribers.unsubscribe(user_id)
+            subscription = subscribers.update(user_id)
+        elif name == 'platforms':
+            platforms = [] if values == ['all'] else [PLATFORM_NAMES[v.lower()] for v in values]
+            subscription = subscribers.update(user_id, platforms=platforms)
+        elif name == 'coef':
+            subscription = subscribers.update(user_id, min_coef=float(values[0].rstrip('xх')))
+        elif name == 'followers':
+            bounds = [parse_audience(v) for v in values[:2]]
+            if not bounds or None in bounds:
+                raise ValueError(values)
+            subscription = subscribers.update(
+                user_id, min_followers=bounds[0],
+                max_followers=bounds[1] if len(bounds) > 1 else None
+            )
+        elif name == 'bloggers':
+            handles = [] if values == ['none'] else [
+                normalize_url(v)[1] if '/' in v else v.lstrip('@').lower() for v in values
+            ]
+            subscription = subscribers.update(user_id, bloggers=handles)
+        else:
+            raise ValueError(name)
+    except (KeyError, IndexError, ValueError):
+        await update.message.reply_text(f"Не удалось разобрать фильтр\n\n{FILTER_HELP}")
+        return
 
-    # Находим новые мега вирусные ролики
-    new_mega = [b for b in data if b['viral_coef'] >= 15][:5]
+    await update.message.reply_text(f"✅ Фильтры обновлены\n\n{subscription.describe()}")
 
-    if new_mega and subscribers:
-        message = "🚨 НОВЫЙ МЕГА ВИРУСНЫЙ РОЛИК!\n\n"
+async def check_viral_updates(context: ContextTypes.DEFAULT_TYPE):
+    """Периодически проверяет новые вирусные ролики (запасной путь)"""
+    async with check_lock:
+        await run_viral_check(context.bot)
+
+async def on_data_changed(events):
+    """Коллектор записал файл - проверяем сразу"""
+    async with check_lock:
+        await run_viral_check(broadcaster.bot)
+    delay = time.time() - min(event['at'] for event in events)
+    print(f"⚡ Проверка по событию: {delay * 1000:.0f} мс от записи файла")
+
+async def run_viral_check(bot):
+    """Сравнивает данные с прошлой проверкой и рассылает новые события"""
+    filename = data_file()
+    switched = filename != viral_snapshot.filename
+    if switched:
+        # Сборщики впервые записали результат - дальше бот показывает его
+        print(f"🔀 Данные: {viral_snapshot.filename} -> {filename}")
+        viral_snapshot.filename = filename
+    snapshot = await viral_snapshot.refresh(force=switched)
+    if not snapshot:
+        return
+    leaderboard.update(snapshot.leaderboard)
+
+    events = viral_diff.diff(snapshot.viral)
+    matches = subscribers.match_events(events)
+
+    if matches:
+        # У многих чатов одинаковый набор событий - текст строится один раз
+        rendered = {}
+        messages = {}
+        for user_id, user_events in matches.items():
+            key = tuple(map(id, user_events))
+            if key not in rendered:
+                rendered[key] = render_events(user_events)
+            messages[user_id] = rendered[key]
+
+        # Отправка уведомлений подписчикам с учетом лимитов Telegram
+        report = await (broadcaster or Broadcaster(bot)).send_all(messages)
+
+        for user_id in report.blocked:
+            subscribers.unsubscribe(user_id)
+        for old_id, new_id in report.migrated.items():
+            subscribers.migrate(old_id, new_id)
+
+        print(report.summary())
+
+    viral_diff.commit(snapshot.viral, events)
+
+async def post_shutdown(application: Application):
+    """Закрывает сокет событий и хранилище подписчиков"""
+    if change_listener is not None:
+        change_listener.close()
+    if subscribers is not None:
+        # Дожидается записи последних изменений в SQLite
+        subscribers.close()
+
+async def post_init(application: Application):
+    """Открывает подписчиков, загружает данные, готовит рассылку и подписывается на события коллекторов"""
+    global broadcaster, change_listener, subscribers
+    subscribers = SubscriberStore(background=True)
+    print(f"👥 Подписчиков: {len(subscribers)}")
+    broadcaster = Broadcaster(application.bot)
+
+    change_listener = ChangeListener(on_data_changed, files=DATA_FILES)
+    if await change_listener.start():
+        print(f"👂 События коллекторов: {change_listener.path}")
+
+    snapshot = await viral_snapshot.refresh(force=True)
+    print(f"📦 Загружено вирусных блогеров: {len(snapshot.viral)}")
+
+def build_application(token: str, base_url: Optional[str] = None) -> Application:
+    """Создает приложение с обработчиками команд и периодической проверкой"""
+    # Обработчики не держат состояние между await, поэтому обновления
+    # обрабатываются параллельно - ответ одному чату не ждет другие
+    builder = (
+        Application.builder().token(token)
+        .concurrent_updates(True)
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+    )
+    if base_url:
+        builder = builder.base_url(base_url)
+    application = builder.build()
 
-        for blogger in new_mega:
-            message += (
-                f"🚀 {blogger['name']} ({blogger['platform']})\n"
-                f"Коэффициент: {blogger['viral_coef']}x\n"
-                f"Просмотры: {blogger['views']}\n"
-                f"Ссылка: {blogger['url']}\n\n"
-            )
+    # Регистрация обработчиков команд
+    application.add_handler(CommandHandler("start", start))
+    application.add_handler(CommandHandler("stop", stop))
+    application.add_handler(CommandHandler("top10", top10))
+    application.add_handler(CommandHandler("mega", mega_viral))
+    application.add_handler(CommandHandler("stats", stats))
+    application.add_handler(CommandHandler("filter", filter_settings))
+    application.add_handler(CommandHandler("find", find))
+    application.add_handler(CommandHandler("movers", movers))
+    application.add_handler(InlineQueryHandler(inline_find))
 
-        # Отправка уведомлений всем подписчикам
-        for user_id in subscribers:
-            try:
-                await context.bot.send_message(chat_id=user_id, text=message)
-            except Exception as e:
-                print(f"Ошибка отправки сообщения пользователю {user_id}: {e}")
+    # Добавление периодической проверки (каждые 30 минут)
+    job_queue = application.job_queue
+    if job_queue is None:
+        print('⚠️  Запасная проверка отключена: pip install "python-telegram-bot[job-queue]"')
+    else:
+        job_queue.run_repeating(check_viral_updates, interval=CHECK_INTERVAL, first=10)
+    return application
 
 def main():
     """Запуск бота"""
@@ -190,29 +518,33 @@ def main():
         print("\n" + "=" * 60)
         return
 
-    # Создание приложения
-    application = Application.builder().token(BOT_TOKEN).build()
-
-    # Регистрация обработчиков команд
-    application.add_handler(CommandHandler("start", start))
-    application.add_handler(CommandHandler("stop", stop))
-    application.add_handler(CommandHandler("top10", top10))
-    application.add_handler(CommandHandler("mega", mega_viral))
-    application.add_handler(CommandHandler("stats", stats))
+    if BOT_MODE not in ('polling', 'webhook'):
+        print(f"ОШИБКА: неизвестный BOT_MODE={BOT_MODE} (polling или webhook)")
+        return
+    if BOT_MODE == 'webhook' and not WEBHOOK_URL:
+        print("ОШИБКА: для webhook режима укажите WEBHOOK_URL=https://ваш.домен")
+        return
 
-    # Добавление периодической проверки (каждые 30 минут)
-    job_queue = application.job_queue
-    job_queue.run_repeating(check_viral_updates, interval=CHECK_INTERVAL, first=10)
+    application = build_application(BOT_TOKEN, TELEGRAM_API_URL or None)
 
     print("=" * 60)
     print("🤖 Telegram бот запущен!")
     print("=" * 60)
-    print(f"Проверка вирусного контента каждые {CHECK_INTERVAL // 60} минут")
+    print("Проверка вирусного контента сразу после обновления данных коллекторами")
+    print(f"Запасная проверка каждые {CHECK_INTERVAL // 60} минут")
+    print(f"Режим: {BOT_MODE}")
     print("Нажмите Ctrl+C для остановки")
     print("=" * 60)
 
     # Запуск бота
-    application.run_polling(allowed_updates=Update.ALL_TYPES)
+    if BOT_MODE == 'webhook':
+        from webhook_server import serve_webhook
+        asyncio.run(serve_webhook(
+            application, WEBHOOK_URL, WEBHOOK_HOST, WEBHOOK_PORT, WEBHOOK_PATH, WEBHOOK_SECRET or None
+        ))
+    else:
+        # run_polling сам удаляет webhook, если бот раньше работал в webhook режиме
+        application.run_polling(allowed_updates=Update.ALL_TYPES)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,54 @@
+import asyncio
+import os
+import shutil
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from change_events import ChangeListener  # noqa: E402
+
+# Запись результата сборщиков тем же путем, что и collector_daemon (save_bloggers -> finish_write)
+COLLECTOR_WRITE = """
+import sys
+sys.path.insert(0, {root!r})
+from collector_daemon import CollectorDaemon, RefreshSchedule
+daemon = CollectorDaemon({{}}, RefreshSchedule())
+daemon.dirty = True
+daemon.flush()
+"""
+
+
+def test_collector_write_reaches_bot_listener(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    shutil.copyfile(os.path.join(ROOT, 'fitness_trainers_viral.csv'), 'fitness_trainers_viral.csv')
+    import telegram_bot
+
+    socket_path = str(tmp_path / 'events.sock')
+    env = dict(os.environ, CHANGE_EVENTS_SOCKET=socket_path)
+
+    async def scenario():
+        received = asyncio.Event()
+        events = []
+
+        async def callback(batch):
+            events.extend(batch)
+            received.set()
+
+        listener = ChangeListener(callback, files=telegram_bot.DATA_FILES, path=socket_path, debounce=0.01)
+        assert await listener.start()
+        try:
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, '-c', COLLECTOR_WRITE.format(root=ROOT), env=env,
+                stdout=subprocess.DEVNULL)
+            assert await process.wait() == 0
+            await asyncio.wait_for(received.wait(), timeout=5)
+        finally:
+            listener.close()
+        return events
+
+    events = asyncio.run(scenario())
+    assert [event['file'] for event in events] == [str(tmp_path / 'fitness_trainers_viral_real.csv')]
+    # Бот переключается на результат сборщиков, как только он появился
+    assert telegram_bot.data_file() == 'fitness_trainers_viral_real.csv'
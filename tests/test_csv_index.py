@@ -0,0 +1,27 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from csv_index import RowIndex, index_file  # noqa: E402
+
+
+@pytest.mark.parametrize('damage', [lambda data: b'', lambda data: data[:200]])
+def test_broken_sidecar_is_rebuilt(tmp_path, damage):
+    filename = str(tmp_path / 'bloggers.csv')
+    shutil.copyfile(os.path.join(ROOT, 'fitness_trainers_viral.csv'), filename)
+    rows = len(RowIndex.open(filename).hashes)
+
+    with open(index_file(filename), 'rb') as f:
+        data = f.read()
+    with open(index_file(filename), 'wb') as f:
+        f.write(damage(data))
+
+    index = RowIndex.open(filename)
+    assert len(index.hashes) == rows
+    assert RowIndex.load(filename) is not None
+    index.close()
@@ -0,0 +1,45 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from blogger_model import Blogger  # noqa: E402
+from entity_resolution import EntityResolver, pair_quality, synthetic_duplicates  # noqa: E402
+
+
+def resolve(*bloggers):
+    resolver = EntityResolver()
+    for row, blogger in enumerate(bloggers, 1):
+        resolver.add(blogger, 'test', row)
+    return resolver, resolver.resolve()
+
+
+def test_gendered_names_are_not_merged():
+    _, clusters = resolve(
+        Blogger(name='Сергей Козлов', platform='Instagram', url='https://instagram.com/sergey_kozlov'),
+        Blogger(name='Сергей Козлова', platform='Instagram', url='https://instagram.com/sergeykozlova'),
+        Blogger(name='Евгений Голубев', platform='TikTok', url='https://tiktok.com/@evgeniy_golubev'),
+        Blogger(name='Евгения Голубев', platform='TikTok', url='https://tiktok.com/@evgeniyagolubev'),
+    )
+    assert len(clusters) == 4
+
+
+def test_fuzzy_variants_are_merged():
+    resolver, clusters = resolve(
+        Blogger(name='Диана Сидорова', platform='Telegram', url='https://t.me/diana_sport'),
+        Blogger(name='Сидорова Диана', platform='Telegram', url='https://t.me/diana_ssport'),
+    )
+    assert len(clusters) == 1
+    assert resolver.merge_reason(1).startswith('fuzzy:')
+
+
+def test_synthetic_quality():
+    resolver = EntityResolver()
+    truth = []
+    for row, (entity, blogger) in enumerate(synthetic_duplicates(20_000), 1):
+        resolver.add(blogger, 'synthetic', row)
+        truth.append(entity)
+    precision, recall = pair_quality(resolver.resolve(), truth)
+    assert precision == 1.0
+    assert recall > 0.9
@@ -0,0 +1,20 @@
+import os
+import shutil
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from generate_viral_data import save_to_csv  # noqa: E402
+
+
+def test_empty_source_keeps_file(tmp_path):
+    filename = str(tmp_path / 'bloggers.csv')
+    shutil.copyfile(os.path.join(ROOT, 'fitness_trainers_viral.csv'), filename)
+    with open(filename, 'rb') as f:
+        data = f.read()
+
+    assert save_to_csv(iter([]), filename) == 0
+    with open(filename, 'rb') as f:
+        assert f.read() == data
+    assert not os.path.exists(f"{filename}.tmp")
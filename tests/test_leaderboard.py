@@ -0,0 +1,30 @@
+import json
+import os
+import shutil
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from leaderboard import export_leaderboard  # noqa: E402
+
+
+def test_site_leaderboard_has_own_state(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    filename = str(tmp_path / 'bloggers.csv')
+    data_dir = str(tmp_path / 'site_data')
+    output = str(tmp_path / 'leaderboard.json')
+    with open(os.path.join(ROOT, 'fitness_trainers_viral.csv'), 'r', encoding='utf-8') as f:
+        lines = f.read().splitlines(keepends=True)
+    shutil.copyfile(os.path.join(ROOT, 'fitness_trainers_viral.csv'), filename)
+
+    assert export_leaderboard(filename, output, data_dir).movers() is None
+    assert not os.path.exists(output)
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.writelines(lines[:-3])
+    assert export_leaderboard(filename, output, data_dir).movers() is not None
+
+    with open(output, 'r', encoding='utf-8') as f:
+        assert set(json.load(f)['metrics']) == {'viral_coef', 'avg_views'}
+    assert os.path.exists(os.path.join(data_dir, 'leaderboard_state.npz'))
+    assert not os.path.exists(tmp_path / 'leaderboard_state.npz')
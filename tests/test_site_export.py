@@ -0,0 +1,40 @@
+import json
+import os
+import shutil
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from site_export import VERSIONS_FILE, export_site, prune_site_data  # noqa: E402
+
+
+def test_restored_site_data_keeps_previous_version(tmp_path):
+    filename = str(tmp_path / 'bloggers.csv')
+    output_dir = str(tmp_path / 'site_data')
+    with open(os.path.join(ROOT, 'fitness_trainers_viral.csv'), 'r', encoding='utf-8') as f:
+        lines = f.read().splitlines(keepends=True)
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.writelines(lines)
+    old = export_site(filename, output_dir)
+
+    # Как в CI: данные восстановлены из публикации, в них лишняя старая версия
+    restored = str(tmp_path / 'restored')
+    shutil.copytree(output_dir, restored)
+    os.makedirs(os.path.join(restored, 'aaaaaaaaaaaa'))
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.writelines(lines[:-1])
+    new = export_site(filename, restored)
+
+    assert new['previous'] == old['base']
+    assert sorted(n for n in os.listdir(restored) if len(n) == 12) == sorted([old['base'], new['base']])
+    with open(os.path.join(restored, VERSIONS_FILE), 'r', encoding='utf-8') as f:
+        assert old['base'] in json.load(f)['deltas']
+    assert prune_site_data(restored) == []
+
+
+def test_search_finds_synthetic_handles():
+    from synthetic_data import transliterate
+    from site_export import search_tokens
+
+    assert search_tokens('Михаил Щукин') == [transliterate('Михаил'), transliterate('Щукин')]
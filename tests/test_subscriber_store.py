@@ -0,0 +1,53 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from subscriber_store import SubscriberStore  # noqa: E402
+
+
+def test_migrate_keeps_subscription(tmp_path):
+    store = SubscriberStore(str(tmp_path / 'subscribers.db'))
+    store.update(-100, platforms=['Instagram'], min_coef=5.0, bloggers=['anna'])
+
+    store.migrate(-100, -1001234)
+
+    assert -100 not in store
+    subscription = store.get(-1001234)
+    assert subscription is not None
+    assert subscription.platforms == frozenset({'Instagram'})
+    assert subscription.min_coef == 5.0
+    assert subscription.bloggers == frozenset({'anna'})
+    assert store.match('anna', 'Instagram', 6.0, None) == [-1001234]
+    store.close()
+
+    # Подписка сохранена в базе под новым id
+    reopened = SubscriberStore(str(tmp_path / 'subscribers.db'))
+    assert -1001234 in reopened and -100 not in reopened
+    reopened.close()
+
+
+def test_blogger_subscription_respects_platforms(tmp_path):
+    store = SubscriberStore(str(tmp_path / 'subscribers.db'))
+    store.update(1, platforms=['TikTok'], bloggers=['anna'])
+    store.update(2, bloggers=['anna'])
+
+    assert store.match('anna', 'Instagram', 6.0, None) == [2]
+    assert sorted(store.match('anna', 'TikTok', 6.0, None)) == [1, 2]
+    assert store.match('boris', 'TikTok', 6.0, None) == []
+    store.close()
+
+
+def test_background_writes_are_saved_in_order(tmp_path):
+    store = SubscriberStore(str(tmp_path / 'subscribers.db'), background=True)
+    store.subscribe(1)
+    store.update(1, min_coef=7.0)
+    store.subscribe(2)
+    store.unsubscribe(2)
+    # Индекс меняется сразу, не дожидаясь записи в SQLite
+    assert 1 in store and 2 not in store
+    store.close()
+
+    reopened = SubscriberStore(str(tmp_path / 'subscribers.db'))
+    assert list(reopened) == [1]
+    assert reopened.get(1).min_coef == 7.0
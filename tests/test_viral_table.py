@@ -0,0 +1,22 @@
+import os
+import sys
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from blogger_model import Blogger, trend_code  # noqa: E402
+from viral_table import BUCKETS, ViralTable  # noqa: E402
+
+
+def test_buckets_match_trend_codes():
+    coefs = [0.5, 0.99, 1.0, 1.99, 2.0, 4.99, 5.0, 9.99, 10.0, 50.0]
+    table = ViralTable.from_bloggers(Blogger(name=str(c), viral_coef=c) for c in coefs)
+    expected = {bucket: 0 for bucket in BUCKETS}
+    for coef in coefs:
+        expected[trend_code(coef)] += 1
+
+    assert table.bucket_counts() == expected
+    assert table.bucket_counts(np.arange(len(coefs))) == expected
+    assert expected['declining'] == 2
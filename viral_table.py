@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Колоночная таблица метрик вирусности на NumPy
+
+Строится за один проход по данным; сортировка по коэффициенту вычисляется
+один раз при построении, поэтому сводки работают за O(log n) или O(k):
+- подсчет по платформам и трендам (категориальные коды)
+- корзины вирусности - те же коды и границы, что у тренда
+  (declining / stable / growing / viral / mega, blogger_model.trend_code)
+- перцентили и топ-N по любой числовой колонке
+
+Требования:
+pip install numpy
+"""
+
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    print("❌ Установите библиотеку: pip install numpy")
+    exit(1)
+
+from blogger_model import TREND_CODES, TREND_THRESHOLDS, Blogger, iter_bloggers, parse_audience
+
+# Корзины вирусности = коды тренда: нижние границы коэффициента из blogger_model
+BUCKETS = TREND_CODES
+BUCKET_THRESHOLDS = TREND_THRESHOLDS
+
+NUMERIC_COLUMNS = ('viral_coef', 'views', 'avg_views', 'videos_per_month', 'subscribers')
+
+
+class ViralTable:
+    """Колоночное представление набора блогеров"""
+
+    def __init__(self, columns: Dict[str, 'np.ndarray'], platform_codes: 'np.ndarray',
+                 platforms: List[str], trend_codes: 'np.ndarray', trends: List[str],
+                 bloggers: Optional[List[Blogger]] = None):
+        self.viral_coef = columns['viral_coef']
+        self.views = columns['views']
+        self.avg_views = columns['avg_views']
+        self.videos_per_month = columns['videos_per_month']
+        self.subscribers = columns['subscribers']
+        self.platform_codes = platform_codes
+        self.platforms = platforms
+        self.trend_codes = trend_codes
+        self.trends = trends
+        self.bloggers = bloggers
+
+        # Производные структуры: сортировки и агрегаты по всей таблице
+        self._order = {}
+        self._sorted = {}
+        self._platform_counts = None
+        self.sorted_indices('viral_coef')
+
+    @classmethod
+    def from_bloggers(cls, bloggers: Iterable[Blogger], keep_rows: bool = True) -> 'ViralTable':
+        """
+        Строит таблицу за один проход
+
+        Args:
+            bloggers: Список или поток записей Blogger
+            keep_rows: Сохранить сами записи (нужно для top_bloggers)
+        """
+        coef = array('d')
+        views = array('q')
+        avg_views = array('q')
+        videos = array('q')
+        subscribers = array('q')
+        platform_codes = array('q')
+        trend_codes = array('q')
+        platform_index = {}
+        trend_index = {}
+        rows = [] if keep_rows else None
+
+        for b in bloggers:
+            coef.append(b.viral_coef)
+            views.append(b.views)
+            avg_views.append(b.avg_views)
+            videos.append(b.videos_per_month)
+            audience = parse_audience(b.audience)
+            subscribers.append(-1 if audience is None else audience)
+
+            code = platform_index.get(b.platform)
+            if code is None:
+                code = platform_index[b.platform] = len(platform_index)
+            platform_codes.append(code)
+
+            code = trend_index.get(b.trend_value)
+            if code is None:
+                code = trend_index[b.trend_value] = len(trend_index)
+            trend_codes.append(code)
+
+            if keep_rows:
+                rows.append(b)
+
+        columns = {
+            'viral_coef': np.frombuffer(coef, dtype=np.float64),
+            'views': np.frombuffer(views, dtype=np.int64),
+            'avg_views': np.frombuffer(avg_views, dtype=np.int64),
+            'videos_per_month': np.frombuffer(videos, dtype=np.int64),
+            'subscribers': np.frombuffer(subscribers, dtype=np.int64),
+        }
+        return cls(
+            columns,
+            np.frombuffer(platform_codes, dtype=np.int64), list(platform_index),
+            np.frombuffer(trend_codes, dtype=np.int64), list(trend_index),
+            rows
+        )
+
+    @classmethod
+    def from_csv(cls, filename: str, keep_rows: bool = True) -> 'ViralTable':
+        """Читает CSV потоково и строит таблицу"""
+        return cls.from_bloggers(iter_bloggers(filename), keep_rows=keep_rows)
+
+    def __len__(self):
+        return len(self.viral_coef)
+
+    def column(self, name: str) -> 'np.ndarray':
+        """Возвращает числовую колонку по имени"""
+        if name not in NUMERIC_COLUMNS:
+            raise KeyError(f"Неизвестная колонка: {name}")
+        return getattr(self, name)
+
+    def sorted_indices(self, by: str = 'viral_coef') -> 'np.ndarray':
+        """Индексы строк по убыванию колонки (сортировка кэшируется)"""
+        order = self._order.get(by)
+        if order is None:
+            order = np.argsort(-self.column(by), kind='stable')
+            order.flags.writeable = False
+            self._order[by] = order
+        return order
+
+    def _sorted_values(self, by: str) -> 'np.ndarray':
+        """Значения колонки по возрастанию (для бинарного поиска)"""
+        values = self._sorted.get(by)
+        if values is None:
+            values = np.ascontiguousarray(self.column(by)[self.sorted_indices(by)][::-1])
+            self._sorted[by] = values
+        return values
+
+    def count_min(self, threshold: float, by: str = 'viral_coef') -> int:
+        """Количество строк со значением не ниже threshold - O(log n)"""
+        values = self._sorted_values(by)
+        return len(values) - int(np.searchsorted(values, threshold, side='left'))
+
+    def rows_min_coef(self, min_coef: float) -> 'np.ndarray':
+        """Индексы строк с коэффициентом не ниже min_coef (по убыванию коэффициента)"""
+        return self.sorted_indices('viral_coef')[:self.count_min(min_coef)]
+
+    def mask_min_coef(self, min_coef: float) -> 'np.ndarray':
+        """Маска строк с коэффициентом не ниже min_coef"""
+        return self.viral_coef >= min_coef
+
+    def _count_codes(self, codes: 'np.ndarray', labels: List[str],
+                     rows: Optional['np.ndarray']) -> Dict[str, int]:
+        if rows is not None:
+            codes = codes[rows]
+        counts = np.bincount(codes, minlength=len(labels))
+        # Стабильная сортировка: при равенстве сохраняется порядок появления
+        order = np.argsort(-counts, kind='stable')
+        return {labels[i]: int(counts[i]) for i in order if counts[i]}
+
+    def platform_counts(self, rows: Optional['np.ndarray'] = None) -> Dict[str, int]:
+        """
+        Количество блогеров по платформам (по убыванию)
+
+        Args:
+            rows: Маска или массив индексов строк (None - вся таблица, из кэша)
+        """
+        if rows is None:
+            if self._platform_counts is None:
+                self._platform_counts = self._count_codes(self.platform_codes, self.platforms, None)
+            return dict(self._platform_counts)
+        return self._count_codes(self.platform_codes, self.platforms, rows)
+
+    def trend_counts(self, rows: Optional['np.ndarray'] = None) -> Dict[str, int]:
+        """Количество блогеров по значению тренда (по убыванию)"""
+        return self._count_codes(self.trend_codes, self.trends, rows)
+
+    def bucket_counts(self, rows: Optional['np.ndarray'] = None) -> Dict[str, int]:
+        """Количество блогеров в корзинах declining / stable / growing / viral / mega"""
+        if rows is None:
+            # По отсортированному коэффициенту: бинарный поиск каждой границы
+            values = self._sorted_values('viral_coef')
+            bounds = [0] + [int(i) for i in np.searchsorted(values, BUCKET_THRESHOLDS)] + [len(values)]
+            counts = [bounds[i + 1] - bounds[i] for i in range(len(BUCKETS))]
+        else:
+            codes = np.searchsorted(BUCKET_THRESHOLDS, self.viral_coef[rows], side='right')
+            counts = np.bincount(codes, minlength=len(BUCKETS))
+        return {bucket: int(counts[i]) for i, bucket in enumerate(BUCKETS)}
+
+    def percentiles(self, name: str = 'viral_coef',
+                    q: Sequence[float] = (50, 90, 99)) -> Dict[float, float]:
+        """Перцентили числовой колонки (линейная интерполяция по отсортированным значениям)"""
+        values = self._sorted_values(name)
+        if name == 'subscribers':
+            values = values[np.searchsorted(values, 0):]
+        if not len(values):
+            return {p: 0.0 for p in q}
+
+        result = {}
+        last = len(values) - 1
+        for p in q:
+            position = p / 100 * last
+            lower = int(position)
+            upper = min(lower + 1, last)
+            fraction = position - lower
+            result[p] = float(values[lower] + (values[upper] - values[lower]) * fraction)
+        return result
+
+    def top_indices(self, n: int = 10, by: str = 'viral_coef',
+                    rows: Optional['np.ndarray'] = None) -> 'np.ndarray':
+        """Индексы n строк с наибольшим значением колонки (по убыванию)"""
+        if rows is None:
+            return self.sorted_indices(by)[:max(n, 0)]
+
+        values = self.column(by)
+        candidates = np.flatnonzero(rows) if rows.dtype == bool else np.asarray(rows)
+        if n <= 0 or not len(candidates):
+            return candidates[:0]
+
+        selected = values[candidates]
+        if n < len(candidates):
+            # argpartition: O(n) отбор кандидатов вместо полной сортировки
+            part = np.argpartition(-selected, n - 1)[:n]
+            candidates = candidates[part]
+            selected = selected[part]
+        order = np.argsort(-selected, kind='stable')
+        return candidates[order]
+
+    def top_bloggers(self, n: int = 10, by: str = 'viral_coef',
+                     rows: Optional['np.ndarray'] = None) -> List[Blogger]:
+        """Записи n лучших блогеров по колонке"""
+        if self.bloggers is None:
+            raise ValueError("Таблица построена без записей (keep_rows=False)")
+        return [self.bloggers[i] for i in self.top_indices(n, by, rows)]
+
+    def total(self, name: str, rows: Optional['np.ndarray'] = None) -> int:
+        """Сумма числовой колонки"""
+        values = self.column(name)
+        if rows is not None:
+            values = values[rows]
+        return int(values.sum())
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Webhook режим Telegram бота на локальном aiohttp сервере
+
+Telegram отправляет обновления POST запросом на публичный URL (обычно
+reverse proxy с HTTPS перед локальным сервером). Сервер проверяет
+заголовок X-Telegram-Bot-Api-Secret-Token, кладет обновление в очередь
+приложения и сразу отвечает 200 - обработка идет в фоне.
+
+Переключение режимов:
+- webhook: при запуске вызывается setWebhook (заменяет long polling)
+- polling: run_polling сам удаляет webhook перед первым getUpdates
+
+Требования:
+pip install python-telegram-bot aiohttp
+"""
+
+import asyncio
+import hmac
+import secrets
+import signal
+from typing import Optional
+
+try:
+    from aiohttp import web
+except ImportError:
+    print("❌ Установите библиотеку: pip install aiohttp")
+    exit(1)
+
+from telegram import Update
+from telegram.ext import Application
+
+SECRET_HEADER = 'X-Telegram-Bot-Api-Secret-Token'
+
+
+class WebhookServer:
+    """HTTP сервер, принимающий обновления Telegram"""
+
+    def __init__(self, application: Application, host: str, port: int, path: str,
+                 secret_token: str):
+        self.application = application
+        self.host = host
+        self.port = port
+        self.path = path
+        self.secret_token = secret_token
+        self.received = 0
+        self.rejected = 0
+        self._runner: Optional[web.AppRunner] = None
+
+    async def handle(self, request: web.Request) -> web.Response:
+        """Принимает одно обновление"""
+        token = request.headers.get(SECRET_HEADER, '')
+        if not hmac.compare_digest(token, self.secret_token):
+            self.rejected += 1
+            return web.Response(status=403)
+
+        try:
+            data = await request.json()
+        except ValueError:
+            return web.Response(status=400)
+
+        update = Update.de_json(data, self.application.bot)
+        await self.application.update_queue.put(update)
+        self.received += 1
+        return web.Response()
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post(self.path, self.handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+async def serve_webhook(application: Application, webhook_url: str, host: str = '127.0.0.1',
+                        port: int = 8443, path: str = '/telegram',
+                        secret_token: Optional[str] = None,
+                        stop_event: Optional[asyncio.Event] = None):
+    """
+    Запускает приложение в webhook режиме до сигнала остановки
+
+    Args:
+        application: Приложение python-telegram-bot с обработчиками
+        webhook_url: Публичный адрес, на который Telegram шлет обновления (без path)
+        host, port, path: Где слушает локальный сервер
+        secret_token: Секрет для заголовка (None - случайный на каждый запуск)
+        stop_event: Событие остановки (None - SIGINT/SIGTERM)
+    """
+    secret_token = secret_token or secrets.token_urlsafe(32)
+    server = WebhookServer(application, host, port, path, secret_token)
+
+    if stop_event is None:
+        stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop_event.set)
+            except NotImplementedError:
+                pass
+
+    # Жизненный цикл как в run_polling: initialize -> post_init -> start
+    await application.initialize()
+    if application.post_init:
+        await application.post_init(application)
+    await application.start()
+    await server.start()
+
+    try:
+        await application.bot.set_webhook(
+            url=webhook_url.rstrip('/') + path,
+            secret_token=secret_token,
+            allowed_updates=Update.ALL_TYPES,
+        )
+        print(f"🌐 Webhook: {webhook_url.rstrip('/')}{path} -> http://{host}:{port}{path}")
+        await stop_event.wait()
+    finally:
+        # Webhook не удаляется: Telegram придержит обновления до перезапуска
+        await server.stop()
+        await application.stop()
+        if application.post_stop:
+            await application.post_stop(application)
+        await application.shutdown()
+        if application.post_shutdown:
+            await application.post_shutdown(application)
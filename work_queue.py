@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Очередь задач сбора для нескольких воркеров (процессов или машин)
+
+Обновление ("refresh") - набор задач, по одной на аккаунт. Воркеры берут
+задачи своих платформ в аренду (lease) и обновляют их теми же сборщиками,
+что и collect_*.py, поэтому N воркеров делят одно обновление без повторных
+запросов к API:
+
+- аренда на WORK_LEASE_SECONDS; перед каждым аккаунтом воркер продлевает
+  аренду оставшихся задач (heartbeat). Задачу упавшего воркера после
+  истечения аренды берет другой
+- ошибка - повтор с паузой, после WORK_MAX_ATTEMPTS попыток задача failed
+- результат фиксируется один раз: первый записанный побеждает, повторная
+  запись (воркер, потерявший аренду, или повтор) ничего не меняет
+- повторная постановка того же обновления не создает дублей
+
+Хранилище выбирается по WORK_QUEUE_URL. Сейчас есть sqlite:///путь
+(один файл, WAL; общий для процессов одной машины). Другое хранилище -
+подкласс WorkQueue, зарегистрированный в BACKENDS.
+
+Запуск:
+python work_queue.py enqueue                     # задачи на сегодня из fitness_trainers_viral.csv
+python work_queue.py work --processes 4          # 4 воркера на этой машине
+python work_queue.py status
+python work_queue.py export                      # результат -> fitness_trainers_viral_real.csv
+"""
+
+import argparse
+import json
+import os
+import secrets
+import socket
+import sqlite3
+import time
+from datetime import datetime
+from multiprocessing import Process
+from typing import Dict, Iterable, List, Optional
+
+from blogger_model import COLLECTED_FILE, VIRAL_FILE, Blogger, load_bloggers, save_bloggers
+from snapshot_diff import blogger_key
+
+WORK_QUEUE_URL = os.getenv('WORK_QUEUE_URL', 'sqlite:///work_queue.db')
+LEASE_SECONDS = float(os.getenv('WORK_LEASE_SECONDS', '120'))
+MAX_ATTEMPTS = int(os.getenv('WORK_MAX_ATTEMPTS', '3'))
+# Пауза перед повтором: RETRY_BACKOFF * 2^(попытка - 1)
+RETRY_BACKOFF = 60.0
+# Сколько задач воркер берет за раз и как часто проверяет пустую очередь
+LEASE_BATCH = 5
+POLL_INTERVAL = 5.0
+
+INPUT_FILE = VIRAL_FILE
+OUTPUT_FILE = COLLECTED_FILE
+PLATFORMS = ('YouTube', 'Instagram')
+
+# Статусы задачи
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    refresh TEXT NOT NULL,
+    key TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    priority REAL NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL DEFAULT 0,
+    worker TEXT,
+    token TEXT,
+    lease_until REAL,
+    error TEXT,
+    UNIQUE (refresh, key)
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (platform, status, available_at);
+CREATE TABLE IF NOT EXISTS results (
+    refresh TEXT NOT NULL,
+    key TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    worker TEXT NOT NULL,
+    finished_at REAL NOT NULL,
+    PRIMARY KEY (refresh, key)
+);
+"""
+
+
+def encode_blogger(blogger: Blogger) -> str:
+    """Запись для задачи или результата (воркеру не нужен CSV)"""
+    return json.dumps(blogger.to_row(), ensure_ascii=False)
+
+
+def decode_blogger(payload: str) -> Blogger:
+    return Blogger.from_row(json.loads(payload))
+
+
+class Job:
+    """Задача в аренде у воркера"""
+
+    __slots__ = ('id', 'refresh', 'key', 'platform', 'payload', 'attempts', 'token')
+
+    def __init__(self, id: int, refresh: str, key: str, platform: str, payload: str,
+                 attempts: int, token: str):
+        self.id = id
+        self.refresh = refresh
+        self.key = key
+        self.platform = platform
+        self.payload = payload
+        self.attempts = attempts
+        self.token = token
+
+    @property
+    def blogger(self) -> Blogger:
+        return decode_blogger(self.payload)
+
+    def __repr__(self):
+        return f"Job({self.id}, {self.key!r}, attempts={self.attempts})"
+
+
+class WorkQueue:
+    """Интерфейс хранилища очереди"""
+
+    def enqueue(self, refresh: str, bloggers: Iterable[Blogger]) -> int:
+        """Ставит задачи обновления (уже поставленные пропускаются); возвращает число новых"""
+        raise NotImplementedError
+
+    def lease(self, worker: str, platforms: Iterable[str], limit: int = LEASE_BATCH,
+              seconds: float = LEASE_SECONDS) -> List[Job]:
+        """Берет в аренду до limit готовых задач (свободных или с истекшей арендой)"""
+        raise NotImplementedError
+
+    def heartbeat(self, jobs: List[Job], seconds: float = LEASE_SECONDS) -> List[Job]:
+        """Продлевает аренду; возвращает задачи, которые все еще у воркера"""
+        raise NotImplementedError
+
+    def complete(self, job: Job, blogger: Blogger, worker: str) -> bool:
+        """Записывает результат (False - задача уже выполнена кем-то)"""
+        raise NotImplementedError
+
+    def fail(self, job: Job, error: str) -> bool:
+        """Возвращает задачу в очередь с паузой или помечает failed"""
+        raise NotImplementedError
+
+    def results(self, refresh: str) -> Dict[str, Blogger]:
+        """Результаты обновления по ключу аккаунта"""
+        raise NotImplementedError
+
+    def stats(self, refresh: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+        """Платформа -> статус -> число задач"""
+        raise NotImplementedError
+
+    def latest_refresh(self) -> Optional[str]:
+        """Последнее поставленное обновление"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class SQLiteQueue(WorkQueue):
+    """Очередь в файле SQLite (WAL; аренда в транзакции BEGIN IMMEDIATE)"""
+
+    def __init__(self, filename: str):
+        # isolation_level=None: транзакции открываются явно
+        self.db = sqlite3.connect(filename, timeout=30, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(_SCHEMA)
+
+    def _transaction(self):
+        self.db.execute("BEGIN IMMEDIATE")
+
+    def enqueue(self, refresh: str, bloggers: Iterable[Blogger]) -> int:
+        # Приоритет - коэффициент: вирусные аккаунты обновляются первыми
+        rows = [(refresh, blogger_key(b), b.platform, encode_blogger(b), b.viral_coef) for b in bloggers]
+        self._transaction()
+        before = self.db.total_changes
+        self.db.executemany(
+            "INSERT OR IGNORE INTO jobs (refresh, key, platform, payload, priority) VALUES (?, ?, ?, ?, ?)",
+            rows)
+        added = self.db.total_changes - before
+        self.db.execute("COMMIT")
+        return added
+
+    def lease(self, worker: str, platforms: Iterable[str], limit: int = LEASE_BATCH,
+              seconds: float = LEASE_SECONDS) -> List[Job]:
+        platforms = list(platforms)
+        if not platforms:
+            return []
+        marks = ', '.join('?' * len(platforms))
+        now = time.time()
+        self._transaction()
+        try:
+            # Аренда истекла на последней попытке - задача больше не выдается
+            self.db.execute(
+                "UPDATE jobs SET status = ?, error = 'аренда истекла', token = NULL "
+                "WHERE status = ? AND lease_until < ? AND attempts >= ?",
+                (FAILED, LEASED, now, MAX_ATTEMPTS))
+            ids = [row[0] for row in self.db.execute(
+                f"SELECT id FROM jobs WHERE platform IN ({marks}) AND "
+                f"((status = ? AND available_at <= ?) OR (status = ? AND lease_until < ?)) "
+                f"ORDER BY priority DESC, id LIMIT ?",
+                (*platforms, PENDING, now, LEASED, now, limit))]
+            if not ids:
+                self.db.execute("COMMIT")
+                return []
+            token = secrets.token_hex(8)
+            self.db.executemany(
+                "UPDATE jobs SET status = ?, worker = ?, token = ?, lease_until = ?, attempts = attempts + 1 "
+                "WHERE id = ?",
+                [(LEASED, worker, token, now + seconds, job_id) for job_id in ids])
+            rows = self.db.execute(
+                f"SELECT id, refresh, key, platform, payload, attempts, token FROM jobs "
+                f"WHERE id IN ({', '.join('?' * len(ids))}) ORDER BY priority DESC, id", ids).fetchall()
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        return [Job(*row) for row in rows]
+
+    def heartbeat(self, jobs: List[Job], seconds: float = LEASE_SECONDS) -> List[Job]:
+        held = []
+        until = time.time() + seconds
+        self._transaction()
+        for job in jobs:
+            cursor = self.db.execute(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND token = ? AND status = ?",
+                (until, job.id, job.token, LEASED))
+            if cursor.rowcount:
+                held.append(job)
+        self.db.execute("COMMIT")
+        return held
+
+    def complete(self, job: Job, blogger: Blogger, worker: str) -> bool:
+        self._transaction()
+        # Первый результат побеждает, даже если аренда уже истекла: данные получены,
+        # повторять запрос к API незачем
+        cursor = self.db.execute(
+            "UPDATE jobs SET status = ?, token = NULL, error = NULL WHERE id = ? AND status != ?",
+            (DONE, job.id, DONE))
+        if cursor.rowcount:
+            self.db.execute(
+                "INSERT OR IGNORE INTO results (refresh, key, payload, worker, finished_at) VALUES (?, ?, ?, ?, ?)",
+                (job.refresh, job.key, encode_blogger(blogger), worker, time.time()))
+        self.db.execute("COMMIT")
+        return bool(cursor.rowcount)
+
+    def fail(self, job: Job, error: str) -> bool:
+        retry_at = time.time() + RETRY_BACKOFF * 2 ** (job.attempts - 1)
+        status = FAILED if job.attempts >= MAX_ATTEMPTS else PENDING
+        self._transaction()
+        cursor = self.db.execute(
+            "UPDATE jobs SET status = ?, available_at = ?, error = ?, token = NULL "
+            "WHERE id = ? AND token = ? AND status = ?",
+            (status, retry_at, error, job.id, job.token, LEASED))
+        self.db.execute("COMMIT")
+        return bool(cursor.rowcount)
+
+    def results(self, refresh: str) -> Dict[str, Blogger]:
+        return {key: decode_blogger(payload) for key, payload in self.db.execute(
+            "SELECT key, payload FROM results WHERE refresh = ?", (refresh,))}
+
+    def stats(self, refresh: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+        query = "SELECT platform, status, COUNT(*) FROM jobs"
+        params = ()
+        if refresh is not None:
+            query += " WHERE refresh = ?"
+            params = (refresh,)
+        counts: Dict[str, Dict[str, int]] = {}
+        for platform, status, count in self.db.execute(query + " GROUP BY platform, status", params):
+            counts.setdefault(platform, {})[status] = count
+        return counts
+
+    def latest_refresh(self) -> Optional[str]:
+        row = self.db.execute("SELECT refresh FROM jobs ORDER BY id DESC LIMIT 1").fetchone()
+        return row[0] if row else None
+
+    def close(self):
+        self.db.close()
+
+
+BACKENDS = {'sqlite': SQLiteQueue}
+
+
+def open_queue(url: str = WORK_QUEUE_URL) -> WorkQueue:
+    """Очередь по адресу вида sqlite:///work_queue.db"""
+    scheme, _, path = url.partition('://')
+    if scheme not in BACKENDS:
+        raise ValueError(f"Неизвестное хранилище очереди {scheme!r} (есть: {', '.join(BACKENDS)})")
+    # Как в SQLAlchemy: sqlite:///rel.db - относительный путь, sqlite:////abs.db - абсолютный
+    return BACKENDS[scheme](path[1:] if path.startswith('/') else path)
+
+
+def enqueue_refresh(queue: WorkQueue, refresh: str, input_file: str = INPUT_FILE,
+                    platforms: Iterable[str] = PLATFORMS) -> int:
+    """Задачи на все аккаунты платформ из input_file"""
+    platforms = set(platforms)
+    return queue.enqueue(refresh, (b for b in load_bloggers(input_file) if b.platform in platforms))
+
+
+def run_worker(url: str = WORK_QUEUE_URL, platforms: Iterable[str] = PLATFORMS, wait: bool = False):
+    """
+    Воркер: берет задачи своих платформ, пока они есть
+
+    Args:
+        url: Адрес очереди
+        platforms: Платформы воркера (без доступа к платформе ее задачи не берутся)
+        wait: Не завершаться, когда очередь пуста (ждать новых обновлений)
+    """
+    # Сборщики и их сессии - одни на все задачи воркера
+    from collector_daemon import PACE, open_collectors
+
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    collectors = open_collectors(list(platforms))
+    queue = open_queue(url)
+    done = failed = 0
+
+    try:
+        while collectors:
+            jobs = queue.lease(worker, list(collectors))
+            if not jobs:
+                active = sum(counts.get(PENDING, 0) + counts.get(LEASED, 0)
+                             for platform, counts in queue.stats().items() if platform in collectors)
+                if not active and not wait:
+                    break
+                time.sleep(POLL_INTERVAL)
+                continue
+
+            while jobs:
+                # Продление аренды: задачи, отобранные после истечения аренды, не выполняются повторно
+                jobs = queue.heartbeat(jobs)
+                if not jobs:
+                    break
+                job = jobs.pop(0)
+                collector = collectors[job.platform]
+                blogger = job.blogger
+                print(f"[{worker}] {job.platform}: {blogger.name or job.key} (попытка {job.attempts})")
+                try:
+                    ok = collector.update_blogger(blogger)
+                    error = '' if ok else 'нет данных'
+                except Exception as e:
+                    ok, error = False, f"{type(e).__name__}: {e}"
+
+                if ok:
+                    queue.complete(job, blogger, worker)
+                    done += 1
+                else:
+                    queue.fail(job, error)
+                    failed += 1
+                time.sleep(PACE.get(job.platform, 1.0))
+
+            # Квота YouTube API у каждого ключа своя: исчерпана - задачи YouTube оставляем другим
+            youtube = collectors.get('YouTube')
+            if youtube is not None and youtube.quota_used >= youtube.quota_limit * 0.9:
+                print(f"⚠️  [{worker}] Квота YouTube API почти исчерпана - YouTube больше не беру")
+                del collectors['YouTube']
+    finally:
+        queue.close()
+    print(f"✅ [{worker}] Выполнено: {done}, ошибок: {failed}")
+
+
+def export_results(queue: WorkQueue, refresh: str, input_file: str = INPUT_FILE,
+                   output_file: str = OUTPUT_FILE) -> int:
+    """Переносит метрики из результатов обновления в копию input_file; возвращает число обновленных"""
+    from collector_daemon import METRIC_ATTRS
+
+    results = queue.results(refresh)
+    rows = load_bloggers(input_file)
+    updated = 0
+    for blogger in rows:
+        result = results.get(blogger_key(blogger))
+        if result is not None:
+            for attr in METRIC_ATTRS:
+                setattr(blogger, attr, getattr(result, attr))
+            updated += 1
+    save_bloggers(rows, output_file)
+    return updated
+
+
+def print_stats(queue: WorkQueue, refresh: Optional[str]):
+    """Задачи по платформам и статусам"""
+    stats = queue.stats(refresh)
+    if not stats:
+        print("📭 Очередь пуста")
+        return
+    print(f"📊 Обновление: {refresh or 'все'}")
+    for platform, counts in sorted(stats.items()):
+        summary = ', '.join(f"{status}: {counts[status]}" for status in (PENDING, LEASED, DONE, FAILED)
+                            if status in counts)
+        print(f"   {platform}: {summary}")
+
+
+def main():
+    """Основная функция"""
+    parser = argparse.ArgumentParser(description="Очередь задач сбора для нескольких воркеров")
+    parser.add_argument('--queue', default=WORK_QUEUE_URL, help="Адрес очереди (sqlite:///файл)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    enqueue = commands.add_parser('enqueue', help="Поставить обновление")
+    enqueue.add_argument('--refresh', default=datetime.now().strftime('%Y-%m-%d'),
+                         help="Имя обновления (по умолчанию - сегодняшняя дата)")
+    enqueue.add_argument('--input', default=INPUT_FILE, help="CSV с аккаунтами")
+    enqueue.add_argument('--platform', nargs='+', choices=PLATFORMS, default=list(PLATFORMS))
+
+    work = commands.add_parser('work', help="Запустить воркеры")
+    work.add_argument('--processes', type=int, default=1, help="Воркеров на этой машине")
+    work.add_argument('--platform', nargs='+', choices=PLATFORMS, default=list(PLATFORMS))
+    work.add_argument('--wait', action='store_true', help="Ждать новых задач, когда очередь пуста")
+
+    status = commands.add_parser('status', help="Состояние очереди")
+    status.add_argument('--refresh', help="Только это обновление")
+
+    export = commands.add_parser('export', help="Записать результаты в CSV")
+    export.add_argument('--refresh', help="Обновление (по умолчанию последнее)")
+    export.add_argument('--input', default=INPUT_FILE, help="CSV с аккаунтами")
+    export.add_argument('--output', default=OUTPUT_FILE, help="CSV с результатами")
+
+    args = parser.parse_args()
+
+    if args.command == 'work':
+        # Каждый процесс открывает свои сборщики и соединение с очередью
+        workers = [Process(target=run_worker, args=(args.queue, args.platform, args.wait))
+                   for _ in range(max(1, args.processes))]
+        for process in workers:
+            process.start()
+        for process in workers:
+            process.join()
+        return
+
+    queue = open_queue(args.queue)
+    try:
+        if args.command == 'enqueue':
+            added = enqueue_refresh(queue, args.refresh, args.input, args.platform)
+            print(f"✅ {args.refresh}: поставлено задач: {added}")
+            print_stats(queue, args.refresh)
+        elif args.command == 'status':
+            print_stats(queue, args.refresh)
+        elif args.command == 'export':
+            refresh = args.refresh or queue.latest_refresh()
+            if refresh is None:
+                print("❌ В очереди нет обновлений")
+                exit(1)
+            updated = export_results(queue, refresh, args.input, args.output)
+            print(f"✅ {args.output}: обновлено аккаунтов {updated} (обновление {refresh})")
+    finally:
+        queue.close()
+
+
+if __name__ == "__main__":
+    main()